@@ -0,0 +1,323 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from stock_models import Watchlist, AlertEvent
+from analysis_pipeline import AnalysisPipeline
+from condition_dsl import StrategyBook
+from bar_series import BarSeries
+from realtime_quotes import Tick
+from rate_limiter import RequestScheduler, Priority
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONDITION = "default"  # 기본 검색 조건 (ConditionService.meets_all_conditions)
+
+# 평가에 쓴 봉의 식별값 (일자, 봉 수, 종가, 거래량) - 같으면 결과도 같으므로 다시 평가하지 않음
+BarSignature = Tuple[int, int, float, float]
+
+
+class InvalidWatchlist(ValueError):
+    """관심 종목/조건 지정 오류"""
+
+
+class AlertEngine:
+    """관심 종목 목록 기반 신호 전환 알림
+
+    사용자가 등록한 관심 종목과 조건(기본 검색 조건 또는 조건식 전략)을 서버에서
+    감시하다가 신호가 바뀌면(HOLD -> BUY 등) 구독자에게 이벤트를 보냅니다.
+
+    - 실시간 체결이 들어온 종목만 다시 평가 대상(dirty)으로 표시하고, 평가 전에
+      봉 식별값을 비교해 지난 평가 이후 봉이 바뀐 종목만 계산합니다.
+    - 신호 상태는 (종목, 조건)별로 하나만 두어 같은 종목을 여러 목록이 감시해도
+      한 번만 계산하고, 전환 이벤트만 해당 목록들로 나눠 보냅니다.
+    - 실시간 시세가 없거나 다른 경로(검색, 백필)로 봉이 갱신된 경우를 위해
+      sweep_interval마다 전체 감시 종목을 다시 확인합니다. (봉이 같으면 계산 생략)
+    """
+
+    QUEUE_SIZE = 256  # 구독자별 미전송 이벤트 한도 (넘으면 오래된 것부터 버림)
+
+    def __init__(
+        self,
+        analysis_pipeline: AnalysisPipeline,
+        strategy_book: StrategyBook,
+        path: Optional[str] = None,
+        min_interval: Optional[float] = None,
+        sweep_interval: Optional[float] = None,
+        max_codes: Optional[int] = None,
+    ):
+        self.pipeline = analysis_pipeline
+        self.strategy_book = strategy_book
+        self.path = Path(path or os.getenv("ALERT_WATCHLIST_FILE", "data/watchlists.json"))
+        self.min_interval = min_interval if min_interval is not None else float(os.getenv("ALERT_MIN_INTERVAL", "0.5"))
+        self.sweep_interval = sweep_interval or float(os.getenv("ALERT_SWEEP_INTERVAL", "60"))
+        self.max_codes = max_codes or int(os.getenv("ALERT_MAX_CODES", "200"))  # 목록당 종목 수 한도
+
+        self.watchlists: Dict[str, Watchlist] = {}
+        self._watchers: Dict[str, Set[str]] = {}  # 종목 -> 감시 중인 목록 id
+        self._signals: Dict[Tuple[str, str], str] = {}  # (종목, 조건) -> 현재 신호
+        self._signatures: Dict[str, BarSignature] = {}  # 종목 -> 마지막 평가 봉
+        self._dirty: Set[str] = set()
+        self._wake = asyncio.Event()
+        self._subscribers: Dict[Optional[str], Set[asyncio.Queue]] = {}  # 목록 id(None이면 전체) -> 큐
+        self._stats = {"passes": 0, "evaluated": 0, "skipped": 0, "failed": 0, "events": 0, "dropped": 0}
+
+    # ---- 관심 종목 목록 ----
+
+    def validate_conditions(self, conditions: Iterable[str]) -> List[str]:
+        conditions = list(dict.fromkeys(conditions)) or [DEFAULT_CONDITION]
+        known = self.strategy_book.plan.expressions
+        unknown = [name for name in conditions if name != DEFAULT_CONDITION and name not in known]
+        if unknown:
+            raise InvalidWatchlist(f"알 수 없는 조건: {', '.join(unknown)} (가능: {DEFAULT_CONDITION}, {', '.join(known)})")
+        return conditions
+
+    def register(self, name: str, codes: Iterable[str], conditions: Iterable[str] = ()) -> Watchlist:
+        """관심 종목 목록 등록 - 다음 평가에서 현재 신호를 초기화 (초기 신호는 알리지 않음)"""
+        codes = list(dict.fromkeys(code.strip() for code in codes if code.strip()))
+        if not codes:
+            raise InvalidWatchlist("종목코드가 필요합니다.")
+        if len(codes) > self.max_codes:
+            raise InvalidWatchlist(f"목록당 종목은 최대 {self.max_codes}개입니다.")
+        watchlist = Watchlist(
+            id=uuid.uuid4().hex[:12],
+            name=name,
+            codes=codes,
+            conditions=self.validate_conditions(conditions),
+            created_at=datetime.now(),
+        )
+        self._add(watchlist)
+        self._save()
+        logger.info(f"관심 종목 등록: {watchlist.name} ({len(codes)}개 종목, 조건 {', '.join(watchlist.conditions)})")
+        return watchlist
+
+    def _add(self, watchlist: Watchlist):
+        self.watchlists[watchlist.id] = watchlist
+        for code in watchlist.codes:
+            self._watchers.setdefault(code, set()).add(watchlist.id)
+            # 이미 감시 중인 종목에 새 조건이 붙으면 봉이 그대로여도 다음 평가에서 계산
+            if any((code, condition) not in self._signals for condition in watchlist.conditions):
+                self._signatures.pop(code, None)
+        self.mark_dirty(watchlist.codes)
+
+    def remove(self, watchlist_id: str) -> bool:
+        watchlist = self.watchlists.pop(watchlist_id, None)
+        if watchlist is None:
+            return False
+        for code in watchlist.codes:
+            watchers = self._watchers.get(code)
+            if watchers is not None:
+                watchers.discard(watchlist_id)
+                if not watchers:
+                    del self._watchers[code]
+                    self._signatures.pop(code, None)
+        conditions = {c for w in self.watchlists.values() for c in w.conditions}
+        self._signals = {
+            (code, condition): signal for (code, condition), signal in self._signals.items()
+            if code in self._watchers and condition in conditions
+        }
+        self._save()
+        return True
+
+    def codes(self) -> List[str]:
+        """감시 중인 전체 종목"""
+        return list(self._watchers)
+
+    def signals(self, watchlist_id: str) -> Optional[Dict[str, Dict[str, str]]]:
+        """목록의 현재 신호 {종목: {조건: 신호}} (아직 평가 전이면 빠짐)"""
+        watchlist = self.watchlists.get(watchlist_id)
+        if watchlist is None:
+            return None
+        return {
+            code: {c: self._signals[(code, c)] for c in watchlist.conditions if (code, c) in self._signals}
+            for code in watchlist.codes
+        }
+
+    def load(self) -> int:
+        """저장된 관심 종목 목록 로딩"""
+        if not self.path.exists():
+            return 0
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for item in json.load(f):
+                    watchlist = Watchlist(**item)
+                    # 전략 파일에서 빠진 조건은 제외
+                    watchlist.conditions = [c for c in watchlist.conditions
+                                            if c == DEFAULT_CONDITION or c in self.strategy_book.plan.expressions] \
+                        or [DEFAULT_CONDITION]
+                    self._add(watchlist)
+        except Exception as e:
+            logger.error(f"관심 종목 목록 로딩 실패: {str(e)}")
+        return len(self.watchlists)
+
+    def _save(self):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump([w.model_dump(mode="json") for w in self.watchlists.values()], f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error(f"관심 종목 목록 저장 실패: {str(e)}")
+
+    # ---- 재평가 ----
+
+    def mark_dirty(self, codes: Iterable[str]):
+        """다시 평가할 종목 표시"""
+        added = False
+        for code in codes:
+            if code in self._watchers:
+                self._dirty.add(code)
+                added = True
+        if added:
+            self._wake.set()
+
+    def on_tick(self, tick: Tick, new_bar: bool):
+        """실시간 체결 리스너 - 체결이 들어온 감시 종목만 표시"""
+        if tick.code in self._watchers:
+            self._dirty.add(tick.code)
+            self._wake.set()
+
+    @staticmethod
+    def _signature(bars: BarSeries) -> Optional[BarSignature]:
+        if not len(bars):
+            return None
+        return int(bars.dates[-1]), len(bars), float(bars.close[-1]), float(bars.volume[-1])
+
+    async def evaluate_pass(self) -> List[AlertEvent]:
+        """표시된 종목 중 봉이 바뀐 종목만 평가하고 신호 전환 이벤트 발행"""
+        codes = [code for code in self._dirty if code in self._watchers]
+        self._dirty.clear()
+        if not codes:
+            return []
+        self._stats["passes"] += 1
+
+        kiwoom_service = self.pipeline.kiwoom_service
+        with RequestScheduler.priority(Priority.BACKGROUND):
+            loaded = await asyncio.gather(
+                *(kiwoom_service.get_stock_chart_data(code, count=self.pipeline.DAILY_BARS) for code in codes),
+                return_exceptions=True
+            )
+
+        changed: List[str] = []
+        charts: List[BarSeries] = []
+        for code, bars in zip(codes, loaded):
+            if isinstance(bars, Exception):
+                self._stats["failed"] += 1
+                logger.warning(f"알림 평가용 일봉 조회 실패 {code}: {str(bars)}")
+                continue
+            signature = self._signature(bars)
+            if signature is None or signature == self._signatures.get(code):
+                self._stats["skipped"] += 1
+                continue
+            self._signatures[code] = signature
+            changed.append(code)
+            charts.append(bars)
+        if not changed:
+            return []
+
+        self._stats["evaluated"] += len(changed)
+        # 이 종목들을 감시하는 목록의 조건만 계산
+        conditions = {c for code in changed for wid in self._watchers.get(code, ()) for c in self.watchlists[wid].conditions}
+        results = await self.pipeline.run_in_executor(self._evaluate, conditions, charts)
+        return self._transitions(changed, charts, results)
+
+    def _evaluate(self, conditions: Set[str], charts: List[BarSeries]) -> Dict[str, List[Tuple[str, Optional[float]]]]:
+        """조건별 종목 (신호, 신뢰도) 목록 (스레드 풀에서 실행)"""
+        results: Dict[str, List[Tuple[str, Optional[float]]]] = {}
+
+        if DEFAULT_CONDITION in conditions:
+            condition_service = self.pipeline.condition_service
+            results[DEFAULT_CONDITION] = []
+            for indicators, meets in condition_service.analyze_batch(charts):
+                strategy = condition_service.generate_trading_strategy(indicators, meets)
+                results[DEFAULT_CONDITION].append((strategy.signal, strategy.confidence if meets else None))
+
+        strategies = sorted(conditions - {DEFAULT_CONDITION})
+        if strategies:
+            flags = self.strategy_book.plan_for(strategies).evaluate_chart_data(charts)
+            for name in strategies:
+                results[name] = [("BUY" if flag else "HOLD", None) for flag in flags[name]]
+        return results
+
+    def _transitions(self, codes: List[str], charts: List[BarSeries],
+                     results: Dict[str, List[Tuple[str, Optional[float]]]]) -> List[AlertEvent]:
+        events: List[AlertEvent] = []
+        now = datetime.now()
+        for condition, values in results.items():
+            for code, bars, (signal, confidence) in zip(codes, charts, values):
+                previous = self._signals.get((code, condition))
+                self._signals[(code, condition)] = signal
+                if previous is None or previous == signal:
+                    continue  # 첫 평가는 현재 상태 기록만
+                for watchlist_id in sorted(self._watchers.get(code, ())):
+                    if condition not in self.watchlists[watchlist_id].conditions:
+                        continue
+                    event = AlertEvent(
+                        watchlist_id=watchlist_id, code=code, condition=condition,
+                        previous=previous, signal=signal, price=float(bars.close[-1]),
+                        confidence=confidence, bar_date=int(bars.dates[-1]), at=now,
+                    )
+                    events.append(event)
+                    self._publish(event)
+        if events:
+            logger.info(f"신호 전환 알림 {len(events)}건")
+        return events
+
+    async def run_loop(self):
+        """표시된 종목이 생기면 평가 (min_interval 동안 모아서 한 번에), sweep_interval마다 전체 확인"""
+        logger.info(f"알림 엔진 시작: 관심 목록 {len(self.watchlists)}개, 종목 {len(self._watchers)}개")
+        last_sweep = time.monotonic()
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.sweep_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if time.monotonic() - last_sweep >= self.sweep_interval:
+                self._dirty.update(self._watchers)
+                last_sweep = time.monotonic()
+            try:
+                await self.evaluate_pass()
+            except Exception as e:
+                logger.error(f"알림 평가 오류: {str(e)}")
+            await asyncio.sleep(self.min_interval)
+
+    # ---- 구독 ----
+
+    def subscribe(self, watchlist_id: Optional[str] = None) -> asyncio.Queue:
+        """이벤트 구독 큐 (watchlist_id가 없으면 전체 목록)"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.QUEUE_SIZE)
+        self._subscribers.setdefault(watchlist_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue, watchlist_id: Optional[str] = None):
+        queues = self._subscribers.get(watchlist_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[watchlist_id]
+
+    def _publish(self, event: AlertEvent):
+        self._stats["events"] += 1
+        for key in (event.watchlist_id, None):
+            for queue in self._subscribers.get(key, ()):
+                if queue.full():  # 느린 구독자 - 가장 오래된 이벤트를 버림
+                    queue.get_nowait()
+                    self._stats["dropped"] += 1
+                queue.put_nowait(event)
+
+    def stats(self) -> Dict:
+        return {
+            **self._stats,
+            "watchlists": len(self.watchlists),
+            "codes": len(self._watchers),
+            "pending": len(self._dirty),
+            "subscribers": sum(len(queues) for queues in self._subscribers.values()),
+        }
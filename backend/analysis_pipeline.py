@@ -0,0 +1,245 @@
+import os
+import asyncio
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, List, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from stock_models import AnalyzedStock, StockInfo, TechnicalIndicators, TimeframeAnalysis
+from async_kiwoom_service import AsyncKiwoomService
+from condition_service import ConditionService
+from batch_indicators import BatchIndicatorEngine, ChartData, pack_columns
+from bar_series import BarSeries
+from indicator_pool import IndicatorProcessPool
+from metrics import STOCK_FAILURES, stage_timer
+from resilience import failure_reason
+
+logger = logging.getLogger(__name__)
+
+TIMEFRAMES = ("W", "M")  # 일봉에서 리샘플하는 상위 시간 프레임
+# 상위 시간 프레임 지표(MACD 26봉, 골든크로스 21봉)를 채우는 데 필요한 일봉 수
+TIMEFRAME_HISTORY_DAYS = {"W": 135, "M": 570}
+
+
+@dataclass
+class PipelineResult:
+    """동시 분석 결과 (부분 성공 허용)"""
+    stocks: List[AnalyzedStock] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)  # 종목코드 -> 실패 사유
+    skipped: List[str] = field(default_factory=list)  # 차트 데이터 없음
+
+
+class AnalysisPipeline:
+    """종목별 조회/분석을 동시에 수행하는 fan-out 엔진
+
+    API 호출은 비동기 클라이언트로, 기술지표 계산은 전용 스레드 풀에서
+    실행하므로 분석 중에도 이벤트 루프는 다른 요청을 계속 처리할 수 있습니다.
+    """
+
+    DAILY_BARS = 30  # 일봉 지표/조건 계산 구간 (조회 일봉이 더 길어도 최근 30개 기준)
+
+    def __init__(
+        self,
+        kiwoom_service: AsyncKiwoomService,
+        condition_service: ConditionService,
+        max_concurrency: Optional[int] = None,
+        stock_timeout: Optional[float] = None,
+        indicator_pool: Optional[IndicatorProcessPool] = None,
+        timeframes: Optional[Sequence[str]] = None,
+        chart_count: Optional[int] = None,
+    ):
+        self.kiwoom_service = kiwoom_service
+        self.condition_service = condition_service
+        self.indicator_pool = indicator_pool  # 지정시 큰 배치 지표 계산은 작업 프로세스에서
+
+        # 상위 시간 프레임은 추가 조회 없이 같은 일봉을 리샘플해 계산
+        if timeframes is None:
+            timeframes = [tf.strip().upper() for tf in os.getenv("ANALYSIS_TIMEFRAMES", "").split(",") if tf.strip()]
+        unknown = set(timeframes) - set(TIMEFRAMES)
+        if unknown:
+            raise ValueError(f"지원하지 않는 시간 프레임: {', '.join(sorted(unknown))} (가능: {', '.join(TIMEFRAMES)})")
+        self.timeframes = tuple(tf for tf in TIMEFRAMES if tf in timeframes)
+        default_count = max([self.DAILY_BARS] + [TIMEFRAME_HISTORY_DAYS[tf] for tf in self.timeframes])
+        self.chart_count = chart_count or int(os.getenv("ANALYSIS_CHART_DAYS", str(default_count)))
+        self.max_concurrency = max_concurrency or int(os.getenv("SEARCH_MAX_CONCURRENCY", "8"))
+        self.stock_timeout = stock_timeout or float(os.getenv("SEARCH_STOCK_TIMEOUT", "10"))
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="analysis"
+        )
+
+    async def run_in_executor(self, func, *args, **kwargs):
+        """CPU 작업을 전용 스레드 풀에서 실행 (우선순위/단계 측정 컨텍스트 유지)"""
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self._executor, lambda: context.run(func, *args, **kwargs))
+
+    async def compute_indicators(self, closes: np.ndarray, volumes: np.ndarray) -> Dict[str, np.ndarray]:
+        """(종목 x 봉) 배열 배치 지표 - 종목이 많으면 프로세스 풀, 아니면 스레드 풀"""
+        if self.indicator_pool is not None and self.indicator_pool.accepts(len(closes)):
+            return await self.indicator_pool.compute(closes, volumes)
+        return await self.run_in_executor(BatchIndicatorEngine().compute, closes, volumes)
+
+    def daily(self, chart_data: ChartData) -> BarSeries:
+        """일봉 지표 계산 구간 (최근 DAILY_BARS개 view)"""
+        return BarSeries.of(chart_data).tail(self.DAILY_BARS)
+
+    async def analyze_charts(self, chart_data_list: List[ChartData]) -> List[Tuple[TechnicalIndicators, bool]]:
+        """여러 종목의 지표 계산 및 조건 검증 (ConditionService.analyze_batch와 같은 결과)"""
+        chart_data_list = [self.daily(chart_data) for chart_data in chart_data_list]
+        if self.indicator_pool is None or not self.indicator_pool.accepts(len(chart_data_list)):
+            return await self.run_in_executor(self.condition_service.analyze_batch, chart_data_list)
+
+        closes, volumes = await self.run_in_executor(
+            lambda: (pack_columns(chart_data_list, "close"), pack_columns(chart_data_list, "volume"))
+        )
+        result = await self.indicator_pool.compute(closes, volumes)
+        return await self.run_in_executor(self.condition_service.analyze_batch, chart_data_list, result)
+
+    def timeframe_analysis(self, chart_data_list: Sequence[ChartData]) -> List[Optional[Dict[str, TimeframeAnalysis]]]:
+        """일봉을 주봉/월봉으로 리샘플해 시간 프레임마다 전 종목을 한 번에 계산 (추가 조회 없음)"""
+        if not self.timeframes:
+            return [None] * len(chart_data_list)
+
+        per_stock: List[Dict[str, TimeframeAnalysis]] = [{} for _ in chart_data_list]
+        for timeframe in self.timeframes:
+            resampled = [BarSeries.of(chart_data).resample(timeframe) for chart_data in chart_data_list]
+            analyzed = self.condition_service.analyze_batch(resampled)
+            for frames, bars, (indicators, _) in zip(per_stock, resampled, analyzed):
+                frames[timeframe] = TimeframeAnalysis(
+                    bars=len(bars),
+                    indicators=indicators,
+                    trend_up=self.condition_service.is_trend_up(indicators)
+                )
+        return per_stock
+
+    async def analyze_timeframes(self, chart_data_list: Sequence[ChartData]) -> List[Optional[Dict[str, TimeframeAnalysis]]]:
+        """timeframe_analysis를 스레드 풀에서 실행"""
+        if not self.timeframes:
+            return [None] * len(chart_data_list)
+        return await self.run_in_executor(self.timeframe_analysis, chart_data_list)
+
+    async def search_codes(self, condition_name: str) -> List[str]:
+        """조건검색"""
+        with stage_timer("condition_search"):
+            return await self.kiwoom_service.search_by_condition(condition_name)
+
+    @staticmethod
+    async def _timed(stage: str, awaitable):
+        with stage_timer(stage):
+            return await awaitable
+
+    async def fetch_stock(self, stock_code: str, chart_count: Optional[int] = None) -> Tuple[Dict[str, Any], str, BarSeries]:
+        """현재가/종목명/차트를 동시에 조회 (chart_count 기본: 상위 시간 프레임까지 포함한 일봉 수)"""
+        chart_count = chart_count or self.chart_count
+        price_info, stock_name, chart_data = await asyncio.gather(
+            self._timed("quote", self.kiwoom_service.get_stock_price(stock_code)),
+            self._timed("name", self.kiwoom_service.get_stock_name(stock_code)),
+            self._timed("chart", self.kiwoom_service.get_stock_chart_data(stock_code, period="D", count=chart_count)),
+        )
+        return price_info, stock_name, chart_data
+
+    async def analyze_stock(self, stock_code: str) -> Optional[AnalyzedStock]:
+        """단일 종목 조회 및 분석"""
+        price_info, stock_name, chart_data = await self.fetch_stock(stock_code)
+
+        if not chart_data:
+            return None
+
+        # 기술지표 계산 및 조건 검증도 이벤트 루프 밖에서 수행
+        return await self.run_in_executor(
+            self.build_analyzed_stock, stock_code, stock_name, price_info, chart_data
+        )
+
+    def build_analyzed_stock(self, stock_code: str, stock_name: str, price_info: dict, chart_data: BarSeries) -> AnalyzedStock:
+        """조회 결과로 분석 종목 구성"""
+        with stage_timer("indicators"):
+            daily = self.daily(chart_data)
+            indicators = self.condition_service.calculate_indicators(daily)
+            meets_conditions = self.condition_service.meets_all_conditions(indicators, daily)
+            timeframes = self.timeframe_analysis([chart_data])[0]
+        return self.compose(stock_code, stock_name, price_info, indicators, meets_conditions, timeframes)
+
+    def compose(self, stock_code: str, stock_name: str, price_info: dict,
+                indicators: TechnicalIndicators, meets_conditions: bool,
+                timeframes: Optional[Dict[str, TimeframeAnalysis]] = None) -> AnalyzedStock:
+        """계산된 지표로 분석 종목 구성 (매매 전략, 상위 시간 프레임 확인 포함)"""
+        strategy = self.condition_service.generate_trading_strategy(indicators, meets_conditions)
+
+        stock_info = StockInfo(
+            code=stock_code,
+            name=stock_name,
+            price=price_info["price"],
+            change_percent=price_info["change_percent"],
+            volume=price_info["volume"]
+        )
+
+        return AnalyzedStock(
+            stock_info=stock_info,
+            indicators=indicators,
+            strategy=strategy,
+            meets_conditions=meets_conditions,
+            timeframes=timeframes,
+            timeframe_confirmed=all(frame.trend_up for frame in timeframes.values()) if timeframes else None
+        )
+
+    async def stream(self, stock_codes: List[str]) -> AsyncIterator[Tuple[str, str, Any]]:
+        """완료되는 순서대로 (종류, 종목코드, 결과) 반환
+
+        종류: "analyzed"(AnalyzedStock), "skipped"(차트 없음), "failed"(실패 사유)
+        소비자가 중간에 멈추면(클라이언트 연결 종료 등) 남은 작업은 취소됩니다.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def worker(stock_code: str) -> Tuple[str, str, Any]:
+            async with semaphore:
+                try:
+                    analyzed = await asyncio.wait_for(
+                        self.analyze_stock(stock_code), timeout=self.stock_timeout
+                    )
+                except asyncio.TimeoutError:
+                    logger.warning(f"종목 분석 시간 초과 {stock_code}")
+                    STOCK_FAILURES.inc(reason="timeout")
+                    return "failed", stock_code, f"시간 초과 ({self.stock_timeout:.1f}초)"
+                except Exception as e:
+                    logger.error(f"종목 분석 실패 {stock_code}: {str(e)}")
+                    STOCK_FAILURES.inc(reason=failure_reason(e))
+                    return "failed", stock_code, str(e)
+
+            if analyzed is None:
+                return "skipped", stock_code, None
+
+            logger.info(f"분석 완료: {analyzed.stock_info.name} ({stock_code})")
+            return "analyzed", stock_code, analyzed
+
+        tasks = [asyncio.ensure_future(worker(code)) for code in stock_codes]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def run(self, stock_codes: List[str]) -> PipelineResult:
+        """모든 종목을 동시성 한도 내에서 병렬 분석"""
+        result = PipelineResult()
+
+        async for kind, stock_code, payload in self.stream(stock_codes):
+            if kind == "analyzed":
+                result.stocks.append(payload)
+            elif kind == "skipped":
+                result.skipped.append(stock_code)
+            else:
+                result.failed[stock_code] = payload
+
+        return result
+
+    def shutdown(self):
+        """스레드/프로세스 풀 정리"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self.indicator_pool is not None:
+            self.indicator_pool.shutdown()
@@ -0,0 +1,207 @@
+import os
+import time
+import importlib.util
+import logging
+from typing import List, Dict, Any, Optional
+
+import httpx
+
+from kiwoom_auth import KiwoomAuth
+from kiwoom_service import KiwoomRequestBuilder, RequestSpec
+from rate_limiter import RequestScheduler
+from ohlcv_store import OHLCVStore
+from ttl_cache import KiwoomCache
+from stock_master import StockMaster
+from realtime_quotes import TickBook
+from bar_series import BarSeries
+from metrics import KIWOOM_REQUEST_SECONDS, KIWOOM_REQUESTS
+from resilience import BrokerResilience, KiwoomAPIError, check_rate_limited, rate_limit_error, classify_error
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncKiwoomService(KiwoomRequestBuilder):
+    """키움증권 API 비동기 서비스
+
+    하나의 공유 커넥션 풀(keep-alive, 가능하면 HTTP/2)을 사용하므로
+    호출마다 TCP/TLS 연결을 새로 맺지 않습니다. 클라이언트는 `open()`으로
+    생성하고 `aclose()`로 정리하며, FastAPI 앱 수명주기에 맞춰 호출합니다.
+    """
+
+    def __init__(
+        self,
+        auth: Optional[KiwoomAuth] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        ohlcv_store: Optional[OHLCVStore] = None,
+        cache: Optional[KiwoomCache] = None,
+        stock_master: Optional[StockMaster] = None,
+        tick_book: Optional[TickBook] = None,
+        resilience: Optional[BrokerResilience] = None,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        timeout: Optional[float] = None,
+        http2: Optional[bool] = None,
+    ):
+        super().__init__(auth, scheduler, ohlcv_store, cache, stock_master, tick_book, resilience)
+        self.limits = httpx.Limits(
+            max_connections=max_connections or int(os.getenv("KIWOOM_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=max_keepalive_connections or int(os.getenv("KIWOOM_MAX_KEEPALIVE", "10")),
+            keepalive_expiry=keepalive_expiry or float(os.getenv("KIWOOM_KEEPALIVE_EXPIRY", "30")),
+        )
+        self.timeout = timeout or float(os.getenv("KIWOOM_TIMEOUT", "5"))
+
+        # HTTP/2는 h2 패키지가 설치된 경우에만 사용
+        h2_available = importlib.util.find_spec("h2") is not None
+        self.http2 = h2_available if http2 is None else (http2 and h2_available)
+
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def open(self):
+        """공유 HTTP 클라이언트 생성"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=self.timeout,
+                http2=self.http2,
+            )
+            logger.info(
+                f"키움 HTTP 클라이언트 시작 (http2={self.http2}, "
+                f"max_connections={self.limits.max_connections})"
+            )
+
+    async def aclose(self):
+        """공유 HTTP 클라이언트 종료"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            raise RuntimeError("AsyncKiwoomService가 시작되지 않았습니다. open()을 먼저 호출하세요.")
+        return self._client
+
+    async def _get_json(self, spec: RequestSpec) -> Dict[str, Any]:
+        """재시도/서킷 브레이커/헤지를 거쳐 요청 전송"""
+        return await self.resilience.call(spec[1]["tr_id"], lambda: self._attempt_json(spec))
+
+    def _headers(self, tr_id: str) -> Dict[str, str]:
+        # 토큰은 공유 저장소 조회/갱신이 필요할 수 있어 전송 직전에 비동기로 붙임 (_attempt_json)
+        return {**self.auth.app_headers(), "tr_id": tr_id}
+
+    async def _attempt_json(self, spec: RequestSpec) -> Dict[str, Any]:
+        """스케줄러 허가를 받은 뒤 요청 1회 전송"""
+        url, headers, params = spec
+        tr_id = headers["tr_id"]
+        headers = {"Authorization": f"Bearer {await self.auth.get_access_token_async()}", **headers}
+        await self.scheduler.acquire(tr_id)
+        start = time.perf_counter()
+        try:
+            response = await self.client.get(url, headers=headers, params=params)
+            response.raise_for_status()
+            data = response.json()
+            check_rate_limited(tr_id, data)
+        except httpx.HTTPStatusError as e:
+            KIWOOM_REQUESTS.inc(tr_id=tr_id, status="error")
+            raise (rate_limit_error(tr_id, e.response) or classify_error(tr_id, e)) from e
+        except (httpx.HTTPError, KiwoomAPIError):
+            KIWOOM_REQUESTS.inc(tr_id=tr_id, status="error")
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            KIWOOM_REQUEST_SECONDS.observe(elapsed, tr_id=tr_id)
+        KIWOOM_REQUESTS.inc(tr_id=tr_id, status="ok")
+        self.resilience.observe_latency(tr_id, elapsed)
+        return data
+
+    async def search_by_condition(self, condition_name: str) -> List[str]:
+        """사용자 조건검색식으로 종목 검색"""
+        try:
+            data = await self._get_json(self.build_condition_request(condition_name))
+        except KiwoomAPIError as e:
+            raise e.with_context("조건검색 API 호출 실패") from e
+
+        return self.parse_condition_response(data)
+
+    async def get_stock_price(self, stock_code: str) -> Dict[str, Any]:
+        """종목의 현재가 정보 조회"""
+        quote = self.live_quote(stock_code)
+        if quote is not None:
+            return quote
+        if self.cache is None:
+            return await self._fetch_price(stock_code)
+        return await self.cache.quotes.get_or_load(stock_code, lambda: self._fetch_price(stock_code))
+
+    async def _fetch_price(self, stock_code: str) -> Dict[str, Any]:
+        try:
+            data = await self._get_json(self.build_price_request(stock_code))
+        except KiwoomAPIError as e:
+            raise e.with_context("현재가 조회 API 호출 실패") from e
+
+        return self.parse_price_response(data)
+
+    async def get_stock_chart_data(self, stock_code: str, period: str = "D", count: int = 30) -> BarSeries:
+        """종목의 차트 데이터 조회 (기술지표 계산용)"""
+        if self.cache is None:
+            chart_data = await self._load_chart(stock_code, period, count)
+        else:
+            chart_data = await self.cache.charts.get_or_load(
+                (stock_code, period, count),
+                lambda: self._load_chart(stock_code, period, count),
+                ttl=self.cache.chart_ttl()
+            )
+        return self.with_intraday(stock_code, chart_data, period, count)
+
+    async def _load_chart(self, stock_code: str, period: str, count: int) -> BarSeries:
+        if self.ohlcv_store is None or period != "D":
+            return await self._fetch_chart(stock_code, period, count=count)
+
+        # 마지막 저장일 이후 구간만 조회해 저장소에 이어 붙임 (count개에 못 미치면 과거 구간 보충)
+        start_date = self.ohlcv_store.fetch_start_date(stock_code, count)
+        if start_date is not None:
+            bars = await self._fetch_range(stock_code, period, start_date)
+            self.ohlcv_store.upsert_bars(stock_code, bars, start_date=start_date)
+
+        return self.ohlcv_store.load_bars(stock_code, count)
+
+    async def _fetch_range(self, stock_code: str, period: str, start_date: str) -> BarSeries:
+        """start_date부터 오늘까지 (응답이 최대 행 수로 잘리면 이전 구간을 이어서 조회)"""
+        pages = [await self._fetch_chart(stock_code, period, start_date=start_date, count=None)]
+        end_date = self.next_chart_page(start_date, pages[-1], len(pages))
+        while end_date is not None:
+            pages.append(await self._fetch_chart(stock_code, period, start_date=start_date, end_date=end_date, count=None))
+            end_date = self.next_chart_page(start_date, pages[-1], len(pages))
+        return BarSeries.concat(pages[::-1])
+
+    async def _fetch_chart(self, stock_code: str, period: str, start_date: str = "", count: Optional[int] = 30,
+                           end_date: str = "") -> BarSeries:
+        try:
+            data = await self._get_json(self.build_chart_request(stock_code, period, start_date, end_date))
+        except KiwoomAPIError as e:
+            raise e.with_context("차트 데이터 조회 API 호출 실패") from e
+
+        return self.parse_chart_response(data, count)
+
+    async def get_stock_name(self, stock_code: str) -> str:
+        """종목코드로 종목명 조회"""
+        name = self.stock_master.name(stock_code) if self.stock_master is not None else None
+        if name:
+            return name
+        if self.cache is None:
+            return await self._fetch_name(stock_code)
+        # 기본값(조회 실패)은 캐시하지 않음
+        return await self.cache.names.get_or_load(
+            stock_code,
+            lambda: self._fetch_name(stock_code),
+            should_cache=lambda name: name != self.default_name(stock_code)
+        )
+
+    async def _fetch_name(self, stock_code: str) -> str:
+        try:
+            data = await self._get_json(self.build_name_request(stock_code))
+        except KiwoomAPIError as e:
+            logger.warning(f"종목명 조회 실패 {stock_code}, 기본값 사용: {str(e)}")
+            return self.default_name(stock_code)  # 에러시 기본값 반환 (캐시하지 않음)
+
+        return self.parse_name_response(data, stock_code)
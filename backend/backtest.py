@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+골든크로스 전략 벡터화 백테스트
+
+ConditionService.meets_all_conditions의 조건과 generate_trading_strategy의
+신뢰도 계산을 과거 일봉 전 구간에 그대로 재현해 신호, 선행 수익률,
+적중률, 신뢰도 구간별 보정(calibration)을 계산합니다.
+
+사용 예:
+    python backtest.py --horizons 1,5,20 --workers 4
+    python backtest.py --codes 005930,000660 --rsi-min 60 --volume-mult 2.0
+"""
+
+import os
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from condition_service import ConditionService
+from batch_indicators import BatchIndicatorEngine, ChartData, pack_columns
+
+CONFIDENCE_BINS = (0.0, 0.2, 0.4, 0.5, 0.6, 0.7, 0.8, 1.0)
+
+
+@dataclass
+class BacktestRules:
+    """검증할 조건 임계값 (기본값은 실제 검색 조건과 동일)"""
+    rsi_min: float = ConditionService.RSI_MIN
+    macd_osc_min: float = ConditionService.MACD_OSC_MIN
+    volume_ratio_min: float = ConditionService.VOLUME_RATIO_MIN
+    window: Optional[int] = 30  # 검색과 같은 30봉 창으로 재계산 (None이면 전체 이력 기준)
+
+
+@dataclass
+class BacktestReport:
+    """백테스트 결과"""
+    rules: Dict
+    horizons: List[int]
+    stocks: int = 0
+    bars: int = 0
+    signals: List[Dict] = field(default_factory=list)  # 종목코드, 일자, 신뢰도, 선행 수익률
+    summary: Dict = field(default_factory=dict)
+    calibration: List[Dict] = field(default_factory=list)
+
+
+def confidence_scores(rsi: np.ndarray, macd_osc: np.ndarray, volume_ratio: np.ndarray,
+                      rules: Optional[BacktestRules] = None) -> np.ndarray:
+    """generate_trading_strategy와 같은 매수 신뢰도 (벡터화)
+
+    임계값은 검증 중인 rules 기준 (기본값이면 generate_trading_strategy와 동일)
+    """
+    rules = rules or BacktestRules()
+    rsi_strength = np.clip((rsi - rules.rsi_min) / 15, 0.0, 1.0)
+    macd_strength = np.clip((macd_osc - rules.macd_osc_min) / 100, 0.0, 1.0)
+    volume_strength = np.clip((volume_ratio - rules.volume_ratio_min) / 1.0, 0.0, 1.0)
+    return (rsi_strength + macd_strength + volume_strength) / 3
+
+
+def forward_returns(closes: np.ndarray, horizon: int) -> np.ndarray:
+    """h봉 뒤 수익률 (범위를 벗어나면 NaN)"""
+    result = np.full(closes.shape, np.nan)
+    if closes.shape[1] > horizon:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result[:, :-horizon] = closes[:, horizon:] / closes[:, :-horizon] - 1
+    return result
+
+
+def evaluate_signals(closes: np.ndarray, volumes: np.ndarray, rules: BacktestRules) -> Dict[str, np.ndarray]:
+    """모든 봉에서 검색 조건 충족 여부와 신뢰도 계산 (종목 x 봉)"""
+    engine = BatchIndicatorEngine()
+    n_stocks, n_bars = closes.shape
+    window = rules.window
+
+    if window is None:
+        series = engine.compute_series(closes, volumes)
+        lengths = np.cumsum(~np.isnan(closes), axis=1)
+        tema, dema = series["tema_20"], series["dema_10"]
+        tema_prev = np.concatenate([np.full((n_stocks, 1), np.nan), tema[:, :-1]], axis=1)
+        dema_prev = np.concatenate([np.full((n_stocks, 1), np.nan), dema[:, :-1]], axis=1)
+        rsi = np.where(lengths >= 15, series["rsi_14"], 50.0)
+        macd = np.where(lengths >= 26, series["macd_oscillator"], 0.0)
+        volume_ratio = series["volume_ratio"]
+        golden_cross = (lengths >= 21) & (tema > dema) & (tema_prev < dema_prev)
+    else:
+        # 각 봉을 끝으로 하는 최근 window개 봉으로 검색과 동일하게 계산
+        # (앞쪽을 NaN으로 채워 이력이 짧은 구간도 보유 봉만으로 판단)
+        padding = np.full((n_stocks, window - 1), np.nan)
+        close_windows = sliding_window_view(np.hstack([padding, closes]), window, axis=1).reshape(-1, window)
+        volume_windows = sliding_window_view(np.hstack([padding, volumes]), window, axis=1).reshape(-1, window)
+        result = engine.compute(close_windows, volume_windows)
+        golden_cross = result["golden_cross"].reshape(n_stocks, n_bars)
+        rsi = result["rsi_14"].reshape(n_stocks, n_bars)
+        macd = result["macd_oscillator"].reshape(n_stocks, n_bars)
+        volume_ratio = result["volume_ratio"].reshape(n_stocks, n_bars)
+
+    meets = (
+        golden_cross
+        & (macd > rules.macd_osc_min)
+        & (rsi > rules.rsi_min)
+        & (volume_ratio > rules.volume_ratio_min)
+        & ~np.isnan(closes)
+    )
+    return {"meets": meets, "confidence": confidence_scores(rsi, macd, volume_ratio, rules)}
+
+
+def _backtest_chunk(args: Tuple[List[str], List[ChartData], BacktestRules, Sequence[int]]) -> Dict:
+    """종목 묶음 하나를 처리 (프로세스 풀 작업 단위)"""
+    codes, chart_data_list, rules, horizons = args
+    closes = pack_columns(chart_data_list, "close")
+    volumes = pack_columns(chart_data_list, "volume")
+    dates = np.nan_to_num(pack_columns(chart_data_list, "date")).astype(np.int64)  # 봉이 없는 칸은 0
+
+    evaluated = evaluate_signals(closes, volumes, rules)
+    meets, confidence = evaluated["meets"], evaluated["confidence"]
+    returns = {h: forward_returns(closes, h) for h in horizons}
+
+    rows, cols = np.nonzero(meets)
+    signals = [
+        {
+            "code": codes[i],
+            "date": str(int(dates[i, j])),
+            "confidence": float(confidence[i, j]),
+            **{f"return_{h}": (None if np.isnan(returns[h][i, j]) else float(returns[h][i, j])) for h in horizons},
+        }
+        for i, j in zip(rows, cols)
+    ]
+
+    # 전체 봉 기준 수익률 (조건 없는 기준선)
+    baseline = {}
+    for h in horizons:
+        valid = returns[h][~np.isnan(returns[h])]
+        baseline[h] = (int(valid.size), float(valid.sum()), int((valid > 0).sum()))
+
+    return {"signals": signals, "baseline": baseline, "bars": int(np.sum(~np.isnan(closes)))}
+
+
+def _summarize(values: List[float]) -> Dict:
+    if not values:
+        return {"count": 0, "hit_rate": None, "mean_return": None, "median_return": None}
+    array = np.asarray(values)
+    return {
+        "count": int(array.size),
+        "hit_rate": float(np.mean(array > 0)),
+        "mean_return": float(np.mean(array)),
+        "median_return": float(np.median(array)),
+    }
+
+
+def run_backtest(
+    bars_by_code: Dict[str, ChartData],
+    rules: Optional[BacktestRules] = None,
+    horizons: Sequence[int] = (1, 5, 10, 20),
+    workers: Optional[int] = None,
+    chunk_size: int = 100,
+) -> BacktestReport:
+    """종목별 일봉(과거 -> 최근 순)으로 백테스트 실행"""
+    rules = rules or BacktestRules()
+    horizons = list(horizons)
+    codes = [code for code, bars in bars_by_code.items() if bars]
+    chunks = [
+        (codes[i:i + chunk_size], [bars_by_code[c] for c in codes[i:i + chunk_size]], rules, horizons)
+        for i in range(0, len(codes), chunk_size)
+    ]
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            results = list(pool.map(_backtest_chunk, chunks))
+    else:
+        results = [_backtest_chunk(chunk) for chunk in chunks]
+
+    report = BacktestReport(rules=asdict(rules), horizons=horizons, stocks=len(codes))
+    baseline_totals = {h: [0, 0.0, 0] for h in horizons}
+    for result in results:
+        report.signals.extend(result["signals"])
+        report.bars += result["bars"]
+        for h, (count, total, hits) in result["baseline"].items():
+            baseline_totals[h][0] += count
+            baseline_totals[h][1] += total
+            baseline_totals[h][2] += hits
+    report.signals.sort(key=lambda s: (s["date"], s["code"]))
+
+    report.summary = {"signals": len(report.signals)}
+    for h in horizons:
+        count, total, hits = baseline_totals[h]
+        report.summary[f"horizon_{h}"] = {
+            **_summarize([s[f"return_{h}"] for s in report.signals if s[f"return_{h}"] is not None]),
+            "baseline_hit_rate": hits / count if count else None,
+            "baseline_mean_return": total / count if count else None,
+        }
+
+    # 신뢰도 구간별 보정: 신뢰도가 높을수록 실제 적중률/수익률도 높은지 확인
+    for low, high in zip(CONFIDENCE_BINS[:-1], CONFIDENCE_BINS[1:]):
+        in_bin = [s for s in report.signals if low <= s["confidence"] < high or (high == 1.0 and s["confidence"] == 1.0)]
+        report.calibration.append({
+            "bucket": f"{low:.1f}-{high:.1f}",
+            **{f"horizon_{h}": _summarize([s[f"return_{h}"] for s in in_bin if s[f"return_{h}"] is not None]) for h in horizons},
+        })
+
+    return report
+
+
+def main():
+    """저장소(OHLCVStore)의 일봉으로 백테스트 실행"""
+    from ohlcv_store import OHLCVStore
+
+    parser = argparse.ArgumentParser(description="골든크로스 전략 백테스트")
+    parser.add_argument("--store", help="일봉 저장소 경로 (기본: OHLCV_STORE_PATH)")
+    parser.add_argument("--codes", help="콤마 구분 종목코드 (기본: 저장된 전체 종목)")
+    parser.add_argument("--horizons", default="1,5,10,20", help="선행 수익률 기간(봉)")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--rsi-min", type=float, default=ConditionService.RSI_MIN)
+    parser.add_argument("--macd-min", type=float, default=ConditionService.MACD_OSC_MIN)
+    parser.add_argument("--volume-mult", type=float, default=ConditionService.VOLUME_RATIO_MIN)
+    parser.add_argument("--window", type=int, default=30, help="지표 계산 창 (0이면 전체 이력)")
+    parser.add_argument("--signals", action="store_true", help="개별 신호 목록도 출력")
+    args = parser.parse_args()
+
+    store = OHLCVStore(args.store)
+    codes = args.codes.split(",") if args.codes else store.codes()
+    bars_by_code = store.load_many(codes)
+    store.close()
+
+    rules = BacktestRules(
+        rsi_min=args.rsi_min,
+        macd_osc_min=args.macd_min,
+        volume_ratio_min=args.volume_mult,
+        window=args.window or None,
+    )
+    report = run_backtest(
+        bars_by_code,
+        rules=rules,
+        horizons=[int(h) for h in args.horizons.split(",")],
+        workers=args.workers,
+    )
+
+    output = asdict(report)
+    if not args.signals:
+        output.pop("signals")
+    print(json.dumps(output, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
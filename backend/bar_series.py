@@ -0,0 +1,182 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+FIELDS = ("open", "high", "low", "close", "volume")
+
+
+class BarSeries:
+    """일봉 열(column) 기반 컨테이너 (과거 -> 최근 순)
+
+    봉마다 dict를 만드는 대신 일자(int64, YYYYMMDD)와 시가/고가/저가/종가/거래량
+    (float64) 배열을 하나씩 보관합니다. 슬라이싱은 배열 view를 공유하므로 복사가
+    없고(`previous`, `tail`), 지표 계산은 열 배열을 그대로 사용합니다.
+
+    캐시된 시리즈를 여러 요청이 함께 쓰므로 배열은 읽기 전용입니다.
+    봉 단위 접근(`series[-1]`, 반복)은 호환용으로 dict를 만들어 돌려줍니다.
+    """
+
+    __slots__ = ("dates", "open", "high", "low", "close", "volume")
+
+    def __init__(self, dates, open, high, low, close, volume):
+        self.dates = self._column(dates, np.int64)
+        self.open = self._column(open, np.float64)
+        self.high = self._column(high, np.float64)
+        self.low = self._column(low, np.float64)
+        self.close = self._column(close, np.float64)
+        self.volume = self._column(volume, np.float64)
+
+    def __reduce__(self):
+        # 복원시에도 생성자를 거쳐 읽기 전용/연속 배열 유지 (공유 캐시, 프로세스 간 전달)
+        return BarSeries, tuple(getattr(self, name) for name in self.__slots__)
+
+    @staticmethod
+    def _column(values, dtype) -> np.ndarray:
+        array = np.ascontiguousarray(values, dtype=dtype)
+        array.flags.writeable = False
+        return array
+
+    # ---- 생성 ----
+
+    @classmethod
+    def empty(cls) -> "BarSeries":
+        return cls(*([()] * 6))
+
+    @classmethod
+    def from_records(cls, records: Sequence[Dict[str, Any]]) -> "BarSeries":
+        """봉 dict 리스트({"date", "open", "high", "low", "close", "volume"})로 생성"""
+        if not records:
+            return cls.empty()
+        return cls(
+            [int(bar["date"]) for bar in records],
+            *([bar[field] for bar in records] for field in FIELDS),
+        )
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Tuple]) -> "BarSeries":
+        """(date, open, high, low, close, volume) 튜플 리스트로 생성"""
+        if not rows:
+            return cls.empty()
+        table = np.array(rows, dtype=np.float64)
+        return cls(table[:, 0].astype(np.int64), *table[:, 1:].T)
+
+    @classmethod
+    def concat(cls, parts: Sequence["BarSeries"]) -> "BarSeries":
+        """시간 순으로 이어지는 시리즈들을 하나로 (겹치는 일자는 뒤 시리즈 우선)"""
+        parts = [part for part in parts if len(part)]
+        if len(parts) <= 1:
+            return parts[0] if parts else cls.empty()
+        merged = parts[0]
+        for part in parts[1:]:
+            merged = merged.before(int(part.dates[0]))
+            merged = cls(*(np.concatenate((getattr(merged, name), getattr(part, name))) for name in cls.__slots__))
+        return merged
+
+    @classmethod
+    def of(cls, chart_data: Union["BarSeries", Sequence[Dict[str, Any]], None]) -> "BarSeries":
+        """BarSeries는 그대로, 봉 dict 리스트는 변환"""
+        if isinstance(chart_data, BarSeries):
+            return chart_data
+        return cls.from_records(chart_data or [])
+
+    # ---- 조회 ----
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return BarSeries(self.dates[key], self.open[key], self.high[key], self.low[key],
+                             self.close[key], self.volume[key])
+        return self.bar(key)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(len(self)):
+            yield self.bar(i)
+
+    def __repr__(self) -> str:
+        if not len(self):
+            return "BarSeries(0 bars)"
+        return f"BarSeries({len(self)} bars, {self.dates[0]}~{self.dates[-1]})"
+
+    def bar(self, index: int) -> Dict[str, Any]:
+        """봉 하나 (차트 데이터 dict 형식)"""
+        return {
+            "date": str(int(self.dates[index])),
+            "open": float(self.open[index]),
+            "high": float(self.high[index]),
+            "low": float(self.low[index]),
+            "close": float(self.close[index]),
+            "volume": int(self.volume[index]),
+        }
+
+    def column(self, field: str) -> np.ndarray:
+        return self.dates if field == "date" else getattr(self, field)
+
+    @property
+    def previous(self) -> "BarSeries":
+        """마지막 봉을 뺀 view (전일 기준 계산용)"""
+        return self[:-1]
+
+    def tail(self, count: Optional[int]) -> "BarSeries":
+        """최근 count개 view (None이면 전체)"""
+        return self if count is None or count >= len(self) else self[len(self) - count:]
+
+    def before(self, date: int) -> "BarSeries":
+        """date 이전 일자의 봉 view"""
+        return self[:int(np.searchsorted(self.dates, date, side="left"))]
+
+    @property
+    def last_date(self) -> Optional[int]:
+        return int(self.dates[-1]) if len(self) else None
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in self.__slots__)
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """봉 dict 리스트 (JSON 응답/저장용)"""
+        return list(self)
+
+    def rows(self) -> Iterable[Tuple[str, float, float, float, float, int]]:
+        """(date, open, high, low, close, volume) 튜플 (저장용)"""
+        for d, o, h, l, c, v in zip(self.dates.tolist(), self.open.tolist(), self.high.tolist(),
+                                    self.low.tolist(), self.close.tolist(), self.volume.tolist()):
+            yield str(d), o, h, l, c, int(v)
+
+    # ---- 변경 (새 시리즈 반환) ----
+
+    def period_keys(self, period: str) -> np.ndarray:
+        """봉별 소속 구간 번호 - W: 월요일 시작 주, M: 월(YYYYMM)"""
+        if period == "M":
+            return self.dates // 100
+        if period == "W":
+            months = (self.dates // 10000 - 1970) * 12 + self.dates // 100 % 100 - 1
+            epoch_days = months.astype("datetime64[M]").astype("datetime64[D]").astype(np.int64) + self.dates % 100 - 1
+            return (epoch_days + 3) // 7  # 1970-01-01은 목요일
+        raise ValueError(f"지원하지 않는 주기: {period}")
+
+    def resample(self, period: str) -> "BarSeries":
+        """주봉(W)/월봉(M)으로 집계 (D면 그대로)
+
+        시가는 구간 첫 봉, 종가는 마지막 봉, 고가/저가는 최대/최소, 거래량은 합계이며
+        일자는 구간의 마지막 거래일입니다. 진행 중인 구간은 그때까지의 봉으로 집계합니다.
+        """
+        if period == "D" or not len(self):
+            return self
+        keys = self.period_keys(period)
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        ends = np.r_[starts[1:], len(self)] - 1
+        return BarSeries(
+            self.dates[ends], self.open[starts],
+            np.maximum.reduceat(self.high, starts), np.minimum.reduceat(self.low, starts),
+            self.close[ends], np.add.reduceat(self.volume, starts),
+        )
+
+    def with_bar(self, date: int, open: float, high: float, low: float, close: float, volume: float) -> "BarSeries":
+        """마지막 봉과 같은 일자면 교체, 이후 일자면 추가한 새 시리즈"""
+        base = self[:-1] if len(self) and self.dates[-1] == date else self
+        return BarSeries(
+            np.append(base.dates, date), np.append(base.open, open), np.append(base.high, high),
+            np.append(base.low, low), np.append(base.close, close), np.append(base.volume, volume),
+        )
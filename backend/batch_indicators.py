@@ -0,0 +1,221 @@
+import numpy as np
+from typing import List, Dict, Any, Sequence, Tuple, Union
+
+from stock_models import TechnicalIndicators
+from bar_series import BarSeries
+
+ChartData = Union[BarSeries, List[Dict[str, Any]]]
+
+
+def pack_columns(chart_data_list: Sequence[ChartData], field: str) -> np.ndarray:
+    """종목별 차트 데이터를 (종목 x 봉) 배열로 변환
+
+    길이가 다른 종목은 오른쪽(최근) 정렬하고 앞쪽을 NaN으로 채웁니다.
+    BarSeries는 열 배열을 그대로 복사하고, 봉 dict 리스트는 변환해서 씁니다.
+    """
+    width = max((len(bars) for bars in chart_data_list), default=0)
+    packed = np.full((len(chart_data_list), width), np.nan)
+    for i, bars in enumerate(chart_data_list):
+        if len(bars):
+            packed[i, width - len(bars):] = BarSeries.of(bars).column(field)
+    return packed
+
+
+def ewm_mean(values: np.ndarray, span: int) -> np.ndarray:
+    """지수이동평균 - pandas `ewm(span=span).mean()`(adjust=True)과 동일
+
+    봉 축으로만 반복하고 종목 축은 벡터 연산으로 처리합니다.
+    앞쪽 NaN은 관측치가 없는 것으로 보고 건너뜁니다.
+    """
+    decay = 1.0 - 2.0 / (span + 1.0)
+    n_stocks, n_bars = values.shape
+    out = np.full((n_stocks, n_bars), np.nan)
+    num = np.zeros(n_stocks)
+    den = np.zeros(n_stocks)
+    for t in range(n_bars):
+        column = values[:, t]
+        valid = ~np.isnan(column)
+        num = decay * num + np.where(valid, column, 0.0)
+        den = decay * den + valid
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[:, t] = np.where(den > 0, num / den, np.nan)
+    return out
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """단순 이동평균 - 창 안에 NaN이 있으면 NaN (pandas `rolling(window).mean()`과 동일)"""
+    n_stocks, n_bars = values.shape
+    out = np.full((n_stocks, n_bars), np.nan)
+    if n_bars < window:
+        return out
+
+    valid = ~np.isnan(values)
+    sums = np.cumsum(np.where(valid, values, 0.0), axis=1)
+    counts = np.cumsum(valid, axis=1)
+    sums = np.concatenate([np.zeros((n_stocks, 1)), sums], axis=1)
+    counts = np.concatenate([np.zeros((n_stocks, 1), dtype=counts.dtype), counts], axis=1)
+
+    window_sum = sums[:, window:] - sums[:, :-window]
+    window_count = counts[:, window:] - counts[:, :-window]
+    out[:, window - 1:] = np.where(window_count == window, window_sum / window, np.nan)
+    return out
+
+
+class EmaStages:
+    """EMA 단계 메모이제이션 - 같은 (입력, 기간) EMA는 한 번만 계산
+
+    TEMA/DEMA/MACD가 공유하는 EMA 단계를 재사용하기 위한 캐시입니다.
+    """
+
+    def __init__(self, closes: np.ndarray):
+        self.closes = closes
+        self._cache: Dict[Tuple, np.ndarray] = {}
+
+    def ema(self, span: int, depth: int = 1) -> np.ndarray:
+        """종가에 EMA를 depth번 반복 적용한 결과"""
+        key = ("close", span, depth)
+        if key not in self._cache:
+            source = self.closes if depth == 1 else self.ema(span, depth - 1)
+            self._cache[key] = ewm_mean(source, span)
+        return self._cache[key]
+
+    def of(self, name: str, values: np.ndarray, span: int) -> np.ndarray:
+        """임의 시계열(name으로 식별)의 EMA"""
+        key = (name, span, 1)
+        if key not in self._cache:
+            self._cache[key] = ewm_mean(values, span)
+        return self._cache[key]
+
+    def tema(self, period: int) -> np.ndarray:
+        return 3 * self.ema(period, 1) - 3 * self.ema(period, 2) + self.ema(period, 3)
+
+    def dema(self, period: int) -> np.ndarray:
+        return 2 * self.ema(period, 1) - self.ema(period, 2)
+
+    def macd(self, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        macd_line = self.ema(fast) - self.ema(slow)
+        signal_line = self.of(f"macd_{fast}_{slow}", macd_line, signal)
+        return macd_line, signal_line, macd_line - signal_line
+
+
+def rsi_series(closes: np.ndarray, period: int = 14) -> np.ndarray:
+    """RSI 시계열 (단순 이동평균 방식, ConditionService.calculate_rsi와 동일)"""
+    delta = np.diff(closes, axis=1, prepend=np.nan)
+    gain = np.where(np.isnan(delta), np.nan, np.maximum(delta, 0.0))
+    loss = np.where(np.isnan(delta), np.nan, np.maximum(-delta, 0.0))
+    avg_gain = rolling_mean(gain, period)
+    avg_loss = rolling_mean(loss, period)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rs = avg_gain / avg_loss
+        return 100 - (100 / (1 + rs))
+
+
+def obv_series(closes: np.ndarray, volumes: np.ndarray) -> np.ndarray:
+    """OBV 누적 시계열"""
+    direction = np.sign(np.nan_to_num(np.diff(closes, axis=1)))
+    flow = direction * np.nan_to_num(volumes[:, 1:])
+    obv = np.zeros(closes.shape)
+    obv[:, 1:] = np.cumsum(flow, axis=1)
+    return obv
+
+
+class BatchIndicatorEngine:
+    """여러 종목의 기술지표를 한 번에 계산하는 벡터화 엔진
+
+    입력은 (종목 x 봉) 종가/거래량 배열이며, 결과는 ConditionService의
+    종목별 계산과 같은 값(데이터 부족시 기본값 포함)을 돌려줍니다.
+    """
+
+    def compute_series(self, closes: np.ndarray, volumes: np.ndarray) -> Dict[str, np.ndarray]:
+        """전 구간 지표 시계열 (종목 x 봉)"""
+        closes = np.asarray(closes, dtype=np.float64)
+        volumes = np.asarray(volumes, dtype=np.float64)
+        stages = EmaStages(closes)
+        _, _, macd_oscillator = stages.macd(12, 26, 9)
+        avg_volume_5 = rolling_mean(volumes, 5)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            volume_ratio = np.where(avg_volume_5 > 0, volumes / avg_volume_5, 1.0)
+
+        return {
+            "tema_20": stages.tema(20),
+            "dema_10": stages.dema(10),
+            "macd_oscillator": macd_oscillator,
+            "rsi_14": rsi_series(closes, 14),
+            "obv": obv_series(closes, volumes),
+            "avg_volume_5": avg_volume_5,
+            "volume_ratio": volume_ratio,
+        }
+
+    def compute(self, closes: np.ndarray, volumes: np.ndarray) -> Dict[str, np.ndarray]:
+        """최근 봉 기준 지표 값 (종목별 1차원 배열) 및 전일 TEMA/DEMA"""
+        closes = np.asarray(closes, dtype=np.float64)
+        volumes = np.asarray(volumes, dtype=np.float64)
+        n_stocks = closes.shape[0]
+        if closes.shape[1] == 0:
+            return self._defaults(n_stocks)
+
+        series = self.compute_series(closes, volumes)
+        lengths = np.sum(~np.isnan(closes), axis=1)
+
+        # 종목별 계산과 같은 데이터 부족 기본값 적용
+        tema = np.where(lengths >= 20, series["tema_20"][:, -1], 0.0)
+        dema = np.where(lengths >= 10, series["dema_10"][:, -1], 0.0)
+        macd = np.where(lengths >= 26, series["macd_oscillator"][:, -1], 0.0)
+        rsi = np.where(lengths >= 15, series["rsi_14"][:, -1], 50.0)
+        obv = np.where(lengths >= 2, series["obv"][:, -1], 0.0)
+
+        # 평균 거래량: 5봉 미만이면 보유 봉 전체 평균
+        last_volumes = volumes[:, -5:]
+        counts = np.sum(~np.isnan(last_volumes), axis=1)
+        avg_volume = np.nansum(last_volumes, axis=1) / np.maximum(counts, 1)
+        current_volume = np.nan_to_num(volumes[:, -1])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            volume_ratio = np.where(avg_volume > 0, current_volume / avg_volume, 1.0)
+
+        # 골든크로스 판단용 전일 값 (21봉 이상일 때만 의미 있음)
+        if closes.shape[1] >= 2:
+            tema_prev = series["tema_20"][:, -2]
+            dema_prev = series["dema_10"][:, -2]
+        else:
+            tema_prev = dema_prev = np.full(n_stocks, np.nan)
+
+        return {
+            "tema_20": tema,
+            "dema_10": dema,
+            "macd_oscillator": macd,
+            "rsi_14": rsi,
+            "obv": obv,
+            "avg_volume_5": avg_volume,
+            "volume_ratio": volume_ratio,
+            "tema_20_prev": tema_prev,
+            "dema_10_prev": dema_prev,
+            "golden_cross": (lengths >= 21) & (tema > dema) & (tema_prev < dema_prev),
+            "lengths": lengths,
+        }
+
+    @staticmethod
+    def _defaults(n_stocks: int) -> Dict[str, np.ndarray]:
+        zeros = np.zeros(n_stocks)
+        return {
+            "tema_20": zeros, "dema_10": zeros, "macd_oscillator": zeros,
+            "rsi_14": np.full(n_stocks, 50.0), "obv": zeros, "avg_volume_5": zeros,
+            "volume_ratio": np.ones(n_stocks), "tema_20_prev": zeros, "dema_10_prev": zeros,
+            "golden_cross": np.zeros(n_stocks, dtype=bool), "lengths": np.zeros(n_stocks, dtype=int),
+        }
+
+    def compute_from_chart_data(self, chart_data_list: Sequence[ChartData]) -> Dict[str, np.ndarray]:
+        """종목별 차트 데이터 리스트로부터 계산"""
+        return self.compute(pack_columns(chart_data_list, "close"), pack_columns(chart_data_list, "volume"))
+
+    @staticmethod
+    def to_technical_indicators(result: Dict[str, np.ndarray], index: int) -> TechnicalIndicators:
+        """배치 결과에서 한 종목의 TechnicalIndicators 추출"""
+        return TechnicalIndicators(
+            tema_20=float(result["tema_20"][index]),
+            dema_10=float(result["dema_10"][index]),
+            macd_oscillator=float(result["macd_oscillator"][index]),
+            rsi_14=float(result["rsi_14"][index]),
+            obv=float(result["obv"][index]),
+            avg_volume_5=float(result["avg_volume_5"][index]),
+            volume_ratio=float(result["volume_ratio"][index]),
+        )
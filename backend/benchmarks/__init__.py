@@ -0,0 +1 @@
+"""성능 벤치마크 도구 (모의 증권사 서버, 합성 데이터, 기준값 비교)"""
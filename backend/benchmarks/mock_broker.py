@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+모의 증권사 REST 서버 (벤치마크/개발용)
+
+조건검색, 현재가, 일봉, 종목정보 TR을 합성 데이터로 응답하며 응답 지연,
+지연 편차, 오류율, tr_id별 초당 호출 한도를 설정할 수 있습니다.
+
+사용 예:
+    python benchmarks/mock_broker.py --port 9000 --latency 30 --jitter 10 --error-rate 0.01
+    KIWOOM_BASE_URL=http://localhost:9000 python start.py
+"""
+
+import sys
+import time
+import random
+import socket
+import asyncio
+import argparse
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from rate_limiter import TokenBucket
+from benchmarks import synthetic
+
+
+@dataclass
+class MockBrokerConfig:
+    """모의 서버 동작 설정"""
+    latency: float = 0.02  # 기본 응답 지연(초)
+    jitter: float = 0.01  # 지연 편차(초, 균등분포 ±jitter)
+    error_rate: float = 0.0  # 무작위 HTTP 500 비율
+    rate_limits: Dict[str, float] = field(default_factory=dict)  # tr_id별 초당 한도 (없으면 무제한)
+    condition_size: int = 20  # 조건검색 결과 종목 수
+    universe: int = 500  # 전체 합성 종목 수
+    history_days: int = 200  # 종목별 일봉 이력 길이
+    seed: int = 0
+
+
+RATE_LIMITED = {"rt_cd": "1", "msg_cd": "EGW00201", "msg1": "초당 거래건수를 초과하였습니다."}
+
+
+def create_app(config: MockBrokerConfig) -> FastAPI:
+    """설정에 따라 응답하는 모의 증권사 앱"""
+    app = FastAPI(title="모의 증권사 API")
+    buckets = {tr_id: TokenBucket(rate) for tr_id, rate in config.rate_limits.items()}
+    stats = {"requests": 0, "errors": 0, "rate_limited": 0}
+    rng = random.Random(config.seed)
+    app.state.stats = stats
+
+    @app.middleware("http")
+    async def broker_behavior(request: Request, call_next):
+        stats["requests"] += 1
+        delay = config.latency + rng.uniform(-config.jitter, config.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        bucket = buckets.get(request.headers.get("tr_id", ""))
+        if bucket is not None:
+            if bucket.wait_time(time.monotonic()) > 0:
+                stats["rate_limited"] += 1
+                return JSONResponse(RATE_LIMITED, status_code=500)
+            bucket.consume()
+
+        if config.error_rate and rng.random() < config.error_rate:
+            stats["errors"] += 1
+            return JSONResponse({"rt_cd": "1", "msg1": "모의 서버 오류"}, status_code=500)
+        return await call_next(request)
+
+    @app.get("/uapi/domestic-stock/v1/trading/inquire-psearch-result")
+    async def condition_search(condition_name: str = ""):
+        return synthetic.condition_response(condition_name, config.condition_size, config.universe, config.seed)
+
+    @app.get("/uapi/domestic-stock/v1/quotations/inquire-price")
+    async def price(fid_input_iscd: str):
+        return synthetic.price_response(fid_input_iscd, config.history_days, config.seed)
+
+    @app.get("/uapi/domestic-stock/v1/quotations/inquire-daily-itemchartprice")
+    async def chart(fid_input_iscd: str, fid_input_date_1: str = "", fid_input_date_2: str = ""):
+        return synthetic.chart_response(
+            fid_input_iscd, config.history_days, config.seed, fid_input_date_1, fid_input_date_2
+        )
+
+    @app.get("/uapi/domestic-stock/v1/quotations/search-stock-info")
+    async def stock_info(MICR_DNVL_CNDC_1: str = ""):
+        return synthetic.name_response(MICR_DNVL_CNDC_1)
+
+    @app.get("/stats")
+    async def broker_stats():
+        return stats
+
+    return app
+
+
+def free_port(host: str = "127.0.0.1") -> int:
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+class MockBrokerServer:
+    """모의 서버를 별도 스레드의 uvicorn으로 실행"""
+
+    def __init__(self, config: Optional[MockBrokerConfig] = None, host: str = "127.0.0.1", port: Optional[int] = None):
+        import uvicorn
+
+        self.config = config or MockBrokerConfig()
+        self.host = host
+        self.port = port or free_port(host)
+        self.app = create_app(self.config)
+        self._server = uvicorn.Server(uvicorn.Config(
+            self.app, host=host, port=self.port, log_level="warning", access_log=False
+        ))
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return dict(self.app.state.stats)
+
+    def start(self, timeout: float = 10.0):
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError("모의 증권사 서버를 시작하지 못했습니다.")
+            time.sleep(0.01)
+
+    def stop(self):
+        self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "MockBrokerServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def parse_rate_limits(raw: str) -> Dict[str, float]:
+    """"FHKST01010100=10,CTPF1002R=5" 형식 파싱"""
+    limits = {}
+    for item in raw.split(","):
+        if "=" in item:
+            tr_id, rate = item.split("=", 1)
+            limits[tr_id.strip()] = float(rate)
+    return limits
+
+
+def add_config_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency", type=float, default=20.0, help="응답 지연(ms)")
+    parser.add_argument("--jitter", type=float, default=10.0, help="지연 편차(ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="무작위 오류 비율 (0~1)")
+    parser.add_argument("--rate-limits", default="", help="tr_id별 초당 한도 (예: FHKST01010100=10)")
+    parser.add_argument("--condition-size", type=int, default=20, help="조건검색 결과 종목 수")
+    parser.add_argument("--history-days", type=int, default=200, help="종목별 일봉 이력 길이")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def config_from_args(args: argparse.Namespace) -> MockBrokerConfig:
+    return MockBrokerConfig(
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        error_rate=args.error_rate,
+        rate_limits=parse_rate_limits(args.rate_limits),
+        condition_size=args.condition_size,
+        history_days=args.history_days,
+        seed=args.seed,
+    )
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="모의 증권사 REST 서버")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=9000)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    print(f"🏦 모의 증권사 서버: http://{args.host}:{args.port}")
+    uvicorn.run(create_app(config_from_args(args)), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+성능 벤치마크
+
+모의 증권사 서버를 띄우고 다음을 측정한 뒤 저장된 기준값(baseline.json)과 비교합니다.
+  - e2e: /api/search 처리량과 지연시간 백분위 (새로 계산 / 저장 결과 재사용)
+  - micro: ConditionService 및 지표 엔진의 종목당 계산 시간
+  - memory: 분석 종목(AnalyzedStock)과 차트 데이터의 종목당 메모리
+
+기준값보다 허용 비율(--tolerance) 이상 나빠진 항목이 있으면 종료 코드 1을 반환합니다.
+기준값은 실행 환경에 따라 달라지므로 같은 머신에서 --update-baseline으로 만들어 사용합니다.
+
+사용 예:
+    python benchmarks/run_benchmarks.py --update-baseline
+    python benchmarks/run_benchmarks.py --requests 200 --concurrency 20
+    python benchmarks/run_benchmarks.py --only micro,memory
+"""
+
+import os
+import gc
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from benchmarks import synthetic
+from benchmarks.mock_broker import MockBrokerServer, add_config_arguments, config_from_args
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+SECTIONS = ("e2e", "micro", "memory")
+
+
+def percentile(values: List[float], q: float) -> float:
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+def time_per_item(func: Callable[[], Any], items: int, repeat: int = 5) -> float:
+    """func 실행 시간의 중앙값을 항목 수로 나눈 값(마이크로초)"""
+    func()  # 워밍업
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples)) / items * 1e6
+
+
+# ---- e2e ----
+
+def configure_app_env(broker_url: str, workdir: str, app_rps: float):
+    """main 모듈을 불러오기 전에 모의 서버와 임시 저장소를 가리키도록 설정"""
+    os.environ["KIWOOM_BASE_URL"] = broker_url
+    os.environ.setdefault("KIWOOM_APP_KEY", "benchmark")
+    os.environ.setdefault("KIWOOM_APP_SECRET", "benchmark")
+    os.environ["OHLCV_STORE_PATH"] = os.path.join(workdir, "ohlcv.sqlite3")
+    os.environ["STOCK_MASTER_SNAPSHOT"] = os.path.join(workdir, "stock_master.json")
+    os.environ["STOCK_MASTER_URL"] = ""
+    os.environ["PRESCREEN_CONDITIONS"] = ""
+    os.environ["REALTIME_WS_URL"] = ""
+    os.environ["KIWOOM_GLOBAL_RPS"] = str(app_rps)
+    os.environ["KIWOOM_TR_LIMITS"] = ",".join(
+        f"{tr_id}={app_rps}" for tr_id in ("FHKST01010100", "FHKST03010100", "CTPF1002R", "PSEARCH_RESULT")
+    )
+
+
+async def _load(client, requests: int, concurrency: int, make_params: Callable[[int], Dict[str, Any]]) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(i)
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            i = queue.get_nowait()
+            start = time.perf_counter()
+            response = await client.post("/api/search", params=make_params(i))
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200 or response.json().get("failed_codes"):
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "throughput_per_s": requests / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "error_rate": errors / requests,
+    }
+
+
+async def _run_e2e(requests: int, concurrency: int) -> Dict[str, Dict[str, float]]:
+    import httpx
+    import main
+
+    logging.getLogger().setLevel(logging.WARNING)
+    results = {}
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60) as client:
+            # 매 요청 새로 계산 (조건명이 달라 요청 병합/결과 재사용 없음)
+            results["search_fresh"] = await _load(
+                client, requests, concurrency,
+                lambda i: {"condition_name": f"bench_{i}", "force_refresh": "true"},
+            )
+            # 같은 조건 반복 (저장된 결과 재사용)
+            await client.post("/api/search", params={"condition_name": "bench_cached"})
+            results["search_cached"] = await _load(
+                client, requests, concurrency, lambda i: {"condition_name": "bench_cached"},
+            )
+    return results
+
+
+def run_e2e(args) -> Dict[str, float]:
+    with tempfile.TemporaryDirectory() as workdir, MockBrokerServer(config_from_args(args)) as broker:
+        configure_app_env(broker.url, workdir, args.app_rps)
+        scenarios = asyncio.run(_run_e2e(args.requests, args.concurrency))
+        print(f"   모의 서버 통계: {broker.stats}")
+    return {f"e2e.{name}.{key}": value for name, values in scenarios.items() for key, value in values.items()}
+
+
+# ---- micro ----
+
+def run_micro(args) -> Dict[str, float]:
+    from condition_service import ConditionService
+    from batch_indicators import BatchIndicatorEngine, pack_columns
+    from streaming_indicators import IncrementalIndicators
+    from condition_dsl import ConditionPlan, DEFAULT_STRATEGIES
+
+    service = ConditionService()
+    charts = synthetic.generate_charts(args.stocks, days=30, seed=args.seed)
+    few = charts[:min(len(charts), 100)]
+
+    def per_stock_loop():
+        for chart in few:
+            indicators = service.calculate_indicators(chart)
+            service.meets_all_conditions(indicators, chart)
+
+    closes = pack_columns(charts, "close")
+    volumes = pack_columns(charts, "volume")
+    engine = BatchIndicatorEngine()
+    plan = ConditionPlan(DEFAULT_STRATEGIES)
+
+    history = synthetic.generate_bars("000100", days=200, seed=args.seed)
+    tick_bars = synthetic.generate_bars("000101", days=1000, seed=args.seed)
+    ticks = list(zip(tick_bars.close.tolist(), tick_bars.volume.tolist()))
+    incremental = IncrementalIndicators.from_chart_data(history)
+
+    def tick_loop():
+        for close, volume in ticks:
+            incremental.update_tick(close, volume)
+            incremental.current
+
+    return {
+        "micro.condition_service_per_stock_us": time_per_item(per_stock_loop, len(few)),
+        "micro.analyze_batch_per_stock_us": time_per_item(lambda: service.analyze_batch(charts), len(charts)),
+        "micro.batch_engine_per_stock_us": time_per_item(lambda: engine.compute(closes, volumes), len(charts)),
+        "micro.condition_plan_per_stock_us": time_per_item(lambda: plan.evaluate_chart_data(charts), len(charts)),
+        "micro.incremental_tick_us": time_per_item(tick_loop, len(ticks)),
+    }
+
+
+# ---- memory ----
+
+def _allocated_per_item(build: Callable[[], Any], items: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del kept
+    return (after - before) / items
+
+
+def run_memory(args) -> Dict[str, float]:
+    from condition_service import ConditionService
+    from analysis_pipeline import AnalysisPipeline
+
+    service = ConditionService()
+    pipeline = AnalysisPipeline(kiwoom_service=None, condition_service=service)
+    codes = synthetic.stock_codes(args.stocks)
+    charts = synthetic.generate_charts(args.stocks, days=30, seed=args.seed)
+    analyzed = service.analyze_batch(charts)
+    prices = [{"price": chart.close[-1], "change_percent": 0.0, "volume": int(chart.volume[-1])} for chart in charts]
+
+    def build_stocks():
+        return [
+            pipeline.compose(code, f"합성{code}", price, indicators, meets)
+            for code, price, (indicators, meets) in zip(codes, prices, analyzed)
+        ]
+
+    try:
+        return {
+            "memory.analyzed_stock_bytes": _allocated_per_item(build_stocks, len(codes)),
+            "memory.chart_30d_bytes": _allocated_per_item(
+                lambda: synthetic.generate_charts(args.stocks, days=30, seed=args.seed), len(codes)
+            ),
+            # 비교용: 봉 dict 리스트 형식
+            "memory.chart_30d_records_bytes": _allocated_per_item(
+                lambda: [synthetic.generate_ohlcv(code, 30, args.seed) for code in codes], len(codes)
+            ),
+        }
+    finally:
+        pipeline.shutdown()
+
+
+# ---- 기준값 비교 ----
+
+def higher_is_better(metric: str) -> bool:
+    return metric.endswith("_per_s")
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], tolerance: float) -> List[str]:
+    """허용 비율 이상 나빠진 항목 목록"""
+    regressions = []
+    print(f"\n{'항목':<48}{'기준값':>14}{'현재값':>14}{'변화':>10}")
+    for metric, value in results.items():
+        base = baseline.get(metric)
+        if base is None:
+            print(f"{metric:<48}{'-':>14}{value:>14.2f}{'new':>10}")
+            continue
+        if metric.endswith("error_rate"):
+            change = value - base
+            regressed = change > tolerance
+        else:
+            change = (value - base) / base if base else 0.0
+            regressed = -change > tolerance if higher_is_better(metric) else change > tolerance
+        mark = "  ❌" if regressed else ""
+        print(f"{metric:<48}{base:>14.2f}{value:>14.2f}{change:>+10.1%}{mark}")
+        if regressed:
+            regressions.append(metric)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="성능 벤치마크 (모의 증권사 서버 사용)")
+    parser.add_argument("--only", default=",".join(SECTIONS), help=f"실행할 항목 ({', '.join(SECTIONS)})")
+    parser.add_argument("--requests", type=int, default=100, help="e2e 시나리오별 요청 수")
+    parser.add_argument("--concurrency", type=int, default=10, help="e2e 동시 요청 수")
+    parser.add_argument("--stocks", type=int, default=1000, help="micro/memory 종목 수")
+    parser.add_argument("--app-rps", type=float, default=1000.0, help="앱 속도 제한 (TR별/전역 초당 호출)")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="기준값 파일")
+    parser.add_argument("--update-baseline", action="store_true", help="이번 결과를 기준값으로 저장")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="허용 성능 저하 비율")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    sections = [s.strip() for s in args.only.split(",") if s.strip()]
+    unknown = set(sections) - set(SECTIONS)
+    if unknown:
+        parser.error(f"알 수 없는 항목: {', '.join(sorted(unknown))}")
+
+    runners = {"e2e": run_e2e, "micro": run_micro, "memory": run_memory}
+    results: Dict[str, float] = {}
+    for section in sections:
+        print(f"⏱️  {section} 측정 중...")
+        results.update(runners[section](args))
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "results": {key: round(value, 3) for key, value in results.items()},
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n💾 기준값 저장: {baseline_path}")
+        for metric, value in report["results"].items():
+            print(f"{metric:<48}{value:>14.2f}")
+        return 0
+
+    if not baseline_path.exists():
+        print(f"\n⚠️  기준값 파일이 없습니다: {baseline_path} (--update-baseline으로 생성)")
+        for metric, value in report["results"].items():
+            print(f"{metric:<48}{value:>14.2f}")
+        return 0
+
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    regressions = compare(report["results"], baseline.get("results", {}), args.tolerance)
+    if regressions:
+        print(f"\n❌ 성능 저하 {len(regressions)}건 (허용 {args.tolerance:.0%}): {', '.join(regressions)}")
+        return 1
+    print(f"\n✅ 기준값 대비 성능 저하 없음 (허용 {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
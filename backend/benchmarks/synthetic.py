@@ -0,0 +1,127 @@
+"""
+벤치마크용 합성 데이터 생성기
+
+같은 (종목코드, seed)에는 항상 같은 값을 돌려주므로 실행 간 결과를 비교할 수 있습니다.
+"""
+
+import zlib
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from market_hours import latest_session_date, previous_trading_day
+from bar_series import BarSeries
+
+
+def stock_codes(count: int, start: int = 100) -> List[str]:
+    """6자리 합성 종목코드"""
+    return [f"{start + i:06d}" for i in range(count)]
+
+
+def _rng(key: str, seed: int) -> np.random.Generator:
+    return np.random.default_rng([zlib.crc32(key.encode("utf-8")), seed])
+
+
+def trading_days(days: int, end: Optional[date] = None) -> List[date]:
+    """end(기본: 최근 거래일)까지의 거래일 days개 (과거 -> 최근 순)"""
+    day = end or latest_session_date()
+    result = [day]
+    while len(result) < days:
+        day = previous_trading_day(day)
+        result.append(day)
+    return result[::-1]
+
+
+def generate_ohlcv(stock_code: str, days: int = 200, seed: int = 0, end: Optional[date] = None) -> List[Dict[str, Any]]:
+    """기하 브라운 운동 종가 + 간헐적 거래량 급증을 가진 일봉 (차트 데이터 형식)"""
+    rng = _rng(stock_code, seed)
+    base = float(rng.integers(50, 2000)) * 100
+    drift = rng.normal(0.0005, 0.001)
+    volatility = rng.uniform(0.01, 0.03)
+
+    closes = base * np.exp(np.cumsum(rng.normal(drift, volatility, days)))
+    opens = np.concatenate(([base], closes[:-1])) * (1 + rng.normal(0, volatility / 4, days))
+    highs = np.maximum(opens, closes) * (1 + np.abs(rng.normal(0, volatility / 2, days)))
+    lows = np.minimum(opens, closes) * (1 - np.abs(rng.normal(0, volatility / 2, days)))
+
+    volumes = rng.lognormal(np.log(rng.integers(10_000, 1_000_000)), 0.3, days)
+    spikes = rng.random(days) < 0.05
+    volumes[spikes] *= rng.uniform(2, 5, int(spikes.sum()))
+
+    return [
+        {
+            "date": day.strftime("%Y%m%d"),
+            "open": round(float(o)),
+            "high": round(float(h)),
+            "low": round(float(l)),
+            "close": round(float(c)),
+            "volume": int(v),
+        }
+        for day, o, h, l, c, v in zip(trading_days(days, end), opens, highs, lows, closes, volumes)
+    ]
+
+
+def generate_bars(stock_code: str, days: int = 200, seed: int = 0, end: Optional[date] = None) -> BarSeries:
+    """generate_ohlcv와 같은 일봉 (서비스가 돌려주는 BarSeries 형식)"""
+    return BarSeries.from_records(generate_ohlcv(stock_code, days, seed, end))
+
+
+def generate_charts(count: int, days: int = 30, seed: int = 0) -> List[BarSeries]:
+    """count개 종목의 일봉 목록"""
+    return [generate_bars(code, days, seed) for code in stock_codes(count)]
+
+
+# ---- 증권사 응답 형식 ----
+
+def condition_response(condition_name: str, count: int, universe: int, seed: int = 0) -> Dict[str, Any]:
+    """조건검색 결과: 종목 universe개 중 조건명별로 고정된 count개"""
+    rng = _rng(condition_name, seed)
+    picks = rng.choice(universe, size=min(count, universe), replace=False)
+    codes = stock_codes(universe)
+    return {"rt_cd": "0", "msg1": "정상처리", "output": [{"mksc_shrn_iscd": codes[i]} for i in sorted(picks)]}
+
+
+def price_response(stock_code: str, history_days: int, seed: int = 0) -> Dict[str, Any]:
+    bars = generate_ohlcv(stock_code, history_days, seed)
+    last, prev = bars[-1], bars[-2]
+    return {
+        "rt_cd": "0",
+        "msg1": "정상처리",
+        "output": {
+            "stck_prpr": str(last["close"]),
+            "prdy_ctrt": f"{(last['close'] / prev['close'] - 1) * 100:.2f}",
+            "acml_vol": str(last["volume"]),
+            "stck_hgpr": str(last["high"]),
+            "stck_lwpr": str(last["low"]),
+        },
+    }
+
+
+def chart_response(stock_code: str, history_days: int, seed: int = 0,
+                   start_date: str = "", end_date: str = "", max_rows: int = 100) -> Dict[str, Any]:
+    """일봉 응답 (최근 일자부터, 최대 max_rows개)"""
+    bars = generate_ohlcv(stock_code, history_days, seed)
+    if start_date:
+        bars = [bar for bar in bars if bar["date"] >= start_date]
+    if end_date:
+        bars = [bar for bar in bars if bar["date"] <= end_date]
+    return {
+        "rt_cd": "0",
+        "msg1": "정상처리",
+        "output2": [
+            {
+                "stck_bsop_date": bar["date"],
+                "stck_oprc": str(bar["open"]),
+                "stck_hgpr": str(bar["high"]),
+                "stck_lwpr": str(bar["low"]),
+                "stck_clpr": str(bar["close"]),
+                "acml_vol": str(bar["volume"]),
+            }
+            for bar in reversed(bars[-max_rows:])
+        ],
+    }
+
+
+def name_response(stock_code: str) -> Dict[str, Any]:
+    return {"rt_cd": "0", "msg1": "정상처리", "output": [{"prdt_abrv_name": f"합성{stock_code}"}]}
@@ -0,0 +1,416 @@
+import os
+import re
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from batch_indicators import ChartData, EmaStages, pack_columns, rolling_mean, rsi_series, obv_series
+from condition_service import ConditionService
+
+logger = logging.getLogger(__name__)
+
+
+class ConditionSyntaxError(Exception):
+    """조건식 문법 오류"""
+    pass
+
+
+# 지표 함수 정의: 이름 -> (기본 인자, 최소 봉 수 계산, 데이터 부족시 기본값)
+# 기본값은 ConditionService의 종목별 계산과 같게 맞춥니다. (None이면 NaN = 조건 불충족)
+INDICATORS: Dict[str, Tuple[Tuple[float, ...], Any, Optional[float]]] = {
+    "CLOSE": ((), lambda: 1, None),
+    "OPEN": ((), lambda: 1, None),
+    "HIGH": ((), lambda: 1, None),
+    "LOW": ((), lambda: 1, None),
+    "VOLUME": ((), lambda: 1, None),
+    "EMA": ((20,), lambda n: n, None),
+    "SMA": ((20,), lambda n: n, None),
+    "TEMA": ((20,), lambda n: n, 0.0),
+    "DEMA": ((10,), lambda n: n, 0.0),
+    "MACD": ((12, 26, 9), lambda fast, slow, signal: slow, 0.0),
+    "MACD_SIGNAL": ((12, 26, 9), lambda fast, slow, signal: slow, 0.0),
+    "MACD_OSC": ((12, 26, 9), lambda fast, slow, signal: slow, 0.0),
+    "RSI": ((14,), lambda n: n + 1, 50.0),
+    "OBV": ((), lambda: 2, 0.0),
+    "AVG_VOLUME": ((5,), lambda n: 1, 0.0),
+    "VOLUME_RATIO": ((5,), lambda n: 1, 1.0),
+}
+
+COMPARISONS = {">", ">=", "<", "<=", "==", "!="}
+CROSSES = {"CROSSES_ABOVE", "CROSSES_BELOW"}
+KEYWORDS = {"AND", "OR", "NOT"} | CROSSES
+BOOLEAN_NODES = {"cmp", "cross", "and", "or", "not"}
+
+_TOKEN_RE = re.compile(r"\s*(?:(\d+(?:\.\d+)?)|([A-Za-z_][A-Za-z0-9_]*)|(>=|<=|==|!=|[-+*/(),<>]))")
+
+
+def tokenize(text: str) -> List[Tuple[str, Any]]:
+    """조건식을 (종류, 값) 토큰 목록으로 분리"""
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN_RE.match(text, position)
+        if not match:
+            raise ConditionSyntaxError(f"알 수 없는 문자: '{text[position:].strip()[:10]}' (위치 {position})")
+        number, name, symbol = match.groups()
+        if number is not None:
+            tokens.append(("num", float(number)))
+        elif name is not None:
+            upper = name.upper()
+            tokens.append(("kw" if upper in KEYWORDS else "name", upper))
+        else:
+            tokens.append(("op", symbol))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """재귀 하강 파서 - 노드는 (종류, ...) 튜플
+
+    우선순위: or < and < not < 비교/교차 < +,- < *,/ < 단항 -
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.index = 0
+
+    def peek(self) -> Optional[Tuple[str, Any]]:
+        return self.tokens[self.index] if self.index < len(self.tokens) else None
+
+    def accept(self, kind: str, value: Any = None) -> bool:
+        token = self.peek()
+        if token and token[0] == kind and (value is None or token[1] == value):
+            self.index += 1
+            return True
+        return False
+
+    def expect(self, kind: str, value: Any = None) -> Tuple[str, Any]:
+        token = self.peek()
+        if not self.accept(kind, value):
+            found = token[1] if token else "식의 끝"
+            raise ConditionSyntaxError(f"'{value or kind}'이(가) 필요하지만 '{found}'을(를) 만났습니다: {self.text}")
+        return token
+
+    def parse(self) -> tuple:
+        node = self.parse_or()
+        if self.peek() is not None:
+            raise ConditionSyntaxError(f"해석할 수 없는 토큰 '{self.peek()[1]}': {self.text}")
+        return node
+
+    def parse_or(self) -> tuple:
+        node = self.parse_and()
+        while self.accept("kw", "OR"):
+            node = ("or", node, self.parse_and())
+        return node
+
+    def parse_and(self) -> tuple:
+        node = self.parse_not()
+        while self.accept("kw", "AND"):
+            node = ("and", node, self.parse_not())
+        return node
+
+    def parse_not(self) -> tuple:
+        if self.accept("kw", "NOT"):
+            return ("not", self.parse_not())
+        return self.parse_comparison()
+
+    def parse_comparison(self) -> tuple:
+        left = self.parse_sum()
+        token = self.peek()
+        if token and token[0] == "op" and token[1] in COMPARISONS:
+            self.index += 1
+            return ("cmp", token[1], left, self.parse_sum())
+        if token and token[0] == "kw" and token[1] in CROSSES:
+            self.index += 1
+            return ("cross", token[1], left, self.parse_sum())
+        return left
+
+    def parse_sum(self) -> tuple:
+        node = self.parse_product()
+        while True:
+            if self.accept("op", "+"):
+                node = ("arith", "+", node, self.parse_product())
+            elif self.accept("op", "-"):
+                node = ("arith", "-", node, self.parse_product())
+            else:
+                return node
+
+    def parse_product(self) -> tuple:
+        node = self.parse_unary()
+        while True:
+            if self.accept("op", "*"):
+                node = ("arith", "*", node, self.parse_unary())
+            elif self.accept("op", "/"):
+                node = ("arith", "/", node, self.parse_unary())
+            else:
+                return node
+
+    def parse_unary(self) -> tuple:
+        if self.accept("op", "-"):
+            return ("arith", "-", ("const", 0.0), self.parse_unary())
+        token = self.peek()
+        if token is None:
+            raise ConditionSyntaxError(f"식이 완결되지 않았습니다: {self.text}")
+        if self.accept("num"):
+            return ("const", token[1])
+        if self.accept("op", "("):
+            node = self.parse_or()
+            self.expect("op", ")")
+            return node
+        if self.accept("name"):
+            return self.parse_indicator(token[1])
+        raise ConditionSyntaxError(f"예상하지 못한 토큰 '{token[1]}': {self.text}")
+
+    def parse_indicator(self, name: str) -> tuple:
+        if name not in INDICATORS:
+            raise ConditionSyntaxError(f"알 수 없는 지표: {name} (사용 가능: {', '.join(INDICATORS)})")
+        defaults = INDICATORS[name][0]
+        args: List[float] = []
+        if self.accept("op", "("):
+            if not self.accept("op", ")"):
+                while True:
+                    args.append(self.expect("num")[1])
+                    if self.accept("op", ")"):
+                        break
+                    self.expect("op", ",")
+        if len(args) > len(defaults):
+            raise ConditionSyntaxError(f"{name} 인자는 최대 {len(defaults)}개입니다: {self.text}")
+        params = tuple(int(a) for a in args) + tuple(int(d) for d in defaults[len(args):])
+        if any(p <= 0 for p in params):
+            raise ConditionSyntaxError(f"{name} 기간은 양수여야 합니다: {self.text}")
+        return ("ind", name, params)
+
+
+def parse(expression: str) -> tuple:
+    """조건식을 구문 트리로 변환"""
+    if not expression or not expression.strip():
+        raise ConditionSyntaxError("빈 조건식입니다.")
+    return _Parser(expression).parse()
+
+
+class ConditionPlan:
+    """여러 조건식을 하나로 묶은 실행 계획
+
+    조건식들의 구문 트리를 공통 노드 테이블에 넣어 같은 하위식
+    (예: 여러 전략이 함께 쓰는 TEMA(20), RSI(14) > 55)은 한 번만 계산하고,
+    EMA 단계도 EmaStages로 공유합니다. 모든 노드는 (종목 x 봉) 배열로
+    벡터화 평가됩니다.
+    """
+
+    def __init__(self, strategies: Dict[str, str]):
+        self.expressions: Dict[str, str] = {}
+        self.nodes: List[tuple] = []  # 위상 정렬된 노드 (자식 노드는 인덱스로 참조)
+        self.warmups: List[int] = []  # 노드별 값이 유효해지는 최소 봉 수
+        self.roots: Dict[str, int] = {}
+        self._index: Dict[tuple, int] = {}
+        for name, expression in strategies.items():
+            self.add(name, expression)
+
+    def add(self, name: str, expression: str) -> int:
+        """조건식 추가 (이미 있는 하위식은 재사용)"""
+        root = self._intern(parse(expression))
+        if not self._is_condition(root):
+            raise ConditionSyntaxError(f"조건식은 비교식이어야 합니다: {expression}")
+        self.expressions[name] = expression
+        self.roots[name] = root
+        return root
+
+    def _is_condition(self, index: int) -> bool:
+        return self.nodes[index][0] in BOOLEAN_NODES
+
+    def _intern(self, node: tuple) -> int:
+        kind = node[0]
+        if kind in ("const", "ind"):
+            key = node
+            warmup = 0 if kind == "const" else INDICATORS[node[1]][1](*node[2])
+        elif kind == "not":
+            child = self._intern(node[1])
+            if not self._is_condition(child):
+                raise ConditionSyntaxError("not 뒤에는 비교식이 와야 합니다.")
+            key = ("not", child)
+            warmup = self.warmups[child]
+        elif kind in ("and", "or"):
+            left, right = self._intern(node[1]), self._intern(node[2])
+            if not (self._is_condition(left) and self._is_condition(right)):
+                raise ConditionSyntaxError(f"{kind} 양쪽에는 비교식이 와야 합니다.")
+            key = (kind, left, right)
+            warmup = max(self.warmups[left], self.warmups[right])
+        else:  # arith, cmp, cross
+            left, right = self._intern(node[2]), self._intern(node[3])
+            if self._is_condition(left) or self._is_condition(right):
+                raise ConditionSyntaxError(f"'{node[1]}'의 양쪽에는 지표나 숫자가 와야 합니다.")
+            key = (kind, node[1], left, right)
+            warmup = max(self.warmups[left], self.warmups[right])
+            if kind == "cross":
+                warmup += 1  # 전일 값까지 유효해야 교차 판단 가능
+
+        if key not in self._index:
+            self._index[key] = len(self.nodes)
+            self.nodes.append(key)
+            self.warmups.append(warmup)
+        return self._index[key]
+
+    @property
+    def indicator_count(self) -> int:
+        """계산되는 (중복 제거된) 지표 수"""
+        return sum(1 for node in self.nodes if node[0] == "ind")
+
+    def evaluate_series(self, columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """전 구간 평가 - 전략명 -> (종목 x 봉) 불리언 배열
+
+        columns: close, volume (필요시 open, high, low)의 (종목 x 봉) 배열,
+        앞쪽 NaN은 데이터가 없는 구간입니다.
+        """
+        closes = np.asarray(columns["close"], dtype=np.float64)
+        lengths = np.cumsum(~np.isnan(closes), axis=1)
+        stages = EmaStages(closes)
+        values: List[np.ndarray] = []
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for node, warmup in zip(self.nodes, self.warmups):
+                kind = node[0]
+                if kind == "const":
+                    value = np.full(closes.shape, node[1])
+                elif kind == "ind":
+                    value = self._indicator(node[1], node[2], columns, stages)
+                    default = INDICATORS[node[1]][2]
+                    value = np.where(lengths >= warmup, value, np.nan if default is None else default)
+                elif kind == "arith":
+                    left, right = values[node[2]], values[node[3]]
+                    value = {"+": np.add, "-": np.subtract, "*": np.multiply, "/": np.divide}[node[1]](left, right)
+                elif kind == "cmp":
+                    left, right = values[node[2]], values[node[3]]
+                    value = {
+                        ">": np.greater, ">=": np.greater_equal, "<": np.less,
+                        "<=": np.less_equal, "==": np.equal, "!=": np.not_equal,
+                    }[node[1]](left, right)
+                elif kind == "cross":
+                    left, right = values[node[2]], values[node[3]]
+                    above, below = left > right, left < right
+                    if node[1] == "CROSSES_BELOW":
+                        above, below = below, above
+                    value = np.zeros(closes.shape, dtype=bool)
+                    value[:, 1:] = above[:, 1:] & below[:, :-1]
+                    value &= lengths >= warmup
+                elif kind == "not":
+                    value = ~values[node[1]]
+                elif kind == "and":
+                    value = values[node[1]] & values[node[2]]
+                else:
+                    value = values[node[1]] | values[node[2]]
+                values.append(value)
+
+        has_data = ~np.isnan(closes)
+        return {name: values[root] & has_data for name, root in self.roots.items()}
+
+    def evaluate(self, columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """최근 봉 기준 평가 - 전략명 -> 종목별 불리언 배열"""
+        return {name: series[:, -1] for name, series in self.evaluate_series(columns).items()}
+
+    def evaluate_chart_data(self, chart_data_list: Sequence[ChartData]) -> Dict[str, np.ndarray]:
+        """종목별 차트 데이터 리스트로 최근 봉 기준 평가"""
+        if not chart_data_list or not any(chart_data_list):
+            return {name: np.zeros(len(chart_data_list), dtype=bool) for name in self.roots}
+        fields = {node[1].lower() for node in self.nodes if node[0] == "ind" and node[1] in ("OPEN", "HIGH", "LOW")}
+        columns = {field: pack_columns(chart_data_list, field) for field in {"close", "volume"} | fields}
+        return self.evaluate(columns)
+
+    @staticmethod
+    def _indicator(name: str, params: Tuple[int, ...], columns: Dict[str, np.ndarray], stages: EmaStages) -> np.ndarray:
+        closes = stages.closes
+        if name in ("CLOSE", "OPEN", "HIGH", "LOW", "VOLUME"):
+            return np.asarray(columns[name.lower()], dtype=np.float64)
+        if name == "EMA":
+            return stages.ema(params[0])
+        if name == "SMA":
+            return rolling_mean(closes, params[0])
+        if name == "TEMA":
+            return stages.tema(params[0])
+        if name == "DEMA":
+            return stages.dema(params[0])
+        if name in ("MACD", "MACD_SIGNAL", "MACD_OSC"):
+            macd_line, signal_line, oscillator = stages.macd(*params)
+            return {"MACD": macd_line, "MACD_SIGNAL": signal_line, "MACD_OSC": oscillator}[name]
+        if name == "RSI":
+            return rsi_series(closes, params[0])
+        if name == "OBV":
+            return obv_series(closes, np.asarray(columns["volume"], dtype=np.float64))
+
+        volumes = np.asarray(columns["volume"], dtype=np.float64)
+        average = _trailing_mean(volumes, params[0])
+        if name == "AVG_VOLUME":
+            return average
+        # VOLUME_RATIO: 현재 거래량 / 평균 거래량 (평균이 0이면 1.0)
+        return np.where(average > 0, volumes / average, 1.0)
+
+
+def _trailing_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """최근 window개 평균 - 봉이 부족하면 보유 봉 전체 평균 (ConditionService.calculate_average_volume과 동일)"""
+    valid = ~np.isnan(values)
+    sums = np.concatenate([np.zeros((values.shape[0], 1)), np.cumsum(np.where(valid, values, 0.0), axis=1)], axis=1)
+    counts = np.concatenate([np.zeros((values.shape[0], 1)), np.cumsum(valid, axis=1)], axis=1)
+    start = np.maximum(np.arange(values.shape[1]) + 1 - window, 0)
+    window_sum = sums[:, 1:] - sums[:, start]
+    window_count = counts[:, 1:] - counts[:, start]
+    return np.where(window_count > 0, window_sum / np.maximum(window_count, 1), np.nan)
+
+
+# 기본 제공 전략 - "골든크로스_상승"은 ConditionService의 검색 조건과 같습니다.
+DEFAULT_STRATEGIES: Dict[str, str] = {
+    "골든크로스_상승": (
+        f"TEMA(20) crosses_above DEMA(10) and MACD_OSC(12, 26, 9) > {ConditionService.MACD_OSC_MIN} "
+        f"and RSI(14) > {ConditionService.RSI_MIN} and VOLUME_RATIO(5) > {ConditionService.VOLUME_RATIO_MIN}"
+    ),
+    "데드크로스_하락": "TEMA(20) crosses_below DEMA(10) and RSI(14) < 45",
+    "기술적_반등_신호": "RSI(14) crosses_above 30 and VOLUME_RATIO(5) > 1.2",
+    "거래량_급증": "VOLUME > AVG_VOLUME(5) * 2 and CLOSE > EMA(20)",
+    "MACD_상향돌파": "MACD(12, 26, 9) crosses_above MACD_SIGNAL(12, 26, 9) and CLOSE > SMA(20)",
+}
+
+
+@dataclass
+class Strategy:
+    """이름이 붙은 조건식"""
+    name: str
+    expression: str
+
+
+class StrategyBook:
+    """전략 목록과 컴파일된 통합 실행 계획
+
+    기본 전략에 STRATEGY_FILE(JSON 객체 {이름: 조건식})의 사용자 전략을 더합니다.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("STRATEGY_FILE")
+        strategies = dict(DEFAULT_STRATEGIES)
+        if self.path and os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                strategies.update(json.load(f))
+        self.plan = ConditionPlan({})
+        for name, expression in strategies.items():
+            try:
+                self.plan.add(name, expression)
+            except ConditionSyntaxError as e:
+                logger.error(f"전략 '{name}' 컴파일 실패: {str(e)}")
+        logger.info(f"전략 {len(self.plan.roots)}개 컴파일 (지표 {self.plan.indicator_count}개 공유)")
+
+    def list(self) -> List[Strategy]:
+        return [Strategy(name, expression) for name, expression in self.plan.expressions.items()]
+
+    def plan_for(self, names: Optional[List[str]] = None, expression: Optional[str] = None) -> ConditionPlan:
+        """요청한 전략(및 임시 조건식)만 담은 실행 계획"""
+        if not names and not expression:
+            return self.plan
+        unknown = [name for name in names or [] if name not in self.plan.expressions]
+        if unknown:
+            raise ConditionSyntaxError(f"알 수 없는 전략: {', '.join(unknown)}")
+        plan = ConditionPlan({name: self.plan.expressions[name] for name in names or []})
+        if expression:
+            plan.add("custom", expression)
+        return plan
@@ -1,41 +1,57 @@
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 from stock_models import TechnicalIndicators, TradingStrategy
+from batch_indicators import BatchIndicatorEngine, ChartData
+from bar_series import BarSeries
 
 
 class ConditionService:
     """조건 검증 및 기술지표 계산 서비스"""
     
+    # 검색 조건 임계값
+    MACD_OSC_MIN = -50  # MACD Oscillator > -50
+    RSI_MIN = 55  # RSI(14) > 55
+    VOLUME_RATIO_MIN = 1.5  # 거래량 > 평균거래량(5) * 1.5
+    TREND_MACD_MIN = 0  # 상위 시간 프레임 추세: MACD Oscillator > 0
+    
     @staticmethod
-    def calculate_tema(prices: List[float], period: int) -> float:
-        """TEMA (Triple Exponential Moving Average) 계산"""
-        if len(prices) < period:
-            return 0.0
-        
+    def tema_series(prices: Sequence[float], period: int) -> pd.Series:
+        """TEMA 시계열"""
         series = pd.Series(prices)
         ema1 = series.ewm(span=period).mean()
         ema2 = ema1.ewm(span=period).mean()
         ema3 = ema2.ewm(span=period).mean()
         
-        tema = 3 * ema1 - 3 * ema2 + ema3
-        return float(tema.iloc[-1])
+        return 3 * ema1 - 3 * ema2 + ema3
     
     @staticmethod
-    def calculate_dema(prices: List[float], period: int) -> float:
-        """DEMA (Double Exponential Moving Average) 계산"""
-        if len(prices) < period:
-            return 0.0
-        
+    def dema_series(prices: Sequence[float], period: int) -> pd.Series:
+        """DEMA 시계열"""
         series = pd.Series(prices)
         ema1 = series.ewm(span=period).mean()
         ema2 = ema1.ewm(span=period).mean()
         
-        dema = 2 * ema1 - ema2
-        return float(dema.iloc[-1])
+        return 2 * ema1 - ema2
+    
+    @staticmethod
+    def calculate_tema(prices: Sequence[float], period: int) -> float:
+        """TEMA (Triple Exponential Moving Average) 계산"""
+        if len(prices) < period:
+            return 0.0
+        
+        return float(ConditionService.tema_series(prices, period).iloc[-1])
+    
+    @staticmethod
+    def calculate_dema(prices: Sequence[float], period: int) -> float:
+        """DEMA (Double Exponential Moving Average) 계산"""
+        if len(prices) < period:
+            return 0.0
+        
+        return float(ConditionService.dema_series(prices, period).iloc[-1])
     
     @staticmethod
-    def calculate_macd(prices: List[float], fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[float, float, float]:
+    def calculate_macd(prices: Sequence[float], fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[float, float, float]:
         """MACD 계산 (MACD Line, Signal Line, Oscillator)"""
         if len(prices) < slow:
             return 0.0, 0.0, 0.0
@@ -51,7 +67,7 @@ class ConditionService:
         return float(macd_line.iloc[-1]), float(signal_line.iloc[-1]), float(oscillator.iloc[-1])
     
     @staticmethod
-    def calculate_rsi(prices: List[float], period: int = 14) -> float:
+    def calculate_rsi(prices: Sequence[float], period: int = 14) -> float:
         """RSI (Relative Strength Index) 계산"""
         if len(prices) < period + 1:
             return 50.0
@@ -70,39 +86,35 @@ class ConditionService:
         return float(rsi.iloc[-1])
     
     @staticmethod
-    def calculate_obv(prices: List[float], volumes: List[int]) -> float:
+    def calculate_obv(prices: Sequence[float], volumes: Sequence[float]) -> float:
         """OBV (On-Balance Volume) 계산"""
         if len(prices) != len(volumes) or len(prices) < 2:
             return 0.0
         
-        obv = 0
-        for i in range(1, len(prices)):
-            if prices[i] > prices[i-1]:
-                obv += volumes[i]
-            elif prices[i] < prices[i-1]:
-                obv -= volumes[i]
-        
-        return float(obv)
+        # 상승일 +거래량, 하락일 -거래량, 보합 0
+        direction = np.sign(np.diff(np.asarray(prices, dtype=np.float64)))
+        return float(np.dot(direction, np.asarray(volumes, dtype=np.float64)[1:]))
     
     @staticmethod
-    def calculate_average_volume(volumes: List[int], period: int = 5) -> float:
+    def calculate_average_volume(volumes: Sequence[float], period: int = 5) -> float:
         """평균 거래량 계산"""
         if len(volumes) < period:
-            return float(np.mean(volumes)) if volumes else 0.0
+            return float(np.mean(volumes)) if len(volumes) else 0.0
         
         return float(np.mean(volumes[-period:]))
     
-    def calculate_indicators(self, chart_data: List[Dict[str, Any]]) -> TechnicalIndicators:
+    def calculate_indicators(self, chart_data: ChartData) -> TechnicalIndicators:
         """모든 기술지표 계산"""
-        if not chart_data:
+        if not len(chart_data):
             return TechnicalIndicators(
                 tema_20=0, dema_10=0, macd_oscillator=0,
                 rsi_14=50, obv=0, avg_volume_5=0, volume_ratio=1.0
             )
         
-        # 데이터 추출
-        prices = [item["close"] for item in chart_data]
-        volumes = [item["volume"] for item in chart_data]
+        # 데이터 추출 (열 배열을 그대로 사용)
+        bars = BarSeries.of(chart_data)
+        prices = bars.close
+        volumes = bars.volume
         
         # 기술지표 계산
         tema_20 = self.calculate_tema(prices, 20)
@@ -113,7 +125,7 @@ class ConditionService:
         avg_volume_5 = self.calculate_average_volume(volumes, 5)
         
         # 거래량 비율
-        current_volume = volumes[-1] if volumes else 0
+        current_volume = float(volumes[-1])
         volume_ratio = current_volume / avg_volume_5 if avg_volume_5 > 0 else 1.0
         
         return TechnicalIndicators(
@@ -126,40 +138,68 @@ class ConditionService:
             volume_ratio=volume_ratio
         )
     
-    def check_golden_cross_condition(self, chart_data: List[Dict[str, Any]]) -> bool:
+    def check_golden_cross_condition(self, chart_data: ChartData) -> bool:
         """골든크로스 조건 확인: TEMA(20) > DEMA(10) AND TEMA(20)[1] < DEMA(10)[1]"""
         if len(chart_data) < 21:  # 최소 21일 데이터 필요
             return False
         
-        # 현재 값들
-        current_prices = [item["close"] for item in chart_data]
-        current_tema = self.calculate_tema(current_prices, 20)
-        current_dema = self.calculate_dema(current_prices, 10)
-        
-        # 전일 값들
-        prev_prices = [item["close"] for item in chart_data[:-1]]
-        prev_tema = self.calculate_tema(prev_prices, 20)
-        prev_dema = self.calculate_dema(prev_prices, 10)
+        # EWM은 과거 값만 사용하므로 한 번 계산한 시계열의 마지막 두 값이 현재/전일 값
+        prices = BarSeries.of(chart_data).close
+        tema = self.tema_series(prices, 20)
+        dema = self.dema_series(prices, 10)
+        current_tema, prev_tema = float(tema.iloc[-1]), float(tema.iloc[-2])
+        current_dema, prev_dema = float(dema.iloc[-1]), float(dema.iloc[-2])
         
         # 골든크로스 조건: 현재는 TEMA > DEMA, 전일은 TEMA < DEMA
         return current_tema > current_dema and prev_tema < prev_dema
     
-    def meets_all_conditions(self, indicators: TechnicalIndicators, chart_data: List[Dict[str, Any]]) -> bool:
+    def meets_all_conditions(self, indicators: TechnicalIndicators, chart_data: ChartData) -> bool:
         """모든 조건 검증"""
         # 1. 골든크로스 조건
         golden_cross = self.check_golden_cross_condition(chart_data)
         
         # 2. MACD Oscillator > -50
-        macd_condition = indicators.macd_oscillator > -50
+        macd_condition = indicators.macd_oscillator > self.MACD_OSC_MIN
         
         # 3. RSI(14) > 55
-        rsi_condition = indicators.rsi_14 > 55
+        rsi_condition = indicators.rsi_14 > self.RSI_MIN
         
         # 4. 거래량 > 평균거래량(5) * 1.5
-        volume_condition = indicators.volume_ratio > 1.5
+        volume_condition = indicators.volume_ratio > self.VOLUME_RATIO_MIN
         
         return golden_cross and macd_condition and rsi_condition and volume_condition
     
+    def is_trend_up(self, indicators: TechnicalIndicators) -> bool:
+        """상위 시간 프레임 추세 확인: TEMA(20) > DEMA(10) AND MACD Oscillator > 0"""
+        return indicators.tema_20 > indicators.dema_10 and indicators.macd_oscillator > self.TREND_MACD_MIN
+    
+    def analyze_batch(self, chart_data_list: List[ChartData],
+                      result: Optional[Dict[str, np.ndarray]] = None) -> List[Tuple[TechnicalIndicators, bool]]:
+        """여러 종목의 기술지표 계산 및 조건 검증을 한 번에 수행 (벡터화)
+
+        result: 미리 계산한 BatchIndicatorEngine.compute 결과 (프로세스 풀 계산 등)
+        """
+        if not chart_data_list:
+            return []
+        
+        engine = BatchIndicatorEngine()
+        if result is None:
+            result = engine.compute_from_chart_data(chart_data_list)
+        meets = (
+            result["golden_cross"]
+            & (result["macd_oscillator"] > self.MACD_OSC_MIN)
+            & (result["rsi_14"] > self.RSI_MIN)
+            & (result["volume_ratio"] > self.VOLUME_RATIO_MIN)
+        )
+        
+        analyzed = []
+        for i, chart_data in enumerate(chart_data_list):
+            if not len(chart_data):
+                analyzed.append((self.calculate_indicators(chart_data), False))
+                continue
+            analyzed.append((engine.to_technical_indicators(result, i), bool(meets[i])))
+        return analyzed
+    
     def generate_trading_strategy(self, indicators: TechnicalIndicators, meets_conditions: bool) -> TradingStrategy:
         """매매 전략 생성"""
         if meets_conditions:
@@ -167,15 +207,15 @@ class ConditionService:
             confidence_factors = []
             
             # RSI 강도 (55~70 구간에서 높은 점수)
-            rsi_strength = min(1.0, max(0.0, (indicators.rsi_14 - 55) / 15))
+            rsi_strength = min(1.0, max(0.0, (indicators.rsi_14 - self.RSI_MIN) / 15))
             confidence_factors.append(rsi_strength)
             
             # MACD 강도 (양수일수록 높은 점수)
-            macd_strength = min(1.0, max(0.0, (indicators.macd_oscillator + 50) / 100))
+            macd_strength = min(1.0, max(0.0, (indicators.macd_oscillator - self.MACD_OSC_MIN) / 100))
             confidence_factors.append(macd_strength)
             
             # 거래량 강도 (1.5배 이상에서 점수)
-            volume_strength = min(1.0, max(0.0, (indicators.volume_ratio - 1.5) / 1.0))
+            volume_strength = min(1.0, max(0.0, (indicators.volume_ratio - self.VOLUME_RATIO_MIN) / 1.0))
             confidence_factors.append(volume_strength)
             
             confidence = np.mean(confidence_factors)
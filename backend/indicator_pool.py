@@ -0,0 +1,156 @@
+import os
+import math
+import asyncio
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from batch_indicators import BatchIndicatorEngine
+
+logger = logging.getLogger(__name__)
+
+# 공유 메모리로 돌려받는 결과 항목 (BatchIndicatorEngine.compute 반환 키)
+RESULT_FIELDS = (
+    "tema_20", "dema_10", "macd_oscillator", "rsi_14", "obv", "avg_volume_5", "volume_ratio",
+    "tema_20_prev", "dema_10_prev", "golden_cross", "lengths",
+)
+RESULT_DTYPES = {"golden_cross": bool, "lengths": int}
+
+
+def _warm_up():
+    """작업 프로세스 생성 및 모듈 로딩용 빈 작업"""
+
+
+def _compute_rows(input_name: str, output_name: str, shape: Tuple[int, int], start: int, stop: int):
+    """작업 프로세스: 입력 블록의 [start, stop) 종목을 계산해 출력 블록에 기록"""
+    input_block = shared_memory.SharedMemory(name=input_name)
+    output_block = shared_memory.SharedMemory(name=output_name)
+    try:
+        bars = np.ndarray((2,) + tuple(shape), dtype=np.float64, buffer=input_block.buf)
+        results = np.ndarray((len(RESULT_FIELDS), shape[0]), dtype=np.float64, buffer=output_block.buf)
+        computed = BatchIndicatorEngine().compute(bars[0, start:stop], bars[1, start:stop])
+        for i, name in enumerate(RESULT_FIELDS):
+            results[i, start:stop] = computed[name]
+        del bars, results  # 공유 메모리를 닫기 전에 버퍼 참조 해제
+    finally:
+        input_block.close()
+        output_block.close()
+
+
+class IndicatorProcessPool:
+    """지표 배치 계산을 작업 프로세스로 분산하는 실행기
+
+    종가/거래량 (종목 x 봉) 배열을 공유 메모리 블록 하나에 복사하고, 작업
+    프로세스는 종목 구간만 받아 같은 블록을 직접 읽고 결과 블록에 씁니다.
+    차트 데이터(dict 리스트)를 피클링해 넘기지 않으므로 전송 비용이 거의 없고,
+    GIL과 무관하게 코어 수만큼 나눠 계산합니다.
+
+    종목 수가 min_stocks 미만이면 프로세스 간 조율 비용이 더 크므로
+    호출하는 쪽에서 스레드로 계산합니다. (accepts 참고)
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        min_stocks: Optional[int] = None,
+    ):
+        if workers is None:
+            workers = int(os.getenv("INDICATOR_POOL_WORKERS", str(os.cpu_count() or 1)))
+        self.workers = max(0, workers)  # 0이면 프로세스 풀 사용 안 함
+        self.batch_size = batch_size or int(os.getenv("INDICATOR_POOL_BATCH", "256"))
+        self.min_stocks = min_stocks or int(os.getenv("INDICATOR_POOL_MIN_STOCKS", "200"))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._start_lock = threading.Lock()  # 앱 시작 준비 작업(스레드)과 첫 계산이 겹칠 때
+        self._stats = {"batches": 0, "stocks": 0, "tasks": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def accepts(self, n_stocks: int) -> bool:
+        """이 종목 수를 프로세스 풀로 보낼지 여부"""
+        return self.enabled and n_stocks >= self.min_stocks
+
+    def start(self):
+        """작업 프로세스 시작 (첫 계산 지연을 피하려면 앱 시작시 호출)"""
+        with self._start_lock:
+            self._start()
+
+    def _start(self):
+        if self._executor is None and self.enabled:
+            methods = multiprocessing.get_all_start_methods()
+            # 스레드/이벤트 루프가 도는 프로세스를 fork하지 않도록 forkserver/spawn 사용
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+            for _ in range(self.workers):
+                self._executor.submit(_warm_up)
+            logger.info(f"지표 계산 프로세스 풀 시작 (workers={self.workers}, batch_size={self.batch_size})")
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def compute(self, closes: np.ndarray, volumes: np.ndarray) -> Dict[str, np.ndarray]:
+        """(종목 x 봉) 배열의 최근 봉 기준 지표 - BatchIndicatorEngine.compute와 같은 결과"""
+        closes = np.asarray(closes, dtype=np.float64)
+        volumes = np.asarray(volumes, dtype=np.float64)
+        n_stocks, width = closes.shape
+        if width == 0 or not self.enabled:
+            return BatchIndicatorEngine().compute(closes, volumes)
+
+        self.start()
+        # 모든 작업 프로세스가 일하도록 구간 크기를 batch_size 이하로 나눔
+        chunk = max(1, min(self.batch_size, math.ceil(n_stocks / self.workers)))
+        input_block = shared_memory.SharedMemory(create=True, size=closes.nbytes * 2)
+        output_block = shared_memory.SharedMemory(create=True, size=8 * len(RESULT_FIELDS) * n_stocks)
+        try:
+            bars = np.ndarray((2, n_stocks, width), dtype=np.float64, buffer=input_block.buf)
+            bars[0] = closes
+            bars[1] = volumes
+            del bars
+
+            futures = [
+                asyncio.wrap_future(self._executor.submit(
+                    _compute_rows, input_block.name, output_block.name, (n_stocks, width),
+                    start, min(start + chunk, n_stocks)
+                ))
+                for start in range(0, n_stocks, chunk)
+            ]
+            try:
+                await asyncio.gather(*futures)
+            finally:
+                for future in futures:
+                    future.cancel()
+
+            results = np.ndarray((len(RESULT_FIELDS), n_stocks), dtype=np.float64, buffer=output_block.buf)
+            computed = {
+                name: results[i].astype(RESULT_DTYPES.get(name, np.float64))  # 복사본 (블록 해제 후에도 유효)
+                for i, name in enumerate(RESULT_FIELDS)
+            }
+            del results
+        finally:
+            input_block.close()
+            input_block.unlink()
+            output_block.close()
+            output_block.unlink()
+
+        self._stats["batches"] += 1
+        self._stats["stocks"] += n_stocks
+        self._stats["tasks"] += len(futures)
+        return computed
+
+    def stats(self) -> Dict:
+        return {
+            **self._stats,
+            "workers": self.workers,
+            "batch_size": self.batch_size,
+            "min_stocks": self.min_stocks,
+            "running": self._executor is not None,
+        }
@@ -1,24 +1,51 @@
 import os
+import asyncio
+import hashlib
 import requests
 import json
 from datetime import datetime, timedelta
 from typing import Optional
 from dotenv import load_dotenv
 
+from shared_state import SharedState, get_default_state
+from metrics import stage_timer
+
 load_dotenv()
 
 
 class KiwoomAuth:
-    """키움증권 OAuth 인증 관리"""
+    """키움증권 OAuth 인증 관리
+
+    발급한 토큰은 공유 상태(SHARED_STATE_URL)에 저장해 여러 워커가 함께 쓰고,
+    만료시에는 잠금을 잡은 워커 하나만 갱신합니다. (나머지는 갱신된 토큰 사용)
+    """
     
-    def __init__(self):
+    TOKEN_LOCK_TTL = 30  # 토큰 갱신 잠금 유지 시간(초)
+    
+    def __init__(self, state: Optional[SharedState] = None):
         self.app_key = os.getenv("KIWOOM_APP_KEY")
         self.app_secret = os.getenv("KIWOOM_APP_SECRET")
-        self.base_url = "https://openapi.kiwoom.com"
-        self.token_cache = {}
+        self.base_url = os.getenv("KIWOOM_BASE_URL", "https://openapi.kiwoom.com")
+        self.token_cache = {}  # 프로세스 내 사본
+        self.state = state or get_default_state()
         
         if not self.app_key or not self.app_secret:
             raise ValueError("키움 API 키가 설정되지 않았습니다. .env 파일을 확인하세요.")
+        
+        # 공유 저장소 키 (앱키 자체는 저장하지 않음)
+        self._token_key = hashlib.sha256(self.app_key.encode("utf-8")).hexdigest()[:16]
+    
+    @staticmethod
+    def _is_valid(token: Optional[dict], current_time: datetime) -> bool:
+        return bool(token) and "access_token" in token and current_time < token.get("expires_at", current_time)
+    
+    def _shared_token(self, current_time: datetime) -> Optional[dict]:
+        """다른 워커가 발급해 공유 저장소에 넣은 토큰"""
+        found = self.state.get("auth", self._token_key)
+        if found is not None and self._is_valid(found[0], current_time):
+            self.token_cache = found[0]
+            return found[0]
+        return None
     
     def get_access_token(self) -> str:
         """
@@ -27,15 +54,44 @@ class KiwoomAuth:
         주의: 키움증권은 OAuth2 REST API를 공식적으로 지원하지 않습니다.
         실제로는 OCX(ActiveX) 기반의 Open API+를 사용해야 합니다.
         현재는 개발/테스트를 위한 모의 토큰을 반환합니다.
+        
+        공유 저장소 조회/갱신 잠금 대기가 길어질 수 있으므로 "auth" 단계로 측정합니다.
         """
+        with stage_timer("auth"):
+            return self._get_access_token()
+    
+    async def get_access_token_async(self) -> str:
+        """이벤트 루프용 토큰 조회
+
+        프로세스 내 사본이 유효하면 바로 반환하고, 공유 저장소 조회와 갱신 잠금
+        대기(블로킹 I/O)는 스레드에서 수행합니다.
+        """
+        with stage_timer("auth"):
+            if self._is_valid(self.token_cache, datetime.now()):
+                return self.token_cache["access_token"]
+            return await asyncio.to_thread(self._get_access_token)
+    
+    def _get_access_token(self) -> str:
         current_time = datetime.now()
         
         # 캐시된 토큰이 있고 아직 유효하다면 재사용
-        if ("access_token" in self.token_cache and 
-            "expires_at" in self.token_cache and
-            current_time < self.token_cache["expires_at"]):
+        if self._is_valid(self.token_cache, current_time):
             return self.token_cache["access_token"]
         
+        shared = self._shared_token(current_time)
+        if shared is not None:
+            return shared["access_token"]
+        
+        # 갱신은 한 워커만 수행 (잠금을 못 얻으면 대기 시간 초과 후 직접 발급)
+        with self.state.lock(f"auth:{self._token_key}", ttl=self.TOKEN_LOCK_TTL, wait=self.TOKEN_LOCK_TTL):
+            current_time = datetime.now()
+            shared = self._shared_token(current_time)
+            if shared is not None:
+                return shared["access_token"]
+            return self._issue_token(current_time)
+    
+    def _issue_token(self, current_time: datetime) -> str:
+        """토큰 발급 후 공유 저장소에 저장"""
         # 키움증권은 OAuth2 REST API를 지원하지 않으므로 모의 토큰 생성
         print("⚠️  키움증권은 OCX 기반 API를 사용합니다. 모의 토큰을 생성합니다.")
         
@@ -47,14 +103,18 @@ class KiwoomAuth:
             "access_token": mock_token,
             "expires_at": current_time + timedelta(hours=1)
         }
+        self.state.set("auth", self._token_key, self.token_cache, ttl=timedelta(hours=1).total_seconds())
         
         return mock_token
     
     def get_auth_headers(self) -> dict:
         """인증 헤더 반환"""
         token = self.get_access_token()
+        return {"Authorization": f"Bearer {token}", **self.app_headers()}
+    
+    def app_headers(self) -> dict:
+        """토큰을 제외한 공통 헤더 (토큰은 요청 직전에 따로 붙임)"""
         return {
-            "Authorization": f"Bearer {token}",
             "Content-Type": "application/json",
             "appkey": self.app_key,
             "appsecret": self.app_secret
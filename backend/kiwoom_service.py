@@ -1,143 +1,308 @@
+import os
+import time
+import logging
 import requests
 import json
-from typing import List, Dict, Any, Optional
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple
 from kiwoom_auth import KiwoomAuth
 from stock_models import StockInfo
+from rate_limiter import RequestScheduler, get_default_scheduler
+from ohlcv_store import OHLCVStore
+from market_hours import now_kst
+from ttl_cache import KiwoomCache
+from stock_master import StockMaster
+from realtime_quotes import TickBook
+from bar_series import BarSeries
+from metrics import KIWOOM_REQUEST_SECONDS, KIWOOM_REQUESTS
+from resilience import BrokerResilience, KiwoomAPIError, get_default_resilience, check_rate_limited, rate_limit_error, classify_error
 
+logger = logging.getLogger(__name__)
 
-class KiwoomService:
-    """키움증권 API 서비스"""
-    
-    def __init__(self):
-        self.auth = KiwoomAuth()
-        self.base_url = "https://openapi.kiwoom.com"
-    
-    def search_by_condition(self, condition_name: str) -> List[str]:
-        """사용자 조건검색식으로 종목 검색"""
-        url = f"{self.base_url}/uapi/domestic-stock/v1/trading/inquire-psearch-result"
+# (url, headers, params) 형태의 요청 명세
+RequestSpec = Tuple[str, Dict[str, str], Dict[str, str]]
+
+
+class KiwoomRequestBuilder:
+    """키움증권 API 요청 구성 및 응답 파싱 (동기/비동기 클라이언트 공용)"""
+
+    CHART_PAGE_ROWS = 100  # 차트 응답 한 번의 최대 행 수
+    CHART_MAX_PAGES = int(os.getenv("KIWOOM_CHART_MAX_PAGES", "10"))  # 기간 조회 최대 연속 요청 수
+
+    def __init__(
+        self,
+        auth: Optional[KiwoomAuth] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        ohlcv_store: Optional[OHLCVStore] = None,
+        cache: Optional[KiwoomCache] = None,
+        stock_master: Optional[StockMaster] = None,
+        tick_book: Optional[TickBook] = None,
+        resilience: Optional[BrokerResilience] = None,
+    ):
+        self.auth = auth or KiwoomAuth()
+        self.base_url = os.getenv("KIWOOM_BASE_URL", "https://openapi.kiwoom.com")
+        self.scheduler = scheduler or get_default_scheduler()
+        self.resilience = resilience or get_default_resilience()  # 재시도/서킷 브레이커/헤지
+        self.ohlcv_store = ohlcv_store  # 지정시 일봉은 로컬 저장소 기준으로 증분 조회
+        self.cache = cache  # 지정시 종목명/현재가/차트 응답 캐시
+        self.stock_master = stock_master  # 지정시 종목명은 마스터에서 우선 조회
+        self.tick_book = tick_book  # 지정시 현재가/당일 봉은 실시간 체결 기준
+        self.quote_max_age = float(os.getenv("REALTIME_QUOTE_MAX_AGE", "5"))
+
+    @staticmethod
+    def default_name(stock_code: str) -> str:
+        """종목명 조회 실패시 기본값"""
+        return f"종목{stock_code}"
+
+    def live_quote(self, stock_code: str) -> Optional[Dict[str, Any]]:
+        """실시간 체결 기준 현재가 (없거나 오래됐으면 None)"""
+        if self.tick_book is None:
+            return None
+        return self.tick_book.quote(stock_code, self.quote_max_age)
+
+    def with_intraday(self, stock_code: str, chart_data: BarSeries, period: str, count: int) -> BarSeries:
+        """일봉에 실시간 당일 봉 반영"""
+        if self.tick_book is None or period != "D":
+            return chart_data
+        return self.tick_book.apply_intraday(stock_code, chart_data, count)
+
+    def _headers(self, tr_id: str) -> Dict[str, str]:
         headers = self.auth.get_auth_headers()
-        headers["tr_id"] = "PSEARCH_RESULT"
-        
+        headers["tr_id"] = tr_id
+        return headers
+
+    def build_condition_request(self, condition_name: str) -> RequestSpec:
+        """조건검색 요청 구성"""
+        url = f"{self.base_url}/uapi/domestic-stock/v1/trading/inquire-psearch-result"
         params = {
             "user_id": "",  # 사용자 ID (선택사항)
             "seq": "1",
             "condition_name": condition_name,
             "search_flag": "0"
         }
-        
-        try:
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            if data.get("rt_cd") != "0":
-                raise Exception(f"조건검색 실패: {data.get('msg1', 'Unknown error')}")
-            
-            # 응답에서 종목코드 리스트 추출
-            output = data.get("output", [])
-            stock_codes = [item.get("mksc_shrn_iscd", "") for item in output if item.get("mksc_shrn_iscd")]
-            
-            return stock_codes
-            
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"조건검색 API 호출 실패: {str(e)}")
-    
-    def get_stock_price(self, stock_code: str) -> Dict[str, Any]:
-        """종목의 현재가 정보 조회"""
+        return url, self._headers("PSEARCH_RESULT"), params
+
+    @staticmethod
+    def parse_condition_response(data: Dict[str, Any]) -> List[str]:
+        """조건검색 응답에서 종목코드 리스트 추출"""
+        if data.get("rt_cd") != "0":
+            raise KiwoomAPIError(f"조건검색 실패: {data.get('msg1', 'Unknown error')}", "PSEARCH_RESULT")
+
+        output = data.get("output", [])
+        return [item.get("mksc_shrn_iscd", "") for item in output if item.get("mksc_shrn_iscd")]
+
+    def build_price_request(self, stock_code: str) -> RequestSpec:
+        """현재가 조회 요청 구성"""
         url = f"{self.base_url}/uapi/domestic-stock/v1/quotations/inquire-price"
-        headers = self.auth.get_auth_headers()
-        headers["tr_id"] = "FHKST01010100"
-        
         params = {
             "fid_cond_mrkt_div_code": "J",
             "fid_input_iscd": stock_code
         }
-        
-        try:
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            if data.get("rt_cd") != "0":
-                raise Exception(f"현재가 조회 실패: {data.get('msg1', 'Unknown error')}")
-            
-            output = data.get("output", {})
-            return {
-                "price": float(output.get("stck_prpr", 0)),  # 현재가
-                "change_percent": float(output.get("prdy_ctrt", 0)),  # 등락률
-                "volume": int(output.get("acml_vol", 0)),  # 누적거래량
-                "high": float(output.get("stck_hgpr", 0)),  # 고가
-                "low": float(output.get("stck_lwpr", 0)),  # 저가
-            }
-            
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"현재가 조회 API 호출 실패: {str(e)}")
-    
-    def get_stock_chart_data(self, stock_code: str, period: str = "D", count: int = 30) -> List[Dict[str, Any]]:
-        """종목의 차트 데이터 조회 (기술지표 계산용)"""
+        return url, self._headers("FHKST01010100"), params
+
+    @staticmethod
+    def parse_price_response(data: Dict[str, Any]) -> Dict[str, Any]:
+        """현재가 응답 파싱"""
+        if data.get("rt_cd") != "0":
+            raise KiwoomAPIError(f"현재가 조회 실패: {data.get('msg1', 'Unknown error')}", "FHKST01010100")
+
+        output = data.get("output", {})
+        return {
+            "price": float(output.get("stck_prpr", 0)),  # 현재가
+            "change_percent": float(output.get("prdy_ctrt", 0)),  # 등락률
+            "volume": int(output.get("acml_vol", 0)),  # 누적거래량
+            "high": float(output.get("stck_hgpr", 0)),  # 고가
+            "low": float(output.get("stck_lwpr", 0)),  # 저가
+        }
+
+    def build_chart_request(self, stock_code: str, period: str = "D", start_date: str = "", end_date: str = "") -> RequestSpec:
+        """차트 데이터 조회 요청 구성 (start_date 지정시 해당일부터 end_date(기본 오늘)까지)"""
         url = f"{self.base_url}/uapi/domestic-stock/v1/quotations/inquire-daily-itemchartprice"
-        headers = self.auth.get_auth_headers()
-        headers["tr_id"] = "FHKST03010100"
-        
+        if start_date and not end_date:
+            end_date = now_kst().strftime("%Y%m%d")
         params = {
             "fid_cond_mrkt_div_code": "J",
             "fid_input_iscd": stock_code,
-            "fid_input_date_1": "",  # 시작일자 (공백시 최근)
-            "fid_input_date_2": "",  # 종료일자 (공백시 최근)
+            "fid_input_date_1": start_date,  # 시작일자 (공백시 최근)
+            "fid_input_date_2": end_date,  # 종료일자 (공백시 최근)
             "fid_period_div_code": period,  # D:일봉, W:주봉, M:월봉
             "fid_org_adj_prc": "1"  # 수정주가 반영
         }
-        
-        try:
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            if data.get("rt_cd") != "0":
-                raise Exception(f"차트 데이터 조회 실패: {data.get('msg1', 'Unknown error')}")
-            
-            output = data.get("output2", [])
-            chart_data = []
-            
-            for item in output[:count]:  # 최근 count개만 가져오기
-                chart_data.append({
-                    "date": item.get("stck_bsop_date", ""),
-                    "open": float(item.get("stck_oprc", 0)),
-                    "high": float(item.get("stck_hgpr", 0)),
-                    "low": float(item.get("stck_lwpr", 0)),
-                    "close": float(item.get("stck_clpr", 0)),
-                    "volume": int(item.get("acml_vol", 0))
-                })
-            
-            return chart_data
-            
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"차트 데이터 조회 API 호출 실패: {str(e)}")
-    
-    def get_stock_name(self, stock_code: str) -> str:
-        """종목코드로 종목명 조회"""
+        return url, self._headers("FHKST03010100"), params
+
+    @classmethod
+    def next_chart_page(cls, start_date: str, page: BarSeries, pages: int) -> Optional[str]:
+        """기간 조회 응답이 최대 행 수로 잘렸으면 이전 구간의 종료일, 아니면 None"""
+        if len(page) < cls.CHART_PAGE_ROWS or pages >= cls.CHART_MAX_PAGES or page.dates[0] <= int(start_date):
+            return None
+        oldest = datetime.strptime(str(page.dates[0]), "%Y%m%d")
+        return (oldest - timedelta(days=1)).strftime("%Y%m%d")
+
+    @staticmethod
+    def parse_chart_response(data: Dict[str, Any], count: Optional[int] = 30) -> BarSeries:
+        """차트 응답 파싱 (과거 -> 최근 순, count=None이면 전체)"""
+        if data.get("rt_cd") != "0":
+            raise KiwoomAPIError(f"차트 데이터 조회 실패: {data.get('msg1', 'Unknown error')}", "FHKST03010100")
+
+        # 응답은 최근 일자부터 내려오므로 최근 count개를 취한 뒤 일자 오름차순 정렬
+        output = sorted(data.get("output2", []), key=lambda item: item.get("stck_bsop_date", ""))
+        if count is not None:
+            output = output[-count:]
+
+        # 봉마다 dict를 만들지 않고 필드별 열로 바로 모음
+        return BarSeries(
+            [int(item.get("stck_bsop_date") or 0) for item in output],
+            [float(item.get("stck_oprc", 0)) for item in output],
+            [float(item.get("stck_hgpr", 0)) for item in output],
+            [float(item.get("stck_lwpr", 0)) for item in output],
+            [float(item.get("stck_clpr", 0)) for item in output],
+            [int(item.get("acml_vol", 0)) for item in output],
+        )
+
+    def build_name_request(self, stock_code: str) -> RequestSpec:
+        """종목명 조회 요청 구성"""
         url = f"{self.base_url}/uapi/domestic-stock/v1/quotations/search-stock-info"
-        headers = self.auth.get_auth_headers()
-        headers["tr_id"] = "CTPF1002R"
-        
         params = {
             "PRDT_TYPE_CD": "300",
             "MICR_DNVL_CNDC_1": stock_code
         }
-        
+        return url, self._headers("CTPF1002R"), params
+
+    @staticmethod
+    def parse_name_response(data: Dict[str, Any], stock_code: str) -> str:
+        """종목명 응답 파싱"""
+        if data.get("rt_cd") != "0":
+            logger.warning(f"종목명 조회 실패 {stock_code}, 기본값 사용: {data.get('msg1', 'Unknown error')}")
+            return KiwoomRequestBuilder.default_name(stock_code)  # 조회 실패시 기본값
+
+        output = data.get("output", [])
+        if output:
+            return output[0].get("prdt_abrv_name", KiwoomRequestBuilder.default_name(stock_code))
+
+        return KiwoomRequestBuilder.default_name(stock_code)
+
+
+class KiwoomService(KiwoomRequestBuilder):
+    """키움증권 API 서비스"""
+
+    def _get(self, spec: RequestSpec) -> requests.Response:
+        """재시도/서킷 브레이커를 거쳐 요청 전송"""
+        return self.resilience.call_sync(spec[1]["tr_id"], lambda: self._attempt(spec))
+
+    def _attempt(self, spec: RequestSpec) -> requests.Response:
+        """스케줄러 허가를 받은 뒤 요청 1회 전송"""
+        url, headers, params = spec
+        tr_id = headers["tr_id"]
+        self.scheduler.acquire_sync(tr_id)
+        start = time.perf_counter()
         try:
             response = requests.get(url, headers=headers, params=params)
             response.raise_for_status()
-            
-            data = response.json()
-            if data.get("rt_cd") != "0":
-                return f"종목{stock_code}"  # 조회 실패시 기본값
-            
-            output = data.get("output", [])
-            if output:
-                return output[0].get("prdt_abrv_name", f"종목{stock_code}")
-            
-            return f"종목{stock_code}"
-            
-        except requests.exceptions.RequestException as e:
-            return f"종목{stock_code}"  # 에러시 기본값 반환
\ No newline at end of file
+            check_rate_limited(tr_id, response.json())
+        except requests.exceptions.HTTPError as e:
+            KIWOOM_REQUESTS.inc(tr_id=tr_id, status="error")
+            raise (rate_limit_error(tr_id, e.response) or classify_error(tr_id, e)) from e
+        except (requests.exceptions.RequestException, KiwoomAPIError):
+            KIWOOM_REQUESTS.inc(tr_id=tr_id, status="error")
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            KIWOOM_REQUEST_SECONDS.observe(elapsed, tr_id=tr_id)
+        KIWOOM_REQUESTS.inc(tr_id=tr_id, status="ok")
+        self.resilience.observe_latency(tr_id, elapsed)
+        return response
+
+    def search_by_condition(self, condition_name: str) -> List[str]:
+        """사용자 조건검색식으로 종목 검색"""
+        try:
+            response = self._get(self.build_condition_request(condition_name))
+
+            return self.parse_condition_response(response.json())
+
+        except KiwoomAPIError as e:
+            raise e.with_context("조건검색 API 호출 실패") from e
+
+    def get_stock_price(self, stock_code: str) -> Dict[str, Any]:
+        """종목의 현재가 정보 조회"""
+        quote = self.live_quote(stock_code)
+        if quote is not None:
+            return quote
+        if self.cache is None:
+            return self._fetch_price(stock_code)
+        return self.cache.quotes.get_or_load_sync(stock_code, lambda: self._fetch_price(stock_code))
+
+    def _fetch_price(self, stock_code: str) -> Dict[str, Any]:
+        try:
+            response = self._get(self.build_price_request(stock_code))
+
+            return self.parse_price_response(response.json())
+
+        except KiwoomAPIError as e:
+            raise e.with_context("현재가 조회 API 호출 실패") from e
+
+    def get_stock_chart_data(self, stock_code: str, period: str = "D", count: int = 30) -> BarSeries:
+        """종목의 차트 데이터 조회 (기술지표 계산용)"""
+        if self.cache is None:
+            chart_data = self._load_chart(stock_code, period, count)
+        else:
+            chart_data = self.cache.charts.get_or_load_sync(
+                (stock_code, period, count),
+                lambda: self._load_chart(stock_code, period, count),
+                ttl=self.cache.chart_ttl()
+            )
+        return self.with_intraday(stock_code, chart_data, period, count)
+
+    def _load_chart(self, stock_code: str, period: str, count: int) -> BarSeries:
+        if self.ohlcv_store is None or period != "D":
+            return self._fetch_chart(stock_code, period, count=count)
+
+        # 마지막 저장일 이후 구간만 조회해 저장소에 이어 붙임 (count개에 못 미치면 과거 구간 보충)
+        start_date = self.ohlcv_store.fetch_start_date(stock_code, count)
+        if start_date is not None:
+            bars = self._fetch_range(stock_code, period, start_date)
+            self.ohlcv_store.upsert_bars(stock_code, bars, start_date=start_date)
+
+        return self.ohlcv_store.load_bars(stock_code, count)
+
+    def _fetch_range(self, stock_code: str, period: str, start_date: str) -> BarSeries:
+        """start_date부터 오늘까지 (응답이 최대 행 수로 잘리면 이전 구간을 이어서 조회)"""
+        pages = [self._fetch_chart(stock_code, period, start_date=start_date, count=None)]
+        end_date = self.next_chart_page(start_date, pages[-1], len(pages))
+        while end_date is not None:
+            pages.append(self._fetch_chart(stock_code, period, start_date=start_date, end_date=end_date, count=None))
+            end_date = self.next_chart_page(start_date, pages[-1], len(pages))
+        return BarSeries.concat(pages[::-1])
+
+    def _fetch_chart(self, stock_code: str, period: str, start_date: str = "", count: Optional[int] = 30,
+                     end_date: str = "") -> BarSeries:
+        try:
+            response = self._get(self.build_chart_request(stock_code, period, start_date, end_date))
+
+            return self.parse_chart_response(response.json(), count)
+
+        except KiwoomAPIError as e:
+            raise e.with_context("차트 데이터 조회 API 호출 실패") from e
+
+    def get_stock_name(self, stock_code: str) -> str:
+        """종목코드로 종목명 조회"""
+        name = self.stock_master.name(stock_code) if self.stock_master is not None else None
+        if name:
+            return name
+        if self.cache is None:
+            return self._fetch_name(stock_code)
+        # 기본값(조회 실패)은 캐시하지 않음
+        return self.cache.names.get_or_load_sync(
+            stock_code,
+            lambda: self._fetch_name(stock_code),
+            should_cache=lambda name: name != self.default_name(stock_code)
+        )
+
+    def _fetch_name(self, stock_code: str) -> str:
+        try:
+            response = self._get(self.build_name_request(stock_code))
+
+            return self.parse_name_response(response.json(), stock_code)
+
+        except KiwoomAPIError as e:
+            logger.warning(f"종목명 조회 실패 {stock_code}, 기본값 사용: {str(e)}")
+            return self.default_name(stock_code)  # 에러시 기본값 반환 (캐시하지 않음)
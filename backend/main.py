@@ -1,22 +1,44 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, PlainTextResponse, Response, JSONResponse
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 import asyncio
 import logging
 
-from stock_models import StockSearchResponse, AnalyzedStock, StockInfo
-from kiwoom_service import KiwoomService
-from condition_service import ConditionService
+# 가벼운 모듈만 가져옴 (pandas/numpy/httpx 등은 lifespan에서 서비스 생성시)
+from stock_models import StockSearchResponse, ScanResponse, StrategyScreenResponse, Watchlist
+from rate_limiter import SchedulerQueueFull
+from resilience import KiwoomAPIError
+from result_view import ResultQuery, ResultView, InvalidQuery, StaleCursor, render, dumps
+from service_container import ServiceContainer
+from metrics import REGISTRY, track_request, stage_timer, summarize_timings
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 서비스 인스턴스 (lifespan에서 생성)
+services = ServiceContainer()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """앱 수명주기: 서비스 생성/공유 HTTP 클라이언트 시작 후 준비 작업(종목 마스터, 토큰,
+    지표 프로세스 풀)과 사전 계산/실시간 시세는 요청 처리와 함께 백그라운드로 진행"""
+    await services.start()
+    try:
+        yield
+    finally:
+        await services.close()
+
+
 app = FastAPI(
     title="키움증권 주식 검색기 API",
     description="키움증권 REST API를 활용한 주식 조건검색 서비스",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS 설정
@@ -28,10 +50,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 서비스 인스턴스
-kiwoom_service = KiwoomService()
-condition_service = ConditionService()
-
 
 @app.get("/")
 async def root():
@@ -40,121 +58,494 @@ async def root():
 
 
 @app.get("/health")
+@app.get("/health/live")
 async def health_check():
-    """헬스체크"""
+    """헬스체크 (liveness) - 프로세스 응답 여부만 확인 (토큰 발급 등 외부 호출 없음)"""
+    return services.liveness()
+
+
+@app.get("/health/ready")
+async def readiness_check():
+    """준비 상태 (readiness) - HTTP 클라이언트 시작, 토큰 발급, 종목 마스터 스냅샷 읽기가 끝나면 200, 아니면 503
+
+    준비 작업(지표 프로세스 풀 포함)은 요청 처리와 함께 진행되며 진행 현황은 warmup에 표시됩니다.
+    """
+    readiness = services.readiness()
+    return JSONResponse(readiness, status_code=200 if services.ready else 503)
+
+
+def _split_param(value: Optional[str]) -> Optional[List[str]]:
+    """콤마 구분 쿼리 파라미터 분리"""
+    if not value:
+        return None
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+# 과부하(대기열 초과) 또는 증권사 API 장애 - 503으로 응답 (CircuitOpenError 포함)
+BROKER_UNAVAILABLE = (SchedulerQueueFull, KiwoomAPIError)
+
+
+def _unavailable(e: Exception) -> HTTPException:
+    """과부하/증권사 장애를 503 응답으로 변환"""
+    if isinstance(e, SchedulerQueueFull):
+        logger.warning(f"요청 대기열 초과: {str(e)}")
+        return HTTPException(status_code=503, detail="요청이 많아 잠시 후 다시 시도해주세요.")
+    logger.warning(f"증권사 API 장애: {str(e)}")
+    return HTTPException(status_code=503, detail="증권사 API 응답이 원활하지 않습니다. 잠시 후 다시 시도해주세요.")
+
+
+def _parse_query(**params) -> ResultQuery:
+    """정렬/필터/필드/페이지 파라미터 검증 (오류는 400)"""
     try:
-        # 키움 인증 테스트
-        token = kiwoom_service.auth.get_access_token()
-        return {"status": "healthy", "auth": "ok" if token else "fail"}
-    except Exception as e:
-        return {"status": "unhealthy", "error": str(e)}
+        return ResultQuery.parse(**params)
+    except InvalidQuery as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _json_response(envelope: dict, view: ResultView, query: ResultQuery, version: Optional[int] = None) -> Response:
+    """종목 목록에 조회 조건을 적용하고 미리 직렬화된 JSON으로 응답"""
+    try:
+        page = view.page(query, version)
+    except StaleCursor as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except InvalidQuery as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Response(content=render(envelope, page), media_type="application/json")
 
 
 @app.post("/api/search", response_model=StockSearchResponse)
-async def search_stocks(condition_name: str):
-    """조건검색식을 사용한 종목 검색"""
-    start_time = datetime.now()
+async def search_stocks(
+    condition_name: str,
+    market: Optional[str] = None,
+    sector: Optional[str] = None,
+    max_staleness: Optional[float] = None,
+    force_refresh: bool = False,
+    timings: bool = False,
+    sort: Optional[str] = None,
+    meets_conditions: Optional[bool] = None,
+    min_confidence: Optional[float] = None,
+    signal: Optional[str] = None,
+    fields: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+):
+    """조건검색식을 사용한 종목 검색
+
+    market/sector(콤마 구분)를 지정하면 종목 마스터 기준으로 분석 전에 걸러냅니다.
+    max_staleness(초, 기본 PRESCREEN_MAX_STALENESS) 안에 계산된 결과가 있으면
+    다시 계산하지 않고 반환하며, force_refresh=true면 항상 새로 계산합니다.
+    timings=true면 이 요청의 단계별 소요 시간을 응답에 포함합니다.
+
+    결과 조회 조건:
+    - sort: 정렬 항목 (기본 -confidence, '-'는 내림차순)
+    - meets_conditions / min_confidence / signal: 필터
+    - fields: 응답에 포함할 필드 (콤마 구분, 예: stock_info.code,strategy)
+    - limit / cursor: 페이지 크기와 이전 응답의 next_cursor
+      (커서의 결과 버전이 갱신되어 사라졌으면 409)
+    """
+    query = _parse_query(
+        sort=sort, meets_conditions=meets_conditions, min_confidence=min_confidence,
+        signal=signal, fields=_split_param(fields), limit=limit, cursor=cursor
+    )
+    key = services.prescreen_service.make_key(
+        condition_name,
+        markets=[m.upper() for m in _split_param(market) or []],
+        sectors=_split_param(sector)
+    )
     
     try:
         logger.info(f"조건검색 시작: {condition_name}")
-        
-        # 1. 조건검색으로 종목 코드 리스트 가져오기
-        stock_codes = kiwoom_service.search_by_condition(condition_name)
-        logger.info(f"조건검색 결과: {len(stock_codes)}개 종목")
-        
-        if not stock_codes:
-            return StockSearchResponse(
-                success=True,
-                message="조건에 맞는 종목이 없습니다.",
-                stocks=[],
-                total_count=0,
-                search_time=datetime.now()
+        with track_request() as stage_times, stage_timer("search"):
+            result, from_cache = await services.prescreen_service.get_or_compute(
+                key, max_staleness=max_staleness, force_refresh=force_refresh,
+                pinned_version=query.cursor_version
             )
-        
-        # 2. 각 종목에 대해 상세 분석 수행
-        analyzed_stocks = []
-        
-        for stock_code in stock_codes[:20]:  # 최대 20개 종목만 분석
-            try:
-                # 종목 기본 정보 조회
-                price_info = kiwoom_service.get_stock_price(stock_code)
-                stock_name = kiwoom_service.get_stock_name(stock_code)
-                
-                # 차트 데이터 조회 (30일)
-                chart_data = kiwoom_service.get_stock_chart_data(stock_code, period="D", count=30)
-                
-                if not chart_data:
-                    continue
-                
-                # 기술지표 계산
-                indicators = condition_service.calculate_indicators(chart_data)
-                
-                # 조건 검증
-                meets_conditions = condition_service.meets_all_conditions(indicators, chart_data)
-                
-                # 매매 전략 생성
-                strategy = condition_service.generate_trading_strategy(indicators, meets_conditions)
-                
-                # 종목 정보 구성
-                stock_info = StockInfo(
-                    code=stock_code,
-                    name=stock_name,
-                    price=price_info["price"],
-                    change_percent=price_info["change_percent"],
-                    volume=price_info["volume"]
-                )
-                
-                analyzed_stock = AnalyzedStock(
-                    stock_info=stock_info,
-                    indicators=indicators,
-                    strategy=strategy,
-                    meets_conditions=meets_conditions
-                )
-                
-                analyzed_stocks.append(analyzed_stock)
-                logger.info(f"분석 완료: {stock_name} ({stock_code})")
-                
-            except Exception as e:
-                logger.error(f"종목 분석 실패 {stock_code}: {str(e)}")
-                continue
-        
-        # 조건 충족하는 종목만 필터링 (선택사항)
-        # analyzed_stocks = [stock for stock in analyzed_stocks if stock.meets_conditions]
-        
-        # 신뢰도 순으로 정렬
-        analyzed_stocks.sort(key=lambda x: x.strategy.confidence, reverse=True)
-        
-        search_time = datetime.now()
-        duration = (search_time - start_time).total_seconds()
-        
-        logger.info(f"검색 완료: {len(analyzed_stocks)}개 종목, {duration:.2f}초 소요")
-        
-        return StockSearchResponse(
-            success=True,
-            message=f"검색 완료: {len(analyzed_stocks)}개 종목 분석",
-            stocks=analyzed_stocks,
-            total_count=len(analyzed_stocks),
-            search_time=search_time
-        )
-        
+    except BROKER_UNAVAILABLE as e:
+        # 과부하/증권사 장애 시에는 이전 결과라도 있으면 경과 시간과 함께 반환
+        result = services.prescreen_service.serve_stale(key)
+        if result is None:
+            raise _unavailable(e)
+        logger.warning(f"새로 계산할 수 없음 - 이전 결과 반환 (v{result.version}, {result.age:.0f}초 경과): {str(e)}")
+        from_cache = True
+    except Exception as e:
+        logger.error(f"검색 중 오류: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"검색 중 오류가 발생했습니다: {str(e)}")
+    
+    if from_cache:
+        logger.info(f"저장된 결과 사용: {condition_name} v{result.version} ({result.age:.1f}초 경과)")
+    else:
+        logger.info(f"검색 완료: {len(result.stocks)}개 종목, {result.duration:.2f}초 소요")
+    
+    return _json_response({
+        "success": True,
+        "message": f"검색 완료: {len(result.stocks)}개 종목 분석" if result.stocks or result.failed_codes else "조건에 맞는 종목이 없습니다.",
+        "search_time": datetime.now(),
+        "failed_codes": result.failed_codes,
+        "result_version": result.version,
+        "computed_at": result.computed_at,
+        "from_cache": from_cache,
+        "timings": summarize_timings(stage_times) if timings else None
+    }, result.view, query, result.version)
+
+
+def _format_event(event: str, data: dict, fmt: str) -> str:
+    """스트리밍 이벤트 직렬화 (sse 또는 ndjson)"""
+    if fmt == "sse":
+        return f"event: {event}\ndata: {dumps(data).decode('utf-8')}\n\n"
+    return dumps({"event": event, "data": data}).decode("utf-8") + "\n"
+
+
+@app.post("/api/search/stream")
+async def search_stocks_stream(
+    condition_name: str,
+    market: Optional[str] = None,
+    sector: Optional[str] = None,
+    format: str = "ndjson"
+):
+    """조건검색 스트리밍 - 분석이 끝나는 종목부터 바로 전송
+
+    이벤트: start(대상 수) → stock(AnalyzedStock) / progress(진행 현황) → summary(순위)
+    format=ndjson(기본) 또는 sse
+    """
+    if format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 형식: {format}")
+    
+    start_time = datetime.now()
+    logger.info(f"조건검색(스트리밍) 시작: {condition_name}")
+    
+    try:
+        stock_codes = await services.analysis_pipeline.search_codes(condition_name)
+    except BROKER_UNAVAILABLE as e:
+        raise _unavailable(e)
     except Exception as e:
         logger.error(f"검색 중 오류: {str(e)}")
         raise HTTPException(status_code=500, detail=f"검색 중 오류가 발생했습니다: {str(e)}")
+    
+    stock_codes = services.stock_master.filter(
+        stock_codes,
+        markets=[m.upper() for m in _split_param(market) or []],
+        sectors=_split_param(sector)
+    )[:20]
+    
+    async def events():
+        counts = {"total": len(stock_codes), "fetched": 0, "analyzed": 0, "failed": 0}
+        # 최종 순위에는 종목코드와 신뢰도만 보관 (종목 데이터는 전송 후 버림)
+        ranking = []
+        failed_codes = []
+        
+        yield _format_event("start", {"condition_name": condition_name, "total": len(stock_codes)}, format)
+        
+        async for kind, stock_code, payload in services.analysis_pipeline.stream(stock_codes):
+            if kind == "analyzed":
+                counts["fetched"] += 1
+                counts["analyzed"] += 1
+                ranking.append((payload.strategy.confidence, stock_code))
+                yield _format_event("stock", payload.model_dump(mode="json"), format)
+            elif kind == "skipped":
+                counts["fetched"] += 1
+            else:
+                counts["failed"] += 1
+                failed_codes.append(stock_code)
+            yield _format_event("progress", dict(counts), format)
+        
+        ranking.sort(key=lambda item: item[0], reverse=True)
+        duration = (datetime.now() - start_time).total_seconds()
+        logger.info(f"검색(스트리밍) 완료: {counts['analyzed']}개 종목, {duration:.2f}초 소요")
+        yield _format_event("summary", {
+            "success": True,
+            "message": f"검색 완료: {counts['analyzed']}개 종목 분석",
+            "ranking": [{"code": code, "confidence": confidence} for confidence, code in ranking],
+            "total_count": counts["analyzed"],
+            "failed_codes": failed_codes,
+            "search_time": datetime.now().isoformat(),
+            "duration": duration
+        }, format)
+    
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(events(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+
+@app.post("/api/scan", response_model=ScanResponse)
+async def scan_stocks(
+    condition_name: Optional[str] = None,
+    universe: str = "condition",
+    market: Optional[str] = None,
+    sector: Optional[str] = None,
+    top_k: int = Query(50, ge=1),
+    prefilter: bool = True,
+    sort: Optional[str] = None,
+    meets_conditions: Optional[bool] = None,
+    min_confidence: Optional[float] = None,
+    signal: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    """개수 제한 없는 전체 스캔 (신뢰도 상위 top_k개 반환)
+
+    universe=condition: 조건검색 결과 전체, universe=market: 종목 마스터 전체
+    sort/meets_conditions/min_confidence/signal/fields는 /api/search와 같으며
+    상위 top_k개 안에서 적용합니다. (스캔 결과는 저장하지 않으므로 커서 없음)
+    """
+    query = _parse_query(
+        sort=sort, meets_conditions=meets_conditions, min_confidence=min_confidence,
+        signal=signal, fields=_split_param(fields)
+    )
+    start_time = datetime.now()
+    
+    if universe == "condition":
+        if not condition_name:
+            raise HTTPException(status_code=400, detail="condition_name이 필요합니다.")
+        try:
+            stock_codes = await services.analysis_pipeline.search_codes(condition_name)
+        except BROKER_UNAVAILABLE as e:
+            raise _unavailable(e)
+    elif universe == "market":
+        stock_codes = services.stock_master.codes()
+        if not stock_codes:
+            raise HTTPException(status_code=503, detail="종목 마스터가 로딩되지 않았습니다.")
+    else:
+        raise HTTPException(status_code=400, detail=f"알 수 없는 universe: {universe}")
+    
+    stock_codes = services.stock_master.filter(
+        stock_codes,
+        markets=[m.upper() for m in _split_param(market) or []],
+        sectors=_split_param(sector)
+    )
+    logger.info(f"전체 스캔 시작: {len(stock_codes)}개 종목 (universe={universe})")
+    
+    try:
+        result = await services.market_scanner.scan(stock_codes, top_k=top_k, prefilter=prefilter)
+    except BROKER_UNAVAILABLE as e:
+        raise _unavailable(e)
+    
+    search_time = datetime.now()
+    duration = (search_time - start_time).total_seconds()
+    logger.info(f"전체 스캔 완료: {result.analyzed}개 분석, {duration:.2f}초 소요")
+    
+    return _json_response({
+        "success": True,
+        "message": f"스캔 완료: {result.scanned}개 중 {result.analyzed}개 종목 분석",
+        "search_time": search_time,
+        "failed_codes": list(result.failed),
+        "scanned_count": result.scanned,
+        "prefiltered_out": result.prefiltered_out,
+        "analyzed_count": result.analyzed,
+        "unprocessed_count": result.unprocessed,
+        "result_version": None,
+        "computed_at": None,
+        "from_cache": False,
+        "timings": None
+    }, ResultView(result.stocks), query)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus 지표 (텍스트 형식)"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """캐시 적중/미스 통계"""
+    return services.kiwoom_cache.stats()
+
+
+@app.get("/api/broker/stats")
+async def get_broker_stats():
+    """tr_id별 서킷 브레이커 상태와 응답 시간 (재시도/헤지 설정 포함)"""
+    resilience = services.kiwoom_service.resilience
+    return {
+        "max_attempts": resilience.max_attempts,
+        "hedge_tr_ids": sorted(resilience.hedge_tr_ids),
+        "hedge_percentile": resilience.hedge_percentile,
+        "endpoints": resilience.stats(),
+    }
+
+
+@app.post("/api/realtime/subscribe")
+async def subscribe_realtime(codes: str):
+    """실시간 시세 관심 종목 추가 (콤마 구분)"""
+    if not services.realtime_feed.available:
+        raise HTTPException(status_code=503, detail="실시간 시세가 설정되지 않았습니다. (REALTIME_WS_URL, websockets 패키지)")
+    added = await services.realtime_feed.subscribe(_split_param(codes) or [], pin=True)
+    return {"added": added, "watchlist": services.realtime_feed.watchlist}
+
+
+@app.get("/api/realtime/quotes")
+async def get_realtime_quotes(codes: str):
+    """실시간 체결 기준 현재가/당일 봉과 증분 기술지표"""
+    result = {}
+    for code in _split_param(codes) or []:
+        state = services.indicator_book.get(code)
+        result[code] = {
+            "bar": services.tick_book.intraday_bar(code),
+            "indicators": state.current if state is not None else None,
+            "golden_cross": state.golden_cross if state is not None else None,
+        }
+    return result
+
+
+@app.get("/api/realtime/stats")
+async def get_realtime_stats():
+    """실시간 시세 수신 현황"""
+    return services.realtime_feed.stats()
+
+
+@app.post("/api/alerts/watchlists", response_model=Watchlist)
+async def create_watchlist(name: str, codes: str, conditions: Optional[str] = None):
+    """관심 종목 알림 등록
+
+    codes: 콤마 구분 종목코드, conditions: 콤마 구분 조건
+    ("default"는 기본 검색 조건, 그 외는 조건식 전략명 - 생략시 default)
+    신호가 바뀌면(HOLD -> BUY 등) /ws/alerts로 알림을 보냅니다.
+    """
+    from alerts import InvalidWatchlist  # 서비스 생성시 이미 로딩됨
+    
+    try:
+        watchlist = services.alert_engine.register(name, _split_param(codes) or [], _split_param(conditions) or [])
+    except InvalidWatchlist as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if services.realtime_feed.available:
+        await services.realtime_feed.subscribe(watchlist.codes)
+    return watchlist
+
+
+@app.get("/api/alerts/watchlists")
+async def list_watchlists():
+    """등록된 관심 종목 목록과 현재 신호"""
+    engine = services.alert_engine
+    return [
+        {**watchlist.model_dump(mode="json"), "signals": engine.signals(watchlist.id)}
+        for watchlist in engine.watchlists.values()
+    ]
+
+
+@app.delete("/api/alerts/watchlists/{watchlist_id}")
+async def delete_watchlist(watchlist_id: str):
+    """관심 종목 알림 삭제 (다른 목록이 감시하지 않는 종목은 실시간 시세 구독도 해지)"""
+    engine = services.alert_engine
+    watchlist = engine.watchlists.get(watchlist_id)
+    if watchlist is None or not engine.remove(watchlist_id):
+        raise HTTPException(status_code=404, detail=f"관심 종목 목록이 없습니다: {watchlist_id}")
+    if services.realtime_feed.available:
+        watched = set(engine.codes())
+        await services.realtime_feed.unsubscribe([code for code in watchlist.codes if code not in watched])
+    return {"deleted": watchlist_id}
+
+
+@app.get("/api/alerts/stats")
+async def get_alert_stats():
+    """알림 엔진 현황 (평가/생략 종목 수, 발송 이벤트, 구독자)"""
+    return services.alert_engine.stats()
+
+
+@app.websocket("/ws/alerts")
+async def alerts_websocket(websocket: WebSocket, watchlist_id: Optional[str] = None):
+    """신호 전환 알림 구독 (watchlist_id 생략시 전체 목록)
+
+    연결 직후 현재 신호(snapshot)를 보내고, 이후 전환마다 alert 이벤트를 보냅니다.
+    메시지: {"event": "snapshot" | "alert", "data": ...}
+    """
+    engine = services.alert_engine
+    if watchlist_id is not None and watchlist_id not in engine.watchlists:
+        await websocket.close(code=4404, reason="unknown watchlist")
+        return
+    
+    await websocket.accept()
+    queue = engine.subscribe(watchlist_id)
+    
+    async def send_events():
+        ids = [watchlist_id] if watchlist_id is not None else list(engine.watchlists)
+        await websocket.send_text(dumps({"event": "snapshot", "data": {wid: engine.signals(wid) for wid in ids}}).decode("utf-8"))
+        while True:
+            event = await queue.get()
+            await websocket.send_text(dumps({"event": "alert", "data": event.model_dump(mode="json")}).decode("utf-8"))
+    
+    async def wait_closed():
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    
+    sender = asyncio.create_task(send_events())
+    receiver = asyncio.create_task(wait_closed())
+    try:
+        await asyncio.wait([sender, receiver], return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        sender.cancel()
+        receiver.cancel()
+        engine.unsubscribe(queue, watchlist_id)
+
+
+@app.get("/api/prescreen/stats")
+async def get_prescreen_stats():
+    """사전 계산 결과 현황 (버전, 계산 시각, 경과 시간)"""
+    return services.prescreen_service.stats()
+
+
+@app.post("/api/strategies/screen", response_model=StrategyScreenResponse)
+async def screen_strategies(
+    strategies: Optional[str] = None,
+    expression: Optional[str] = None,
+    codes: Optional[str] = None,
+    market: Optional[str] = None,
+    sector: Optional[str] = None,
+    bars: int = 30
+):
+    """저장된 일봉으로 여러 전략을 한 번에 평가 (키움 API 호출 없음)
+
+    strategies: 콤마 구분 전략명 (생략 시 전체), expression: 임시 조건식 (결과 키 "custom")
+    codes를 생략하면 종목 마스터 전체(없으면 저장된 전체 종목)가 대상입니다.
+    """
+    from condition_dsl import ConditionSyntaxError  # 서비스 생성시 이미 로딩됨
+    
+    try:
+        plan = services.strategy_book.plan_for(_split_param(strategies), expression)
+    except ConditionSyntaxError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    stock_codes = _split_param(codes) or services.stock_master.codes() or services.ohlcv_store.codes()
+    stock_codes = services.stock_master.filter(
+        stock_codes,
+        markets=[m.upper() for m in _split_param(market) or []],
+        sectors=_split_param(sector)
+    )
+    
+    chart_data = await services.analysis_pipeline.run_in_executor(services.ohlcv_store.load_many, stock_codes, bars)
+    evaluated_codes = list(chart_data)
+    result = await services.analysis_pipeline.run_in_executor(
+        plan.evaluate_chart_data, [chart_data[code] for code in evaluated_codes]
+    )
+    matches = {
+        name: [code for code, ok in zip(evaluated_codes, flags) if ok]
+        for name, flags in result.items()
+    }
+    logger.info(f"전략 평가 완료: 전략 {len(matches)}개, 종목 {len(evaluated_codes)}개")
+    
+    return StrategyScreenResponse(
+        success=True,
+        message=f"전략 {len(matches)}개를 {len(evaluated_codes)}개 종목에 대해 평가했습니다.",
+        matches=matches,
+        evaluated_count=len(evaluated_codes),
+        missing_codes=[code for code in stock_codes if code not in chart_data],
+        search_time=datetime.now()
+    )
 
 
 @app.get("/api/conditions")
 async def get_available_conditions():
-    """사용 가능한 조건검색식 목록 (더미 데이터)"""
+    """사용 가능한 조건검색식 및 조건식 전략 목록"""
     return {
         "conditions": [
             "사용자_조건검색식",
             "골든크로스_상승",
             "기술적_반등_신호"
         ],
-        "message": "키움 HTS에서 저장한 조건검색식 이름을 사용하세요"
+        "strategies": [
+            {"name": strategy.name, "expression": strategy.expression}
+            for strategy in services.strategy_book.list()
+        ],
+        "message": "키움 HTS에서 저장한 조건검색식 이름을 사용하세요. "
+                   "strategies는 /api/strategies/screen에서 저장된 일봉으로 평가할 수 있습니다."
     }
 
-
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,53 @@
+from datetime import datetime, date, time, timedelta, timezone
+
+# 한국 거래소 정규장 (공휴일은 고려하지 않고 주말만 휴장으로 처리)
+KST = timezone(timedelta(hours=9))
+MARKET_OPEN = time(9, 0)
+MARKET_CLOSE = time(15, 30)
+
+
+def now_kst() -> datetime:
+    """현재 한국 시간"""
+    return datetime.now(KST)
+
+
+def is_trading_day(day: date) -> bool:
+    """거래일 여부 (월~금)"""
+    return day.weekday() < 5
+
+
+def is_market_open(now: datetime = None) -> bool:
+    """정규장 운영 중 여부"""
+    now = now or now_kst()
+    return is_trading_day(now.date()) and MARKET_OPEN <= now.time() < MARKET_CLOSE
+
+
+def previous_trading_day(day: date) -> date:
+    """직전 거래일"""
+    day -= timedelta(days=1)
+    while not is_trading_day(day):
+        day -= timedelta(days=1)
+    return day
+
+
+def latest_session_date(now: datetime = None) -> date:
+    """일봉이 존재해야 하는 가장 최근 거래일 (장 시작 전이면 직전 거래일)"""
+    now = now or now_kst()
+    today = now.date()
+    if is_trading_day(today) and now.time() >= MARKET_OPEN:
+        return today
+    return previous_trading_day(today)
+
+
+def next_session_change(now: datetime = None) -> datetime:
+    """다음 장 시작 또는 장 마감 시각 중 빠른 쪽 (일봉이 바뀌는 시점)"""
+    now = now or now_kst()
+    if is_market_open(now):
+        return datetime.combine(now.date(), MARKET_CLOSE, tzinfo=KST)
+
+    day = now.date()
+    if not (is_trading_day(day) and now.time() < MARKET_OPEN):
+        day += timedelta(days=1)
+        while not is_trading_day(day):
+            day += timedelta(days=1)
+    return datetime.combine(day, MARKET_OPEN, tzinfo=KST)
@@ -0,0 +1,175 @@
+import os
+import time
+import heapq
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from stock_models import AnalyzedStock
+from analysis_pipeline import AnalysisPipeline
+from condition_service import ConditionService
+from batch_indicators import pack_columns
+from ohlcv_store import OHLCVStore
+from metrics import STOCK_FAILURES, stage_timer
+from resilience import failure_reason
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ScanResult:
+    """전체 스캔 결과"""
+    stocks: List[AnalyzedStock] = field(default_factory=list)  # 신뢰도 상위 K개 (내림차순)
+    scanned: int = 0  # 스캔 대상 종목 수
+    prefiltered_out: int = 0  # 1단계에서 제외된 종목 수
+    analyzed: int = 0  # 2단계 분석 완료 종목 수
+    failed: Dict[str, str] = field(default_factory=dict)
+    unprocessed: int = 0  # 시간 제한으로 분석하지 못한 종목 수
+
+
+class TopK:
+    """신뢰도 기준 상위 K개를 유지하는 스트리밍 힙"""
+
+    def __init__(self, k: int):
+        if k < 1:
+            raise ValueError(f"top_k는 1 이상이어야 합니다: {k}")
+        self.k = k
+        self._heap: list = []
+        self._seq = 0
+
+    def push(self, stock: AnalyzedStock):
+        self._seq += 1
+        item = (stock.strategy.confidence, -self._seq, stock)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, item)
+        elif item[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, item)
+
+    def ranked(self) -> List[AnalyzedStock]:
+        return [stock for _, _, stock in sorted(self._heap, key=lambda item: item[:2], reverse=True)]
+
+
+class MarketScanner:
+    """개수 제한 없는 전체 종목 스캔
+
+    1단계: 로컬 저장소의 일봉으로 완화된 조건을 벡터화 계산해 후보를 추립니다.
+           (저장 이력이 없는 종목은 판단할 수 없으므로 그대로 통과)
+    2단계: 후보만 배치 단위로 조회하고, 배치마다 지표를 한 번에 계산해
+           신뢰도 상위 K개를 스트리밍으로 유지합니다.
+    제한 시간을 넘기면 남은 배치는 건너뛰고 그때까지의 순위를 반환합니다.
+    """
+
+    def __init__(
+        self,
+        pipeline: AnalysisPipeline,
+        ohlcv_store: Optional[OHLCVStore] = None,
+        batch_size: Optional[int] = None,
+        deadline: Optional[float] = None,
+        prefilter_slack: Optional[float] = None,
+    ):
+        self.pipeline = pipeline
+        self.ohlcv_store = ohlcv_store
+        self.batch_size = batch_size or int(os.getenv("SCAN_BATCH_SIZE", "50"))
+        self.deadline = deadline or float(os.getenv("SCAN_DEADLINE", "60"))
+        # 1단계 조건 완화 비율 (0이면 원래 조건 그대로)
+        self.prefilter_slack = prefilter_slack if prefilter_slack is not None else float(os.getenv("SCAN_PREFILTER_SLACK", "0.2"))
+
+    def _load_prefilter_input(self, stock_codes: List[str]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """1단계 판단이 가능한 종목(저장 이력 21봉 이상)과 종가/거래량 배열"""
+        cached = self.ohlcv_store.load_many(stock_codes, count=30)
+        known = [code for code in stock_codes if len(cached.get(code, [])) >= 21]
+        charts = [cached[code] for code in known]
+        return known, pack_columns(charts, "close"), pack_columns(charts, "volume")
+
+    async def prefilter(self, stock_codes: List[str]) -> List[str]:
+        """저장된 일봉 기준 1단계 필터 (완화된 RSI/MACD/추세 조건)"""
+        if self.ohlcv_store is None or not stock_codes:
+            return list(stock_codes)
+
+        known, closes, volumes = await self.pipeline.run_in_executor(self._load_prefilter_input, stock_codes)
+        if not known:
+            return list(stock_codes)
+
+        result = await self.pipeline.compute_indicators(closes, volumes)
+        slack = self.prefilter_slack
+        # 당일 봉이 바뀌면 교차 여부가 달라질 수 있으므로 이미 교차했거나
+        # TEMA가 DEMA에 근접한(±3%, 완화 비율만큼 확대) 종목까지 포함
+        band = 0.03 * (1 + slack)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            near_cross = result["golden_cross"] | (np.abs(result["tema_20"] / result["dema_10"] - 1) <= band)
+        passed = (
+            near_cross
+            & (result["rsi_14"] > ConditionService.RSI_MIN * (1 - slack))
+            & (result["macd_oscillator"] > ConditionService.MACD_OSC_MIN - abs(ConditionService.MACD_OSC_MIN) * slack)
+        )
+        dropped = {code for code, ok in zip(known, passed) if not ok}
+        return [code for code in stock_codes if code not in dropped]
+
+    async def _analyze_batch(self, stock_codes: List[str], result: ScanResult, top_k: TopK):
+        """배치 조회 후 지표를 한 번에 계산"""
+        semaphore = asyncio.Semaphore(self.pipeline.max_concurrency)
+
+        async def fetch(code: str):
+            async with semaphore:
+                try:
+                    return code, await asyncio.wait_for(
+                        self.pipeline.fetch_stock(code), timeout=self.pipeline.stock_timeout
+                    )
+                except asyncio.TimeoutError:
+                    result.failed[code] = f"시간 초과 ({self.pipeline.stock_timeout:.1f}초)"
+                    STOCK_FAILURES.inc(reason="timeout")
+                except Exception as e:
+                    result.failed[code] = str(e)
+                    STOCK_FAILURES.inc(reason=failure_reason(e))
+                return code, None
+
+        fetched = [
+            (code, data) for code, data in await asyncio.gather(*(fetch(code) for code in stock_codes))
+            if data is not None and data[2]
+        ]
+        if not fetched:
+            return
+
+        charts = [data[2] for _, data in fetched]
+        with stage_timer("indicators_batch"):
+            analyzed = await self.pipeline.analyze_charts(charts)
+            timeframes = await self.pipeline.analyze_timeframes(charts)
+        for (code, (price_info, stock_name, _)), (indicators, meets), frames in zip(fetched, analyzed, timeframes):
+            top_k.push(self.pipeline.compose(code, stock_name, price_info, indicators, meets, frames))
+            result.analyzed += 1
+
+    async def scan(self, stock_codes: List[str], top_k: int = 50, prefilter: bool = True,
+                   deadline: Optional[float] = None) -> ScanResult:
+        """전체 종목 스캔 후 신뢰도 상위 top_k개 반환"""
+        started = time.monotonic()
+        limit = deadline or self.deadline
+        result = ScanResult(scanned=len(stock_codes))
+
+        candidates = list(dict.fromkeys(stock_codes))
+        if prefilter:
+            with stage_timer("prefilter"):
+                candidates = await self.prefilter(candidates)
+        result.prefiltered_out = len(set(stock_codes)) - len(candidates)
+        logger.info(f"스캔 1단계: {len(stock_codes)}개 중 {len(candidates)}개 후보")
+
+        ranking = TopK(top_k)
+        for offset in range(0, len(candidates), self.batch_size):
+            remaining = limit - (time.monotonic() - started)
+            if remaining <= 0:
+                result.unprocessed = len(candidates) - offset
+                logger.warning(f"스캔 시간 초과: {result.unprocessed}개 종목 미처리")
+                break
+
+            batch = candidates[offset:offset + self.batch_size]
+            try:
+                await asyncio.wait_for(self._analyze_batch(batch, result, ranking), timeout=remaining)
+            except asyncio.TimeoutError:
+                result.unprocessed = len(candidates) - offset
+                logger.warning(f"스캔 시간 초과: {result.unprocessed}개 종목 미처리")
+                break
+
+        result.stocks = ranking.ranked()
+        return result
@@ -0,0 +1,230 @@
+import time
+import bisect
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# 기본 지연시간 버킷(초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [(name, value) for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type_name}"]
+
+
+class Counter(_Metric):
+    """누적 카운터"""
+    type_name = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    """누적 버킷 히스토그램"""
+    type_name = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, List[float]] = {}  # 버킷별 개수 + [합계, 개수]
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = self.header()
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key, ("le", "+Inf"))
+            lines.append(f"{self.name}_bucket{labels} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {series[-1]}")
+        return lines
+
+
+class CallbackMetric(_Metric):
+    """수집 시점에 콜백으로 값을 읽는 지표 (캐시/스케줄러 통계 등)"""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str],
+                 collect: Callable[[], Iterable[Tuple[LabelValues, float]]], type_name: str = "gauge"):
+        super().__init__(name, help_text, labelnames)
+        self.type_name = type_name
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in self.collect()
+        ]
+
+
+class MetricsRegistry:
+    """지표 모음 및 Prometheus 텍스트 형식 출력"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help_text, labelnames, buckets))
+
+    def callback(self, name: str, help_text: str, labelnames: Sequence[str],
+                 collect: Callable[[], Iterable[Tuple[LabelValues, float]]], type_name: str = "gauge") -> CallbackMetric:
+        return self.register(CallbackMetric(name, help_text, labelnames, collect, type_name))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# 키움 API 호출
+KIWOOM_REQUEST_SECONDS = REGISTRY.histogram(
+    "kiwoom_request_seconds", "키움 API 응답 시간 (속도 제한 대기 제외)", ["tr_id"])
+KIWOOM_REQUESTS = REGISTRY.counter(
+    "kiwoom_requests_total", "키움 API 호출 수", ["tr_id", "status"])
+KIWOOM_RETRIES = REGISTRY.counter(
+    "kiwoom_retries_total", "키움 API 재시도 수", ["tr_id"])
+KIWOOM_HEDGES = REGISTRY.counter(
+    "kiwoom_hedged_requests_total", "키움 API 헤지 요청 수 (sent: 전송, won: 헤지 응답이 먼저 도착)", ["tr_id", "result"])
+KIWOOM_CIRCUIT_REJECTIONS = REGISTRY.counter(
+    "kiwoom_circuit_rejections_total", "서킷 브레이커가 열려 거절한 호출 수", ["tr_id"])
+SCHEDULER_WAIT_SECONDS = REGISTRY.histogram(
+    "scheduler_wait_seconds", "속도 제한 스케줄러 대기 시간", ["tr_id"])
+
+# 검색 단계
+STAGE_SECONDS = REGISTRY.histogram(
+    "search_stage_seconds", "검색 단계별 소요 시간", ["stage"])
+STOCK_FAILURES = REGISTRY.counter(
+    "stock_failures_total", "종목 분석 실패 수", ["reason"])
+
+
+# 요청별 단계 시간 (활성화된 요청에서만 집계)
+_request_timings: contextvars.ContextVar[Optional[Dict[str, List[float]]]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+
+@contextmanager
+def track_request():
+    """블록 안에서 기록되는 단계 시간을 요청 단위로도 모음"""
+    timings: Dict[str, List[float]] = {}
+    token = _request_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _request_timings.reset(token)
+
+
+def summarize_timings(timings: Dict[str, List[float]]) -> Dict[str, Dict[str, float]]:
+    """단계별 {합계(초), 횟수, 최대(초)} - 동시 실행 단계는 합계가 경과 시간보다 클 수 있음"""
+    return {
+        stage: {"total": round(sum(values), 6), "count": len(values), "max": round(max(values), 6)}
+        for stage, values in timings.items()
+    }
+
+
+def add_request_timings(timings: Dict[str, List[float]]):
+    """다른 태스크에서 모은 단계 시간을 현재 요청 집계에 추가 (히스토그램에는 이미 기록됨)"""
+    current = _request_timings.get()
+    if current is not None:
+        for stage, values in timings.items():
+            current.setdefault(stage, []).extend(values)
+
+
+def record_stage(stage: str, seconds: float):
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.setdefault(stage, []).append(seconds)
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """검색 단계 시간 측정 (히스토그램 + 요청별 집계)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+실시간 체결 모의 WebSocket 서버 (개발/테스트용)
+
+구독 요청을 받은 종목에 대해 무작위 체결을 실시간 시세 형식으로 전송합니다.
+
+사용 예:
+    python mock_quote_feed.py --port 8765 --interval 0.2
+    REALTIME_WS_URL=ws://localhost:8765 REALTIME_WATCHLIST=005930,000660 python start.py
+"""
+
+import json
+import random
+import asyncio
+import argparse
+from typing import Dict, Set
+
+from market_hours import now_kst
+from realtime_quotes import Tick, format_trade_message
+
+
+class MockQuoteFeed:
+    """종목별 무작위 보행 체결 생성기"""
+
+    def __init__(self, interval: float = 0.5, batch: int = 20, seed: int = None):
+        self.interval = interval
+        self.batch = batch
+        self._random = random.Random(seed)
+        self._state: Dict[str, Dict[str, float]] = {}
+
+    def _next_tick(self, stock_code: str) -> Tick:
+        state = self._state.get(stock_code)
+        if state is None:
+            base = float(self._random.randrange(5_000, 200_000, 100))
+            state = self._state[stock_code] = {
+                "prev_close": base, "open": base, "high": base, "low": base, "price": base, "volume": 0.0
+            }
+        price = max(1.0, round(state["price"] * (1 + self._random.gauss(0, 0.002))))
+        state["price"] = price
+        state["high"] = max(state["high"], price)
+        state["low"] = min(state["low"], price)
+        state["volume"] += self._random.randint(1, 500)
+        return Tick(
+            code=stock_code,
+            price=price,
+            change_percent=(price / state["prev_close"] - 1) * 100,
+            cum_volume=state["volume"],
+            open=state["open"],
+            high=state["high"],
+            low=state["low"],
+        )
+
+    async def handler(self, websocket, *args):
+        """연결 하나: 구독 요청 수신과 체결 전송을 함께 처리"""
+        subscribed: Set[str] = set()
+
+        async def receive():
+            async for message in websocket:
+                request = json.loads(message)
+                header, body = request.get("header", {}), request.get("body", {}).get("input", {})
+                stock_code = body.get("tr_key")
+                if not stock_code:
+                    continue
+                if header.get("tr_type") == "2":
+                    subscribed.discard(stock_code)
+                else:
+                    subscribed.add(stock_code)
+                await websocket.send(json.dumps({
+                    "header": {"tr_id": body.get("tr_id"), "tr_key": stock_code},
+                    "body": {"rt_cd": "0", "msg1": "SUBSCRIBE SUCCESS"},
+                }))
+
+        receiver = asyncio.create_task(receive())
+        try:
+            while not receiver.done():
+                codes = list(subscribed)
+                if codes:
+                    sample = self._random.sample(codes, min(self.batch, len(codes)))
+                    ticks = [self._next_tick(code) for code in sample]
+                    await websocket.send(format_trade_message(ticks, now_kst().strftime("%H%M%S")))
+                await asyncio.sleep(self.interval)
+        finally:
+            receiver.cancel()
+
+
+async def serve(host: str, port: int, feed: MockQuoteFeed):
+    import websockets
+
+    async with websockets.serve(feed.handler, host, port):
+        print(f"📡 모의 실시간 시세 서버: ws://{host}:{port}")
+        await asyncio.Future()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="실시간 체결 모의 WebSocket 서버")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--interval", type=float, default=0.5, help="전송 간격(초)")
+    parser.add_argument("--batch", type=int, default=20, help="메시지당 최대 체결 수")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, MockQuoteFeed(args.interval, args.batch, args.seed)))
+    except KeyboardInterrupt:
+        print("\n👋 모의 시세 서버가 종료되었습니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import os
+import math
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Sequence, Union
+
+from market_hours import KST, MARKET_CLOSE, now_kst, is_market_open, latest_session_date
+from bar_series import BarSeries
+
+DEFAULT_STORE_PATH = Path(__file__).parent / "data" / "ohlcv.sqlite3"
+
+
+class OHLCVStore:
+    """종목별 일봉 로컬 저장소 (SQLite, (code, date) 기준 클러스터링)
+
+    이미 저장된 종목은 마지막 저장일 이후 구간만 조회해 이어 붙이므로
+    반복 검색 시 차트 API 호출이 거의 발생하지 않습니다.
+    요청한 봉 수(count)만큼의 기간을 아직 조회한 적 없는 종목은 그 기간부터
+    다시 받아(과거 구간 보충) 주봉/월봉 리샘플에 필요한 이력을 채웁니다.
+    """
+
+    # 거래일 -> 달력일 환산 (연 거래일 약 245일) 및 연휴 여유
+    CALENDAR_DAYS_PER_BAR = 365 / 245
+    CALENDAR_MARGIN_DAYS = 10
+
+    def __init__(self, path: Optional[str] = None, intraday_refresh: Optional[float] = None):
+        self.path = Path(path or os.getenv("OHLCV_STORE_PATH", str(DEFAULT_STORE_PATH)))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # 장중 당일 봉 재조회 최소 간격(초)
+        self.intraday_refresh = intraday_refresh or float(os.getenv("OHLCV_INTRADAY_REFRESH", "60"))
+        # 신규 종목 최초 조회 기간(일) - 요청 봉 수가 더 많으면 그만큼 늘림
+        self.initial_days = int(os.getenv("OHLCV_INITIAL_DAYS", "150"))
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS daily_bars (
+                code   TEXT    NOT NULL,
+                date   TEXT    NOT NULL,
+                open   REAL    NOT NULL,
+                high   REAL    NOT NULL,
+                low    REAL    NOT NULL,
+                close  REAL    NOT NULL,
+                volume INTEGER NOT NULL,
+                PRIMARY KEY (code, date)
+            ) WITHOUT ROWID;
+
+            CREATE TABLE IF NOT EXISTS sync_state (
+                code      TEXT PRIMARY KEY,
+                synced_at REAL NOT NULL
+            ) WITHOUT ROWID;
+
+            CREATE TABLE IF NOT EXISTS history_state (
+                code           TEXT PRIMARY KEY,
+                requested_from TEXT NOT NULL
+            ) WITHOUT ROWID;
+        """)
+        self._conn.commit()
+
+    def last_date(self, stock_code: str) -> Optional[str]:
+        """저장된 마지막 일자 (YYYYMMDD)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(date) FROM daily_bars WHERE code = ?", (stock_code,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def history_start_date(self, count: Optional[int] = None) -> str:
+        """최근 count개 봉을 담는 조회 시작일 (최소 initial_days일 전)"""
+        days = self.initial_days
+        if count:
+            days = max(days, math.ceil(count * self.CALENDAR_DAYS_PER_BAR) + self.CALENDAR_MARGIN_DAYS)
+        return (now_kst().date() - timedelta(days=days)).strftime("%Y%m%d")
+
+    def requested_from(self, stock_code: str) -> Optional[str]:
+        """지금까지 조회한 가장 이른 시작일 (이전 버전 저장분은 저장된 첫 일자)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT requested_from FROM history_state WHERE code = ?", (stock_code,)
+            ).fetchone()
+            if row is None:
+                row = self._conn.execute(
+                    "SELECT MIN(date) FROM daily_bars WHERE code = ?", (stock_code,)
+                ).fetchone()
+        return row[0] if row else None
+
+    def fetch_start_date(self, stock_code: str, count: Optional[int] = None) -> Optional[str]:
+        """조회가 필요한 시작일 - 최신 상태면 None
+
+        마지막 저장일도 다시 받아 장중 미완성 봉을 갱신합니다. 최근 count개 봉에
+        필요한 기간을 아직 조회하지 않았으면 그 기간부터 다시 받습니다.
+        """
+        now = now_kst()
+        last = self.last_date(stock_code)
+        history_start = self.history_start_date(count)
+        if last is None:
+            return history_start
+
+        requested_from = self.requested_from(stock_code)
+        if requested_from is None or requested_from > history_start:
+            return history_start
+
+        session = latest_session_date(now)
+        if last < session.strftime("%Y%m%d"):
+            return last
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT synced_at FROM sync_state WHERE code = ?", (stock_code,)
+            ).fetchone()
+        synced_at = row[0] if row else 0.0
+
+        # 당일 봉은 장중에는 일정 간격으로, 장 마감 후에는 마감 전에 받은 미완성 봉이면 한 번 더 갱신
+        if is_market_open(now):
+            if time.time() - synced_at >= self.intraday_refresh:
+                return last
+        elif synced_at < datetime.combine(session, MARKET_CLOSE, tzinfo=KST).timestamp():
+            return last
+
+        return None
+
+    def upsert_bars(self, stock_code: str, bars: Union[BarSeries, Sequence[Dict[str, Any]]],
+                    start_date: Optional[str] = None):
+        """일봉 저장 (같은 일자는 덮어씀, start_date: 이 봉들을 조회한 시작일)"""
+        rows = [(stock_code,) + row for row in BarSeries.of(bars).rows() if row[0] != "0"]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO daily_bars (code, date, open, high, low, close, volume) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            if start_date is not None:
+                # 상장 기간이 짧아 봉이 모자란 종목을 매번 다시 받지 않도록 조회 시작일을 기록
+                self._conn.execute(
+                    "INSERT INTO history_state (code, requested_from) VALUES (?, ?) "
+                    "ON CONFLICT(code) DO UPDATE SET requested_from = MIN(requested_from, excluded.requested_from)",
+                    (stock_code, start_date)
+                )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (code, synced_at) VALUES (?, ?)",
+                (stock_code, time.time())
+            )
+            self._conn.commit()
+
+    def load_bars(self, stock_code: str, count: Optional[int] = None) -> BarSeries:
+        """저장된 일봉 조회 (과거 -> 최근 순, 최근 count개)"""
+        query = (
+            "SELECT CAST(date AS INTEGER), open, high, low, close, volume "
+            "FROM daily_bars WHERE code = ? ORDER BY date DESC"
+        )
+        params: tuple = (stock_code,)
+        if count is not None:
+            query += " LIMIT ?"
+            params += (count,)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+
+        rows.reverse()
+        return BarSeries.from_rows(rows)
+
+    def codes(self) -> List[str]:
+        """일봉이 저장된 종목코드 목록"""
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT code FROM daily_bars ORDER BY code").fetchall()
+        return [row[0] for row in rows]
+
+    def load_many(self, stock_codes: List[str], count: Optional[int] = None) -> Dict[str, BarSeries]:
+        """여러 종목의 저장된 일봉 일괄 조회 (저장 이력이 없는 종목은 제외)"""
+        result = {}
+        for code in stock_codes:
+            bars = self.load_bars(code, count)
+            if bars:
+                result[code] = bars
+        return result
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
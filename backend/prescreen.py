@@ -0,0 +1,225 @@
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from stock_models import AnalyzedStock
+from result_view import ResultView
+from analysis_pipeline import AnalysisPipeline
+from stock_master import StockMaster
+from rate_limiter import RequestScheduler, Priority, current_priority
+from metrics import track_request, add_request_timings
+from market_hours import is_market_open
+from single_flight import AsyncSingleFlight
+
+logger = logging.getLogger(__name__)
+
+SearchKey = Tuple[str, Tuple[str, ...], Tuple[str, ...]]  # (조건명, 시장, 업종)
+
+
+@dataclass
+class MaterializedSearch:
+    """저장된 조건검색 결과"""
+    condition_name: str
+    version: int  # 같은 검색 키에서 다시 계산할 때마다 1씩 증가
+    computed_at: datetime
+    computed_monotonic: float
+    stocks: List[AnalyzedStock] = field(default_factory=list)  # 신뢰도 내림차순
+    failed_codes: List[str] = field(default_factory=list)
+    duration: float = 0.0  # 계산 소요 시간(초)
+    _view: Optional[ResultView] = field(default=None, init=False, repr=False)
+
+    @property
+    def view(self) -> ResultView:
+        """정렬/필터/페이지 조회용 직렬화 캐시 (첫 조회시 생성)"""
+        if self._view is None:
+            self._view = ResultView(self.stocks)
+        return self._view
+
+    @property
+    def age(self) -> float:
+        """계산 후 경과 시간(초)"""
+        return time.monotonic() - self.computed_monotonic
+
+
+class PrescreenService:
+    """조건검색 결과 사전 계산 및 재사용
+
+    설정된 조건검색식(PRESCREEN_CONDITIONS)을 백그라운드 우선순위로 주기적으로
+    다시 계산해 메모리에 보관하고, 검색 요청은 허용 경과 시간(max_staleness)
+    안의 결과가 있으면 즉시 돌려줍니다. 요청으로 계산한 결과도 같은 방식으로
+    저장해 짧은 시간 안의 같은 검색은 다시 계산하지 않습니다.
+
+    같은 검색 키의 계산이 이미 진행 중이면 새로 시작하지 않고 그 결과를
+    함께 받습니다. (동시 요청 병합)
+    """
+
+    def __init__(
+        self,
+        pipeline: AnalysisPipeline,
+        stock_master: Optional[StockMaster] = None,
+        conditions: Optional[List[str]] = None,
+        interval: Optional[float] = None,
+        max_staleness: Optional[float] = None,
+        max_stocks: int = 20,
+        max_entries: Optional[int] = None,
+    ):
+        self.pipeline = pipeline
+        self.stock_master = stock_master
+        if conditions is None:
+            conditions = [c.strip() for c in os.getenv("PRESCREEN_CONDITIONS", "").split(",") if c.strip()]
+        self.conditions = conditions
+        self.interval = interval or float(os.getenv("PRESCREEN_INTERVAL", "60"))
+        self.max_staleness = max_staleness if max_staleness is not None else float(os.getenv("PRESCREEN_MAX_STALENESS", "60"))
+        self.max_stocks = max_stocks
+        self.max_entries = max_entries or int(os.getenv("PRESCREEN_MAX_ENTRIES", "100"))
+
+        self._results: "OrderedDict[SearchKey, MaterializedSearch]" = OrderedDict()
+        self._versions: Dict[SearchKey, int] = {}
+        self._flight = AsyncSingleFlight()
+        self._stats = {"hits": 0, "misses": 0, "refreshes": 0, "background_runs": 0, "stale_served": 0}
+
+    @staticmethod
+    def make_key(condition_name: str, markets: Optional[List[str]] = None,
+                 sectors: Optional[List[str]] = None) -> SearchKey:
+        return condition_name, tuple(sorted(markets or [])), tuple(sorted(sectors or []))
+
+    def get(self, key: SearchKey) -> Optional[MaterializedSearch]:
+        """저장된 결과 (경과 시간과 무관)"""
+        return self._results.get(key)
+
+    def _store(self, key: SearchKey, result: MaterializedSearch):
+        self._results[key] = result
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    async def compute(self, key: SearchKey) -> MaterializedSearch:
+        """조건검색 → 시장/업종 필터 → 상위 max_stocks개 분석 후 저장"""
+        condition_name, markets, sectors = key
+        started = time.monotonic()
+
+        stock_codes = await self.pipeline.search_codes(condition_name)
+        if self.stock_master is not None:
+            stock_codes = self.stock_master.filter(stock_codes, markets=markets, sectors=sectors)
+
+        result = await self.pipeline.run(stock_codes[:self.max_stocks])
+        if result.failed:
+            logger.warning(f"분석 실패 종목 {len(result.failed)}개: {', '.join(result.failed)}")
+        stocks = sorted(result.stocks, key=lambda stock: stock.strategy.confidence, reverse=True)
+
+        version = self._versions.get(key, 0) + 1
+        self._versions[key] = version
+        materialized = MaterializedSearch(
+            condition_name=condition_name,
+            version=version,
+            computed_at=datetime.now(),
+            computed_monotonic=time.monotonic(),
+            stocks=stocks,
+            failed_codes=list(result.failed),
+            duration=time.monotonic() - started,
+        )
+        self._store(key, materialized)
+        self._stats["refreshes"] += 1
+        return materialized
+
+    async def compute_shared(self, key: SearchKey) -> MaterializedSearch:
+        """진행 중인 같은 키의 계산이 있으면 그 결과를 공유
+
+        사용자 요청이 백그라운드 우선순위 계산을 기다리지 않도록 계산은 우선순위별로
+        합치며, 백그라운드 갱신만 진행 중인 사용자 요청 계산에 합류합니다.
+        합류한 요청도 계산의 단계별 소요 시간을 함께 받습니다.
+        """
+        priority = current_priority.get()
+        flight_key = (key, priority)
+        if priority == Priority.BACKGROUND and self._flight.running((key, Priority.INTERACTIVE)):
+            flight_key = (key, Priority.INTERACTIVE)
+        result, timings = await self._flight.do(flight_key, lambda: self._compute_tracked(key))
+        add_request_timings(timings)
+        return result
+
+    async def _compute_tracked(self, key: SearchKey) -> Tuple[MaterializedSearch, Dict[str, List[float]]]:
+        with track_request() as timings:
+            return await self.compute(key), timings
+
+    async def get_or_compute(
+        self,
+        key: SearchKey,
+        max_staleness: Optional[float] = None,
+        force_refresh: bool = False,
+        pinned_version: Optional[int] = None,
+    ) -> Tuple[MaterializedSearch, bool]:
+        """허용 경과 시간 안의 저장 결과를 반환하고, 없으면 새로 계산
+
+        pinned_version: 페이지 커서의 결과 버전 - 아직 보관 중이면 경과 시간과 무관하게 반환
+        반환값: (결과, 저장된 결과 사용 여부)
+        """
+        limit = self.max_staleness if max_staleness is None else max_staleness
+        cached = self._results.get(key)
+        if cached is not None and pinned_version is not None and cached.version == pinned_version:
+            self._stats["hits"] += 1
+            return cached, True
+        if cached is not None and not force_refresh and cached.age <= limit:
+            self._stats["hits"] += 1
+            return cached, True
+
+        self._stats["misses"] += 1
+        return await self.compute_shared(key), False
+
+    def serve_stale(self, key: SearchKey) -> Optional[MaterializedSearch]:
+        """새로 계산할 수 없을 때(요청 대기열 초과 등) 대신 쓸 이전 결과"""
+        cached = self._results.get(key)
+        if cached is not None:
+            self._stats["stale_served"] += 1
+        return cached
+
+    async def refresh_all(self):
+        """설정된 조건검색식 전체를 백그라운드 우선순위로 다시 계산"""
+        with RequestScheduler.priority(Priority.BACKGROUND):
+            for condition_name in self.conditions:
+                try:
+                    result = await self.compute_shared(self.make_key(condition_name))
+                    logger.info(
+                        f"사전 계산 완료: {condition_name} v{result.version} "
+                        f"({len(result.stocks)}개 종목, {result.duration:.2f}초)"
+                    )
+                except Exception as e:
+                    logger.error(f"사전 계산 실패 {condition_name}: {str(e)}")
+        self._stats["background_runs"] += 1
+
+    async def run_loop(self):
+        """주기적 사전 계산 (장중에는 interval마다, 장외에는 결과가 없을 때만)"""
+        if not self.conditions:
+            return
+        logger.info(f"사전 계산 시작: {', '.join(self.conditions)} ({self.interval:.0f}초 간격)")
+        while True:
+            missing = any(self.make_key(c) not in self._results for c in self.conditions)
+            if is_market_open() or missing:
+                await self.refresh_all()
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> Dict:
+        return {
+            **self._stats,
+            "executed": self._flight.executed,  # 실제로 실행된 계산 수
+            "coalesced": self._flight.shared,  # 진행 중인 계산에 합류한 요청 수
+            "in_flight": self._flight.in_flight(),
+            "entries": len(self._results),
+            "conditions": list(self.conditions),
+            "results": [
+                {
+                    "condition_name": result.condition_name,
+                    "markets": list(key[1]),
+                    "sectors": list(key[2]),
+                    "version": result.version,
+                    "computed_at": result.computed_at.isoformat(),
+                    "age": round(result.age, 3),
+                    "total_count": len(result.stocks),
+                }
+                for key, result in self._results.items()
+            ],
+        }
@@ -0,0 +1,231 @@
+import os
+import time
+import asyncio
+import threading
+import contextvars
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Dict, Optional
+
+from metrics import SCHEDULER_WAIT_SECONDS
+from shared_state import SharedState, get_default_state
+
+
+class Priority(IntEnum):
+    """요청 우선순위 (값이 작을수록 먼저 처리)"""
+    INTERACTIVE = 0  # 사용자 검색 요청
+    BACKGROUND = 1  # 백그라운드 갱신 작업
+
+
+class SchedulerQueueFull(Exception):
+    """대기열이 가득 차 요청을 받을 수 없음 (backpressure)"""
+
+
+# 현재 실행 흐름의 요청 우선순위 (asyncio 태스크에 자동 전파)
+current_priority: contextvars.ContextVar[Priority] = contextvars.ContextVar(
+    "current_priority", default=Priority.INTERACTIVE
+)
+
+
+class TokenBucket:
+    """토큰 버킷 - 초당 rate개 충전, 최대 capacity개 보관"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """토큰 1개를 얻기까지 남은 시간(초)"""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self):
+        self.tokens -= 1
+
+
+class RequestScheduler:
+    """키움 TR 호출 스케줄러
+
+    전역 버킷과 tr_id별 버킷을 모두 통과해야 요청이 나갑니다.
+    상위 우선순위 요청이 대기 중이면 하위 우선순위 요청은 양보하며,
+    우선순위별 대기열이 가득 차면 SchedulerQueueFull로 즉시 거절합니다.
+
+    공유 상태가 여러 워커에 공유되는 저장소면 버킷도 그곳에 두어 워커 수와
+    무관하게 전체 호출 한도를 지킵니다. (우선순위 양보/대기열은 워커별)
+    """
+
+    # tr_id별 초당 호출 한도 기본값
+    DEFAULT_TR_LIMITS = {
+        "FHKST01010100": 10.0,  # 현재가
+        "FHKST03010100": 10.0,  # 일봉 차트
+        "CTPF1002R": 5.0,  # 종목 정보
+        "PSEARCH_RESULT": 1.0,  # 조건검색
+    }
+
+    def __init__(
+        self,
+        global_rate: Optional[float] = None,
+        tr_limits: Optional[Dict[str, float]] = None,
+        max_queue: Optional[int] = None,
+        poll_interval: float = 0.005,
+        state: Optional[SharedState] = None,
+    ):
+        self.global_bucket = TokenBucket(global_rate or float(os.getenv("KIWOOM_GLOBAL_RPS", "20")))
+
+        limits = dict(self.DEFAULT_TR_LIMITS)
+        limits.update(tr_limits if tr_limits is not None else self._limits_from_env())
+        self.tr_buckets = {tr_id: TokenBucket(rate) for tr_id, rate in limits.items()}
+
+        self.max_queue = max_queue or int(os.getenv("KIWOOM_SCHEDULER_QUEUE", "200"))
+        self.poll_interval = poll_interval
+        state = state or get_default_state()
+        self.shared_state = state if state.distributed else None
+
+        self._lock = threading.Lock()
+        self._waiting = {priority: 0 for priority in Priority}
+        self._stats = {"granted": 0, "rejected": 0, "wait_seconds": 0.0}
+
+    @staticmethod
+    def _limits_from_env() -> Dict[str, float]:
+        """KIWOOM_TR_LIMITS="FHKST01010100=10,CTPF1002R=5" 형식 파싱"""
+        raw = os.getenv("KIWOOM_TR_LIMITS", "")
+        limits = {}
+        for item in raw.split(","):
+            if "=" in item:
+                tr_id, rate = item.split("=", 1)
+                limits[tr_id.strip()] = float(rate)
+        return limits
+
+    @staticmethod
+    @contextmanager
+    def priority(priority: Priority):
+        """블록 안에서 나가는 요청의 우선순위 지정"""
+        token = current_priority.set(priority)
+        try:
+            yield
+        finally:
+            current_priority.reset(token)
+
+    def _enter(self, priority: Priority):
+        with self._lock:
+            if self._waiting[priority] >= self.max_queue:
+                self._stats["rejected"] += 1
+                raise SchedulerQueueFull(
+                    f"요청 대기열 초과 (priority={priority.name}, max_queue={self.max_queue})"
+                )
+            self._waiting[priority] += 1
+
+    def _leave(self, priority: Priority):
+        with self._lock:
+            self._waiting[priority] -= 1
+
+    def _try_acquire(self, tr_id: str, priority: Priority) -> float:
+        """토큰 획득 시도 - 성공시 0, 실패시 다시 시도할 때까지 대기 시간"""
+        if self.shared_state is not None:
+            return self._try_acquire_shared(tr_id, priority)
+
+        with self._lock:
+            if any(self._waiting[p] for p in Priority if p < priority):
+                return self.poll_interval
+
+            now = time.monotonic()
+            wait = self.global_bucket.wait_time(now)
+            tr_bucket = self.tr_buckets.get(tr_id)
+            if tr_bucket is not None:
+                wait = max(wait, tr_bucket.wait_time(now))
+
+            if wait > 0:
+                return max(wait, self.poll_interval)
+
+            self.global_bucket.consume()
+            if tr_bucket is not None:
+                tr_bucket.consume()
+            self._stats["granted"] += 1
+            return 0.0
+
+    def _try_acquire_shared(self, tr_id: str, priority: Priority) -> float:
+        """공유 버킷에서 토큰 획득 시도 (전역/tr_id 버킷을 한 번에)"""
+        with self._lock:
+            if any(self._waiting[p] for p in Priority if p < priority):
+                return self.poll_interval
+
+        buckets = [("global", self.global_bucket.rate)]
+        tr_bucket = self.tr_buckets.get(tr_id)
+        if tr_bucket is not None:
+            buckets.append((f"tr:{tr_id}", tr_bucket.rate))
+        wait = self.shared_state.take_tokens(buckets)
+        if wait > 0:
+            return max(wait, self.poll_interval)
+
+        with self._lock:
+            self._stats["granted"] += 1
+        return 0.0
+
+    async def acquire(self, tr_id: str, priority: Optional[Priority] = None):
+        """호출 허가 대기 (비동기)"""
+        priority = current_priority.get() if priority is None else priority
+        self._enter(priority)
+        start = time.monotonic()
+        try:
+            while True:
+                if self.shared_state is not None:
+                    # 공유 버킷은 SQLite/Redis 왕복이므로 이벤트 루프 밖에서
+                    wait = await asyncio.to_thread(self._try_acquire_shared, tr_id, priority)
+                else:
+                    wait = self._try_acquire(tr_id, priority)
+                if wait == 0:
+                    return
+                await asyncio.sleep(wait)
+        finally:
+            self._leave(priority)
+            self._record_wait(tr_id, time.monotonic() - start)
+
+    def acquire_sync(self, tr_id: str, priority: Optional[Priority] = None):
+        """호출 허가 대기 (동기)"""
+        priority = current_priority.get() if priority is None else priority
+        self._enter(priority)
+        start = time.monotonic()
+        try:
+            while True:
+                wait = self._try_acquire(tr_id, priority)
+                if wait == 0:
+                    return
+                time.sleep(wait)
+        finally:
+            self._leave(priority)
+            self._record_wait(tr_id, time.monotonic() - start)
+
+    def _record_wait(self, tr_id: str, seconds: float):
+        SCHEDULER_WAIT_SECONDS.observe(seconds, tr_id=tr_id)
+        with self._lock:
+            self._stats["wait_seconds"] += seconds
+
+    def stats(self) -> Dict[str, float]:
+        """스케줄러 통계 (허가/거절 건수, 누적 대기시간, 현재 대기열)"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({f"waiting_{p.name.lower()}": n for p, n in self._waiting.items()})
+            return stats
+
+
+_default_scheduler: Optional[RequestScheduler] = None
+_default_lock = threading.Lock()
+
+
+def get_default_scheduler() -> RequestScheduler:
+    """프로세스 공용 스케줄러 (동기/비동기 클라이언트가 같은 예산을 공유)"""
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = RequestScheduler()
+        return _default_scheduler
@@ -0,0 +1,360 @@
+import os
+import json
+import time
+import asyncio
+import importlib.util
+import logging
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Any
+
+import numpy as np
+
+from kiwoom_auth import KiwoomAuth
+from market_hours import now_kst
+from ohlcv_store import OHLCVStore
+from bar_series import BarSeries
+from streaming_indicators import IndicatorStateBook
+
+logger = logging.getLogger(__name__)
+
+# 실시간 체결 TR 및 메시지 필드 위치 ('^' 구분, 종목당 46개 필드)
+TRADE_TR_ID = "H0STCNT0"
+TRADE_FIELD_COUNT = 46
+F_CODE, F_TIME, F_PRICE, F_CHANGE_PERCENT = 0, 1, 2, 5
+F_OPEN, F_HIGH, F_LOW, F_CUM_VOLUME = 7, 8, 9, 13
+
+
+class Tick(NamedTuple):
+    """체결 한 건"""
+    code: str
+    price: float
+    change_percent: float
+    cum_volume: float  # 당일 누적 거래량
+    open: float
+    high: float
+    low: float
+
+
+def parse_trade_message(message: str) -> List[Tick]:
+    """실시간 체결 메시지 파싱: "0|H0STCNT0|건수|필드^필드^..." (여러 건이 이어 붙을 수 있음)"""
+    parts = message.split("|", 3)
+    if len(parts) != 4 or parts[1] != TRADE_TR_ID:
+        return []
+
+    fields = parts[3].split("^")
+    ticks = []
+    for offset in range(0, int(parts[2]) * TRADE_FIELD_COUNT, TRADE_FIELD_COUNT):
+        record = fields[offset:offset + TRADE_FIELD_COUNT]
+        if len(record) <= F_CUM_VOLUME:
+            break
+        ticks.append(Tick(
+            code=record[F_CODE],
+            price=float(record[F_PRICE]),
+            change_percent=float(record[F_CHANGE_PERCENT]),
+            cum_volume=float(record[F_CUM_VOLUME]),
+            open=float(record[F_OPEN]),
+            high=float(record[F_HIGH]),
+            low=float(record[F_LOW]),
+        ))
+    return ticks
+
+
+def format_trade_message(ticks: List[Tick], time_str: str) -> str:
+    """체결 메시지 생성 (모의 피드용, parse_trade_message의 역)"""
+    records = []
+    for tick in ticks:
+        record = ["0"] * TRADE_FIELD_COUNT
+        record[F_CODE] = tick.code
+        record[F_TIME] = time_str
+        record[F_PRICE] = f"{tick.price:.0f}"
+        record[F_CHANGE_PERCENT] = f"{tick.change_percent:.2f}"
+        record[F_OPEN] = f"{tick.open:.0f}"
+        record[F_HIGH] = f"{tick.high:.0f}"
+        record[F_LOW] = f"{tick.low:.0f}"
+        record[F_CUM_VOLUME] = f"{tick.cum_volume:.0f}"
+        records.append("^".join(record))
+    return f"0|{TRADE_TR_ID}|{len(ticks):03d}|" + "^".join(records)
+
+
+class TickBook:
+    """종목별 최종 체결 및 당일 봉 (배열 기반)
+
+    종목마다 슬롯 번호를 부여하고 값은 (종목 x 필드) float64 배열 한 개에
+    저장합니다. 종목 수가 늘면 용량을 두 배로 늘립니다.
+
+    마지막 체결이 bar_max_age초보다 오래된 당일 봉은 차트에 반영하지 않습니다.
+    (연결 끊김/체결 공백 중에는 저장소가 주기적으로 다시 받은 봉이 더 최신)
+    """
+
+    PRICE, CHANGE_PERCENT, CUM_VOLUME, OPEN, HIGH, LOW, UPDATED_AT, SESSION = range(8)
+    FIELD_COUNT = 8
+
+    def __init__(self, capacity: int = 256, bar_max_age: Optional[float] = None):
+        self.bar_max_age = bar_max_age or float(os.getenv("REALTIME_BAR_MAX_AGE", "60"))
+        self._slots: Dict[str, int] = {}
+        self._codes: List[str] = []
+        self._data = np.full((capacity, self.FIELD_COUNT), np.nan)
+        self.updates = 0
+
+    def __contains__(self, stock_code: str) -> bool:
+        return stock_code in self._slots
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def _slot(self, stock_code: str) -> int:
+        slot = self._slots.get(stock_code)
+        if slot is None:
+            slot = len(self._codes)
+            if slot == len(self._data):
+                grown = np.full((len(self._data) * 2, self.FIELD_COUNT), np.nan)
+                grown[:slot] = self._data
+                self._data = grown
+            self._slots[stock_code] = slot
+            self._codes.append(stock_code)
+        return slot
+
+    def update(self, tick: Tick, session: Optional[int] = None, now: Optional[float] = None) -> bool:
+        """체결 반영 - 새 거래일의 첫 체결이면 True (새 봉 시작)"""
+        session = session or int(now_kst().strftime("%Y%m%d"))
+        row = self._data[self._slot(tick.code)]
+        new_bar = row[self.SESSION] != session
+
+        row[self.PRICE] = tick.price
+        row[self.CHANGE_PERCENT] = tick.change_percent
+        row[self.CUM_VOLUME] = tick.cum_volume
+        if new_bar:
+            row[self.OPEN] = tick.open or tick.price
+            row[self.HIGH] = tick.high or tick.price
+            row[self.LOW] = tick.low or tick.price
+            row[self.SESSION] = session
+        else:
+            row[self.HIGH] = max(row[self.HIGH], tick.high or tick.price)
+            row[self.LOW] = min(row[self.LOW], tick.low or tick.price)
+        row[self.UPDATED_AT] = now or time.time()
+        self.updates += 1
+        return new_bar
+
+    def quote(self, stock_code: str, max_age: float) -> Optional[Dict[str, Any]]:
+        """최근 max_age초 안의 체결 기준 현재가 (parse_price_response와 같은 형태)"""
+        slot = self._slots.get(stock_code)
+        if slot is None:
+            return None
+        row = self._data[slot]
+        if time.time() - row[self.UPDATED_AT] > max_age:
+            return None
+        return {
+            "price": float(row[self.PRICE]),
+            "change_percent": float(row[self.CHANGE_PERCENT]),
+            "volume": int(row[self.CUM_VOLUME]),
+            "high": float(row[self.HIGH]),
+            "low": float(row[self.LOW]),
+        }
+
+    def intraday_bar(self, stock_code: str) -> Optional[Dict[str, Any]]:
+        """당일 봉 (차트 데이터와 같은 형태)"""
+        slot = self._slots.get(stock_code)
+        if slot is None:
+            return None
+        row = self._data[slot]
+        return {
+            "date": str(int(row[self.SESSION])),
+            "open": float(row[self.OPEN]),
+            "high": float(row[self.HIGH]),
+            "low": float(row[self.LOW]),
+            "close": float(row[self.PRICE]),
+            "volume": int(row[self.CUM_VOLUME]),
+        }
+
+    def apply_intraday(self, stock_code: str, chart_data: BarSeries, count: Optional[int] = None) -> BarSeries:
+        """일봉 끝에 당일 봉을 반영 (같은 날짜 봉은 교체, 없으면 추가, 오래된 체결이면 그대로)"""
+        slot = self._slots.get(stock_code)
+        if slot is None or not len(chart_data):
+            return chart_data
+        row = self._data[slot]
+        if time.time() - row[self.UPDATED_AT] > self.bar_max_age:
+            return chart_data
+        session = int(row[self.SESSION])
+        if session < chart_data.last_date:
+            return chart_data
+        merged = chart_data.with_bar(
+            session, row[self.OPEN], row[self.HIGH], row[self.LOW], row[self.PRICE], row[self.CUM_VOLUME]
+        )
+        return merged.tail(count or None)
+
+    def prices(self, stock_codes: Iterable[str]) -> np.ndarray:
+        """여러 종목의 현재가 (없으면 NaN)"""
+        slots = [self._slots.get(code, -1) for code in stock_codes]
+        prices = self._data[[max(slot, 0) for slot in slots], self.PRICE]
+        return np.where(np.array(slots) >= 0, prices, np.nan)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"codes": len(self._codes), "updates": self.updates, "bytes": int(self._data.nbytes)}
+
+
+class RealtimeQuoteFeed:
+    """실시간 체결 WebSocket 수신기
+
+    관심 종목을 구독해 체결을 TickBook에 반영하고, 지표 상태(IndicatorStateBook)가
+    있으면 저장된 일봉으로 초기화한 뒤 체결마다 증분 갱신합니다.
+    연결이 끊기면 지수 백오프로 다시 연결하고 구독을 복원합니다.
+    websockets 패키지가 없으면 비활성화됩니다.
+    """
+
+    def __init__(
+        self,
+        tick_book: TickBook,
+        url: Optional[str] = None,
+        watchlist: Optional[List[str]] = None,
+        auth: Optional[KiwoomAuth] = None,
+        indicator_book: Optional[IndicatorStateBook] = None,
+        ohlcv_store: Optional[OHLCVStore] = None,
+        max_backoff: float = 30.0,
+        seed_bars: int = 30,
+    ):
+        self.tick_book = tick_book
+        self.url = url or os.getenv("REALTIME_WS_URL", "")
+        if watchlist is None:
+            watchlist = [c.strip() for c in os.getenv("REALTIME_WATCHLIST", "").split(",") if c.strip()]
+        self.watchlist: List[str] = list(dict.fromkeys(watchlist))
+        self.pinned = set(self.watchlist)  # 설정/API로 직접 구독한 종목 (관심 목록 삭제로 해지하지 않음)
+        self.auth = auth
+        self.indicator_book = indicator_book
+        self.ohlcv_store = ohlcv_store
+        self.max_backoff = max_backoff
+        self.seed_bars = seed_bars  # 지표 상태 초기화에 쓰는 일봉 수 (AnalysisPipeline.DAILY_BARS와 같게)
+        self.listeners: List[Callable[[Tick, bool], None]] = []  # (체결, 새 봉 여부)
+
+        self._websocket = None
+        self._stats = {"connects": 0, "messages": 0, "ticks": 0, "errors": 0}
+
+    @property
+    def available(self) -> bool:
+        return bool(self.url) and importlib.util.find_spec("websockets") is not None
+
+    @property
+    def connected(self) -> bool:
+        return self._websocket is not None
+
+    async def _approval_key(self) -> str:
+        return await self.auth.get_access_token_async() if self.auth is not None else ""
+
+    @staticmethod
+    def _subscribe_message(stock_code: str, approval_key: str, tr_type: str = "1") -> str:
+        """구독(tr_type 1) / 해지(tr_type 2) 요청"""
+        return json.dumps({
+            "header": {"approval_key": approval_key, "custtype": "P", "tr_type": tr_type, "content-type": "utf-8"},
+            "body": {"input": {"tr_id": TRADE_TR_ID, "tr_key": stock_code}},
+        })
+
+    async def subscribe(self, stock_codes: Iterable[str], pin: bool = False) -> List[str]:
+        """관심 종목 추가 (연결 중이면 바로 구독 요청, pin이면 unsubscribe로 해지하지 않음)"""
+        stock_codes = list(dict.fromkeys(stock_codes))
+        if pin:
+            self.pinned.update(stock_codes)
+        added = [code for code in stock_codes if code not in self.watchlist]
+        self.watchlist.extend(added)
+        await self._seed(added)
+        if self._websocket is not None and added:
+            approval_key = await self._approval_key()
+            for code in added:
+                await self._websocket.send(self._subscribe_message(code, approval_key))
+        return added
+
+    async def unsubscribe(self, stock_codes: Iterable[str]) -> List[str]:
+        """관심 종목 해지 (고정 종목 제외, 연결 중이면 바로 해지 요청)"""
+        removed = [code for code in dict.fromkeys(stock_codes) if code in self.watchlist and code not in self.pinned]
+        if not removed:
+            return []
+        self.watchlist = [code for code in self.watchlist if code not in removed]
+        if self._websocket is not None:
+            approval_key = await self._approval_key()
+            for code in removed:
+                await self._websocket.send(self._subscribe_message(code, approval_key, tr_type="2"))
+        return removed
+
+    def on_tick(self, tick: Tick):
+        """체결 한 건 반영 (TickBook → 지표 상태 → 리스너)"""
+        new_bar = self.tick_book.update(tick)
+        self._stats["ticks"] += 1
+
+        # 초기화 전(구독 직후 일봉 읽는 중)인 종목은 지표 갱신 생략
+        if self.indicator_book is not None and tick.code in self.indicator_book:
+            if new_bar:
+                self.indicator_book.on_bar(tick.code, tick.price, tick.cum_volume)
+            else:
+                self.indicator_book.on_tick(tick.code, tick.price, tick.cum_volume)
+
+        for listener in self.listeners:
+            try:
+                listener(tick, new_bar)
+            except Exception as e:
+                logger.error(f"체결 리스너 오류 {tick.code}: {str(e)}")
+
+    async def _seed(self, stock_codes: Iterable[str]):
+        """저장된 최근 seed_bars개 일봉(당일 봉 제외)으로 지표 상태 초기화 (SQLite 읽기는 스레드에서)"""
+        if self.indicator_book is None:
+            return
+        for code in stock_codes:
+            if code not in self.indicator_book:
+                self.indicator_book.seed(code, await asyncio.to_thread(self._seed_bars, code))
+
+    def _seed_bars(self, stock_code: str) -> BarSeries:
+        if self.ohlcv_store is None:
+            return BarSeries.empty()
+        today = int(now_kst().strftime("%Y%m%d"))
+        return self.ohlcv_store.load_bars(stock_code, self.seed_bars + 1).before(today).tail(self.seed_bars)
+
+    async def _handle(self, websocket, message: str):
+        self._stats["messages"] += 1
+        if message[:1] in ("0", "1"):
+            for tick in parse_trade_message(message):
+                self.on_tick(tick)
+            return
+
+        # 제어 메시지 (구독 응답, PINGPONG 등)
+        data = json.loads(message)
+        tr_id = data.get("header", {}).get("tr_id")
+        if tr_id == "PINGPONG":
+            await websocket.send(message)
+        elif data.get("body", {}).get("rt_cd") not in (None, "0"):
+            logger.warning(f"실시간 구독 오류: {data['body'].get('msg1')}")
+
+    async def run(self):
+        """수신 루프 (재연결 포함)"""
+        if not self.available:
+            if self.url:
+                logger.warning("websockets 패키지가 없어 실시간 시세 수신을 사용할 수 없습니다.")
+            return
+
+        websockets = importlib.import_module("websockets")
+        backoff = 1.0
+        while True:
+            try:
+                async with websockets.connect(self.url, ping_interval=20) as websocket:
+                    self._websocket = websocket
+                    self._stats["connects"] += 1
+                    backoff = 1.0
+                    logger.info(f"실시간 시세 연결: {self.url} ({len(self.watchlist)}개 종목 구독)")
+                    await self._seed(self.watchlist)
+                    approval_key = await self._approval_key()
+                    for code in self.watchlist:
+                        await websocket.send(self._subscribe_message(code, approval_key))
+                    async for message in websocket:
+                        await self._handle(websocket, message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.warning(f"실시간 시세 연결 끊김: {str(e)} - {backoff:.0f}초 후 재연결")
+            finally:
+                self._websocket = None
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "connected": self.connected,
+            "watchlist": len(self.watchlist),
+            "book": self.tick_book.stats(),
+        }
@@ -0,0 +1,369 @@
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+from collections import deque
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from metrics import KIWOOM_RETRIES, KIWOOM_HEDGES, KIWOOM_CIRCUIT_REJECTIONS
+
+logger = logging.getLogger(__name__)
+
+# 초당 거래건수 초과 응답 코드
+RATE_LIMIT_MSG_CODES = {"EGW00201"}
+
+
+class KiwoomAPIError(Exception):
+    """키움 API 호출 실패
+
+    retryable: 잠시 후 다시 시도하면 성공할 수 있는 오류 (연결 오류, 시간 초과, 5xx, 호출 한도 초과)
+    """
+
+    def __init__(self, message: str, tr_id: str = "", status: Optional[int] = None,
+                 retryable: bool = False, rate_limited: bool = False):
+        super().__init__(message)
+        self.tr_id = tr_id
+        self.status = status
+        self.retryable = retryable
+        self.rate_limited = rate_limited
+
+    def with_context(self, context: str) -> "KiwoomAPIError":
+        """같은 속성에 설명을 덧붙인 예외"""
+        return type(self)(f"{context}: {self}", self.tr_id, self.status, self.retryable, self.rate_limited)
+
+
+class CircuitOpenError(KiwoomAPIError):
+    """서킷 브레이커가 열려 호출하지 않고 바로 실패"""
+
+
+def classify_error(tr_id: str, error: Exception) -> KiwoomAPIError:
+    """HTTP 클라이언트 예외를 재시도 가능 여부가 표시된 KiwoomAPIError로 변환"""
+    if isinstance(error, KiwoomAPIError):
+        return error
+    # API 서버가 이 모듈의 예외 클래스만 쓸 때는 HTTP 클라이언트를 가져오지 않도록 여기서 가져옴
+    import httpx
+    import requests
+
+    status = None
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+    elif isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        status = error.response.status_code
+
+    if status is not None:
+        return KiwoomAPIError(f"{tr_id} 호출 실패: HTTP {status}", tr_id, status, retryable=status >= 500 or status == 429)
+    # 연결 오류/시간 초과 등 응답을 받지 못한 경우
+    retryable = isinstance(error, (httpx.TransportError, requests.exceptions.ConnectionError,
+                                   requests.exceptions.Timeout))
+    return KiwoomAPIError(f"{tr_id} 호출 실패: {type(error).__name__} {error}", tr_id, retryable=retryable)
+
+
+def failure_reason(error: Exception) -> str:
+    """종목 분석 실패 지표의 사유 라벨"""
+    if isinstance(error, CircuitOpenError):
+        return "circuit_open"
+    if isinstance(error, KiwoomAPIError):
+        return "rate_limited" if error.rate_limited else "broker"
+    return "error"
+
+
+def check_rate_limited(tr_id: str, data: Any):
+    """정상 HTTP 응답 안의 호출 한도 초과 오류 확인"""
+    if isinstance(data, dict) and data.get("rt_cd") not in (None, "0") and data.get("msg_cd") in RATE_LIMIT_MSG_CODES:
+        raise KiwoomAPIError(
+            f"{tr_id} 호출 한도 초과: {data.get('msg1', '')}", tr_id, retryable=True, rate_limited=True
+        )
+
+
+def rate_limit_error(tr_id: str, response) -> Optional[KiwoomAPIError]:
+    """HTTP 오류 응답 본문이 호출 한도 초과인 경우 해당 예외"""
+    try:
+        data = response.json()
+    except ValueError:
+        return None
+    try:
+        check_rate_limited(tr_id, data)
+    except KiwoomAPIError as e:
+        e.status = response.status_code
+        return e
+    return None
+
+
+class CircuitState(IntEnum):
+    CLOSED = 0
+    HALF_OPEN = 1
+    OPEN = 2
+
+
+class CircuitBreaker:
+    """엔드포인트(tr_id)별 서킷 브레이커
+
+    연속 실패가 failure_threshold에 이르면 열림 상태가 되어 reset_timeout 동안
+    호출을 바로 거절합니다. 이후 시험 호출 하나를 허용해(반열림) 성공하면 닫고,
+    실패하면 다시 엽니다. 호출 한도 초과는 장애가 아니므로 실패로 세지 않습니다.
+    시험 호출이 취소되면 release()로 자리를 돌려주고, 결과가 기록되지 않은 채
+    reset_timeout이 지나면 다음 호출을 새 시험 호출로 허용합니다.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._trial_started = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CircuitState.CLOSED:
+                return True
+            if self.state == CircuitState.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = CircuitState.HALF_OPEN
+                self._trial_in_flight = False
+            now = time.monotonic()
+            if self._trial_in_flight and now - self._trial_started < self.reset_timeout:
+                return False
+            self._trial_in_flight = True
+            self._trial_started = now
+            return True
+
+    def release(self):
+        """결과 없이 끝난 호출(취소 등)의 시험 호출 자리 반환 - 상태는 그대로"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = CircuitState.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == CircuitState.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = CircuitState.OPEN
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def retry_after(self) -> float:
+        """다시 시험 호출을 허용하기까지 남은 시간(초)"""
+        with self._lock:
+            if self.state != CircuitState.OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+
+class LatencyWindow:
+    """최근 응답 시간 표본 (헤지 기준 백분위 계산용)"""
+
+    def __init__(self, size: int):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> float:
+        with self._lock:
+            ordered = sorted(self._samples)
+        if not ordered:
+            return 0.0
+        index = min(len(ordered) - 1, int(len(ordered) * q / 100))
+        return ordered[index]
+
+
+class BrokerResilience:
+    """키움 API 호출 재시도/서킷 브레이커/헤지 요청
+
+    - 재시도: 재시도 가능한 오류만 지수 백오프(+지터)로 최대 max_attempts번까지
+    - 서킷 브레이커: tr_id별로 연속 장애시 일정 시간 즉시 실패
+    - 헤지: hedge_tr_ids의 요청이 최근 응답 시간 백분위(hedge_percentile)보다
+      오래 걸리면 같은 요청을 한 번 더 보내 먼저 끝난 응답을 사용 (비동기 클라이언트만)
+    """
+
+    def __init__(
+        self,
+        max_attempts: Optional[int] = None,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        failure_threshold: Optional[int] = None,
+        reset_timeout: Optional[float] = None,
+        hedge_tr_ids: Optional[set] = None,
+        hedge_percentile: Optional[float] = None,
+        hedge_min_samples: Optional[int] = None,
+    ):
+        self.max_attempts = max(1, max_attempts or int(os.getenv("KIWOOM_RETRY_ATTEMPTS", "3")))
+        self.base_delay = base_delay if base_delay is not None else float(os.getenv("KIWOOM_RETRY_BASE_DELAY", "0.2"))
+        self.max_delay = max_delay or float(os.getenv("KIWOOM_RETRY_MAX_DELAY", "2"))
+        self.failure_threshold = failure_threshold or int(os.getenv("KIWOOM_BREAKER_THRESHOLD", "5"))
+        self.reset_timeout = reset_timeout or float(os.getenv("KIWOOM_BREAKER_RESET", "30"))
+        if hedge_tr_ids is None:
+            hedge_tr_ids = {t.strip() for t in os.getenv("KIWOOM_HEDGE_TR_IDS", "").split(",") if t.strip()}
+        self.hedge_tr_ids = set(hedge_tr_ids)
+        self.hedge_percentile = hedge_percentile or float(os.getenv("KIWOOM_HEDGE_PERCENTILE", "95"))
+        self.hedge_min_samples = hedge_min_samples or int(os.getenv("KIWOOM_HEDGE_MIN_SAMPLES", "20"))
+
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._latencies: Dict[str, LatencyWindow] = {}
+        self._random = random.Random()
+
+    def breaker(self, tr_id: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(tr_id)
+            if breaker is None:
+                breaker = self._breakers[tr_id] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return breaker
+
+    def _window(self, tr_id: str) -> LatencyWindow:
+        with self._lock:
+            window = self._latencies.get(tr_id)
+            if window is None:
+                window = self._latencies[tr_id] = LatencyWindow(200)
+            return window
+
+    def observe_latency(self, tr_id: str, seconds: float):
+        """성공한 요청의 응답 시간 기록"""
+        self._window(tr_id).observe(seconds)
+
+    def hedge_delay(self, tr_id: str) -> Optional[float]:
+        """헤지 요청을 보낼 대기 시간 (헤지 대상이 아니거나 표본이 부족하면 None)"""
+        if tr_id not in self.hedge_tr_ids:
+            return None
+        window = self._window(tr_id)
+        if len(window) < self.hedge_min_samples:
+            return None
+        return window.percentile(self.hedge_percentile)
+
+    def backoff(self, attempt: int) -> float:
+        """attempt번째 재시도 전 대기 시간 (full jitter)"""
+        return self._random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _before_attempt(self, tr_id: str) -> CircuitBreaker:
+        breaker = self.breaker(tr_id)
+        if not breaker.allow():
+            KIWOOM_CIRCUIT_REJECTIONS.inc(tr_id=tr_id)
+            raise CircuitOpenError(
+                f"{tr_id} 서킷 브레이커 열림 ({breaker.retry_after():.1f}초 후 재시도)", tr_id, retryable=False
+            )
+        return breaker
+
+    def _after_failure(self, breaker: CircuitBreaker, error: KiwoomAPIError, attempt: int) -> bool:
+        """실패 기록 후 재시도 여부"""
+        if error.retryable and not error.rate_limited:
+            breaker.record_failure()
+        else:
+            breaker.record_success()  # 서버는 정상 응답 (요청 오류 또는 호출 한도 초과)
+        if not error.retryable or attempt + 1 >= self.max_attempts:
+            return False
+        KIWOOM_RETRIES.inc(tr_id=error.tr_id)
+        logger.warning(f"키움 API 재시도 {attempt + 1}/{self.max_attempts - 1}: {error}")
+        return True
+
+    def call_sync(self, tr_id: str, attempt_fn: Callable[[], Any]) -> Any:
+        """동기 호출 (재시도 + 서킷 브레이커)"""
+        for attempt in range(self.max_attempts):
+            breaker = self._before_attempt(tr_id)
+            try:
+                result = attempt_fn()
+            except BaseException as e:
+                if not isinstance(e, Exception):
+                    breaker.release()
+                    raise
+                error = classify_error(tr_id, e)
+                if not self._after_failure(breaker, error, attempt):
+                    raise error from e
+                time.sleep(self.backoff(attempt))
+                continue
+            breaker.record_success()
+            return result
+
+    async def call(self, tr_id: str, attempt_fn: Callable[[], Awaitable[Any]]) -> Any:
+        """비동기 호출 (재시도 + 서킷 브레이커 + 헤지)"""
+        for attempt in range(self.max_attempts):
+            breaker = self._before_attempt(tr_id)
+            try:
+                result = await self._hedged(tr_id, attempt_fn)
+            except BaseException as e:
+                if not isinstance(e, Exception):  # 취소(CancelledError) 등
+                    breaker.release()
+                    raise
+                error = classify_error(tr_id, e)
+                if not self._after_failure(breaker, error, attempt):
+                    raise error from e
+                await asyncio.sleep(self.backoff(attempt))
+                continue
+            breaker.record_success()
+            return result
+
+    async def _hedged(self, tr_id: str, attempt_fn: Callable[[], Awaitable[Any]]) -> Any:
+        delay = self.hedge_delay(tr_id)
+        if delay is None:
+            return await attempt_fn()
+
+        primary = asyncio.ensure_future(attempt_fn())
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+
+            KIWOOM_HEDGES.inc(tr_id=tr_id, result="sent")
+            hedge = asyncio.ensure_future(attempt_fn())
+            pending = {primary, hedge}
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                errors = [task.exception() for task in done]  # 실패한 쪽 예외도 함께 회수
+                for task, task_error in zip(done, errors):
+                    if task_error is None:
+                        if task is hedge:
+                            KIWOOM_HEDGES.inc(tr_id=tr_id, result="won")
+                        return task.result()
+                    error = task_error
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            tr_ids = sorted(set(self._breakers) | set(self._latencies))
+        result = {}
+        for tr_id in tr_ids:
+            breaker = self.breaker(tr_id)
+            window = self._window(tr_id)
+            result[tr_id] = {
+                "state": breaker.state.name.lower(),
+                "consecutive_failures": breaker.failures,
+                "retry_after": round(breaker.retry_after(), 3),
+                "latency_p50": round(window.percentile(50), 4),
+                "latency_p95": round(window.percentile(95), 4),
+                "hedge_delay": self.hedge_delay(tr_id),
+            }
+        return result
+
+
+_default_resilience: Optional[BrokerResilience] = None
+_default_lock = threading.Lock()
+
+
+def get_default_resilience() -> BrokerResilience:
+    """프로세스 공용 인스턴스 (동기/비동기 클라이언트가 브레이커 상태를 공유)"""
+    global _default_resilience
+    with _default_lock:
+        if _default_resilience is None:
+            _default_resilience = BrokerResilience()
+        return _default_resilience
@@ -0,0 +1,237 @@
+import json
+import zlib
+import base64
+import binascii
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from stock_models import AnalyzedStock
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성 - 없으면 표준 json 사용
+    orjson = None
+
+# 정렬 가능한 항목 -> 종목 dict 안의 경로
+SORT_FIELDS: Dict[str, Tuple[str, str]] = {
+    "confidence": ("strategy", "confidence"),
+    "code": ("stock_info", "code"),
+    "name": ("stock_info", "name"),
+    "price": ("stock_info", "price"),
+    "change_percent": ("stock_info", "change_percent"),
+    "volume": ("stock_info", "volume"),
+    "tema_20": ("indicators", "tema_20"),
+    "dema_10": ("indicators", "dema_10"),
+    "macd_oscillator": ("indicators", "macd_oscillator"),
+    "rsi_14": ("indicators", "rsi_14"),
+    "obv": ("indicators", "obv"),
+    "volume_ratio": ("indicators", "volume_ratio"),
+}
+
+# 선택 가능한 필드: 최상위 그룹 또는 "그룹.필드"
+FIELD_GROUPS: Dict[str, Tuple[str, ...]] = {
+    name: tuple(getattr(info.annotation, "model_fields", ()))
+    for name, info in AnalyzedStock.model_fields.items()
+}
+
+MAX_PAGE_SIZE = 1000
+
+
+class InvalidQuery(ValueError):
+    """정렬/필터/필드/커서 파라미터 오류"""
+
+
+class StaleCursor(InvalidQuery):
+    """커서가 가리키는 결과 버전이 이미 갱신됨"""
+
+
+def dumps(data: Any) -> bytes:
+    """JSON 직렬화 (orjson이 있으면 사용)"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=_json_default).encode("utf-8")
+
+
+def _json_default(value: Any):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"직렬화할 수 없는 값: {type(value).__name__}")
+
+
+@dataclass(frozen=True)
+class ResultQuery:
+    """검색 결과 조회 조건 (정렬, 필터, 필드 선택, 페이지)"""
+    sort: str = "confidence"
+    descending: bool = True
+    meets_conditions: Optional[bool] = None
+    min_confidence: Optional[float] = None
+    signal: Optional[str] = None
+    fields: Optional[Tuple[str, ...]] = None
+    limit: Optional[int] = None
+    cursor: Optional[str] = None
+
+    @classmethod
+    def parse(
+        cls,
+        sort: Optional[str] = None,
+        meets_conditions: Optional[bool] = None,
+        min_confidence: Optional[float] = None,
+        signal: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> "ResultQuery":
+        """쿼리 파라미터 검증 - sort는 "-confidence"(내림차순) / "rsi_14"(오름차순) 형식"""
+        sort = (sort or "-confidence").strip()
+        descending = sort.startswith("-")
+        sort = sort.lstrip("-+")
+        if sort not in SORT_FIELDS:
+            raise InvalidQuery(f"정렬할 수 없는 항목: {sort} (가능: {', '.join(SORT_FIELDS)})")
+
+        if fields:
+            for path in fields:
+                group, _, name = path.partition(".")
+                if group not in FIELD_GROUPS or (name and name not in FIELD_GROUPS[group]):
+                    raise InvalidQuery(f"알 수 없는 필드: {path}")
+
+        if limit is not None and not 1 <= limit <= MAX_PAGE_SIZE:
+            raise InvalidQuery(f"limit은 1~{MAX_PAGE_SIZE} 사이여야 합니다.")
+
+        query = cls(
+            sort=sort,
+            descending=descending,
+            meets_conditions=meets_conditions,
+            min_confidence=min_confidence,
+            signal=signal.upper() if signal else None,
+            fields=tuple(fields) if fields else None,
+            limit=limit,
+            cursor=cursor,
+        )
+        if cursor:
+            query.decode_cursor()  # 형식 검증
+        return query
+
+    @property
+    def fingerprint(self) -> str:
+        """정렬/필터 조건 식별자 (커서가 같은 조건에서만 쓰이도록 확인)"""
+        key = repr((self.sort, self.descending, self.meets_conditions, self.min_confidence, self.signal))
+        return f"{zlib.crc32(key.encode('utf-8')):08x}"
+
+    def decode_cursor(self) -> Tuple[int, int]:
+        """커서 -> (결과 버전, 시작 위치)"""
+        try:
+            padded = self.cursor + "=" * (-len(self.cursor) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            version, offset, fingerprint = int(data["v"]), int(data["o"]), data["q"]
+        except (ValueError, KeyError, TypeError, UnicodeEncodeError, binascii.Error):
+            raise InvalidQuery("잘못된 커서입니다.")
+        if fingerprint != self.fingerprint:
+            raise InvalidQuery("커서와 정렬/필터 조건이 다릅니다.")
+        return version, offset
+
+    @property
+    def cursor_version(self) -> Optional[int]:
+        return self.decode_cursor()[0] if self.cursor else None
+
+    def encode_cursor(self, version: int, offset: int) -> str:
+        data = json.dumps({"v": version, "o": offset, "q": self.fingerprint}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(data.encode("ascii")).decode("ascii").rstrip("=")
+
+
+@dataclass
+class ResultPage:
+    """정렬/필터/페이지를 적용한 결과"""
+    rows: List[bytes]  # 직렬화된 종목 JSON
+    total_count: int  # 필터 적용 후 전체 종목 수
+    next_cursor: Optional[str] = None
+
+
+class ResultView:
+    """한 검색 결과의 직렬화 캐시
+
+    종목을 한 번만 dict로 변환해 두고, 전체 필드 JSON도 종목별로 한 번만
+    직렬화해 재사용합니다. 같은 결과를 여러 번 조회하거나 페이지를 넘길 때는
+    정렬/필터된 순서(인덱스)만 조건별로 캐시해 다시 계산하지 않습니다.
+    """
+
+    MAX_ORDERS = 16
+
+    def __init__(self, stocks: Sequence[AnalyzedStock]):
+        self.items: List[Dict[str, Any]] = [stock.model_dump(mode="json") for stock in stocks]
+        self._encoded: List[Optional[bytes]] = [None] * len(self.items)
+        self._orders: "OrderedDict[str, List[int]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def order(self, query: ResultQuery) -> List[int]:
+        """필터 통과 종목의 정렬된 인덱스"""
+        key = query.fingerprint
+        cached = self._orders.get(key)
+        if cached is not None:
+            self._orders.move_to_end(key)
+            return cached
+
+        indexes = [i for i, item in enumerate(self.items) if self._matches(item, query)]
+        group, name = SORT_FIELDS[query.sort]
+        indexes.sort(key=lambda i: self.items[i][group][name], reverse=query.descending)  # 안정 정렬
+
+        self._orders[key] = indexes
+        while len(self._orders) > self.MAX_ORDERS:
+            self._orders.popitem(last=False)
+        return indexes
+
+    @staticmethod
+    def _matches(item: Dict[str, Any], query: ResultQuery) -> bool:
+        if query.meets_conditions is not None and item["meets_conditions"] != query.meets_conditions:
+            return False
+        if query.min_confidence is not None and item["strategy"]["confidence"] < query.min_confidence:
+            return False
+        if query.signal is not None and item["strategy"]["signal"] != query.signal:
+            return False
+        return True
+
+    def encoded(self, index: int, fields: Optional[Tuple[str, ...]] = None) -> bytes:
+        """종목 하나의 JSON (필드 선택시 해당 필드만)"""
+        if fields:
+            return dumps(self._project(self.items[index], fields))
+        data = self._encoded[index]
+        if data is None:
+            data = self._encoded[index] = dumps(self.items[index])
+        return data
+
+    @staticmethod
+    def _project(item: Dict[str, Any], fields: Tuple[str, ...]) -> Dict[str, Any]:
+        projected: Dict[str, Any] = {}
+        whole = {path for path in fields if "." not in path}
+        for path in fields:
+            group, _, name = path.partition(".")
+            if not name:
+                projected[group] = item[group]
+            elif group not in whole:
+                projected.setdefault(group, {})[name] = item[group][name]
+        return projected
+
+    def page(self, query: ResultQuery, version: Optional[int] = None) -> ResultPage:
+        """조건에 맞는 한 페이지 - version은 커서에 기록되는 결과 버전"""
+        indexes = self.order(query)
+        offset = 0
+        if query.cursor:
+            cursor_version, offset = query.decode_cursor()
+            if cursor_version != version:
+                raise StaleCursor(f"결과가 갱신되었습니다 (v{cursor_version} -> v{version}). 처음부터 다시 조회하세요.")
+
+        stop = len(indexes) if query.limit is None else min(offset + query.limit, len(indexes))
+        next_cursor = query.encode_cursor(version or 0, stop) if stop < len(indexes) else None
+        return ResultPage(
+            rows=[self.encoded(i, query.fields) for i in indexes[offset:stop]],
+            total_count=len(indexes),
+            next_cursor=next_cursor,
+        )
+
+
+def render(envelope: Dict[str, Any], page: ResultPage) -> bytes:
+    """응답 본문 - 직렬화된 종목 JSON을 다시 변환하지 않고 이어 붙임"""
+    body = dumps({**envelope, "total_count": page.total_count, "next_cursor": page.next_cursor})
+    return b'{"stocks":[' + b",".join(page.rows) + b"]," + body[1:]
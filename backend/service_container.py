@@ -0,0 +1,213 @@
+import time
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceContainer:
+    """API 서비스 인스턴스 생성/시작/종료
+
+    pandas/numpy/httpx 등 무거운 모듈은 build()에서 가져오므로 main 모듈
+    가져오기는 가볍고, 키 설정 오류도 가져오기가 아닌 앱 시작 단계에서 드러납니다.
+
+    시작 순서:
+    1. build(): 모듈 가져오기와 서비스 생성 (lifespan에서 스레드로 실행)
+    2. open(): 공유 HTTP 클라이언트 생성 - 여기부터 요청 처리 (started)
+    3. warm_up(): 종목 마스터 스냅샷, 토큰 발급, 지표 프로세스 풀을 요청 처리와
+       동시에 준비하고, 스냅샷 로딩 후 갱신/사전 계산/실시간 시세/알림 루프 시작
+
+    ready(/health/ready 200)는 HTTP 클라이언트가 열려 있고, 액세스 토큰이 있고,
+    종목 마스터 스냅샷 읽기가 끝났을 때(스냅샷이 없어 실패한 경우 포함)입니다.
+    지표 프로세스 풀은 준비 전에도 스레드로 계산하므로 조건에 넣지 않습니다.
+    """
+
+    WARMUP_STEPS = ("stock_master", "auth_token", "indicator_pool")
+
+    def __init__(self):
+        self.built = False
+        self.started = False
+        self.build_seconds: Optional[float] = None
+        self.warmup: Dict[str, str] = {step: "pending" for step in self.WARMUP_STEPS}
+        self._tasks: List[asyncio.Task] = []
+        self._started_at = time.monotonic()
+
+    def build(self):
+        """서비스 생성 (무거운 모듈은 여기서 가져옴)"""
+        if self.built:
+            return
+        start = time.perf_counter()
+
+        from async_kiwoom_service import AsyncKiwoomService
+        from condition_service import ConditionService
+        from analysis_pipeline import AnalysisPipeline
+        from indicator_pool import IndicatorProcessPool
+        from ohlcv_store import OHLCVStore
+        from ttl_cache import KiwoomCache
+        from stock_master import StockMaster
+        from market_scanner import MarketScanner
+        from condition_dsl import StrategyBook
+        from prescreen import PrescreenService
+        from realtime_quotes import TickBook, RealtimeQuoteFeed
+        from streaming_indicators import IndicatorStateBook
+        from alerts import AlertEngine
+
+        self.ohlcv_store = OHLCVStore()
+        self.kiwoom_cache = KiwoomCache()
+        self.stock_master = StockMaster()
+        self.tick_book = TickBook()
+        self.indicator_book = IndicatorStateBook()
+        self.kiwoom_service = AsyncKiwoomService(
+            ohlcv_store=self.ohlcv_store, cache=self.kiwoom_cache,
+            stock_master=self.stock_master, tick_book=self.tick_book
+        )
+        self.condition_service = ConditionService()
+        self.indicator_pool = IndicatorProcessPool()
+        self.analysis_pipeline = AnalysisPipeline(
+            self.kiwoom_service, self.condition_service, indicator_pool=self.indicator_pool
+        )
+        self.market_scanner = MarketScanner(self.analysis_pipeline, self.ohlcv_store)
+        self.strategy_book = StrategyBook()
+        self.prescreen_service = PrescreenService(self.analysis_pipeline, self.stock_master)
+        self.realtime_feed = RealtimeQuoteFeed(
+            self.tick_book, auth=self.kiwoom_service.auth,
+            indicator_book=self.indicator_book, ohlcv_store=self.ohlcv_store,
+            seed_bars=AnalysisPipeline.DAILY_BARS
+        )
+        self.alert_engine = AlertEngine(self.analysis_pipeline, self.strategy_book)
+        self.realtime_feed.listeners.append(self.alert_engine.on_tick)
+        self._register_metrics()
+
+        self.built = True
+        self.build_seconds = time.perf_counter() - start
+        logger.info(f"서비스 생성 완료 ({self.build_seconds:.2f}초)")
+
+    def _register_metrics(self):
+        """수집 시점에 각 서비스 통계를 읽는 지표"""
+        REGISTRY.callback(
+            "cache_requests_total", "응답 캐시 조회 수", ["cache", "result"],
+            lambda: [((cache, result), stats[result]) for cache, stats in self.kiwoom_cache.stats().items()
+                     for result in ("hits", "misses", "coalesced")],
+            type_name="counter"
+        )
+        REGISTRY.callback(
+            "cache_entries", "응답 캐시 항목 수", ["cache"],
+            lambda: [((cache,), stats["size"]) for cache, stats in self.kiwoom_cache.stats().items()]
+        )
+        REGISTRY.callback(
+            "scheduler_requests_total", "속도 제한 스케줄러 허가/거절 수", ["result"],
+            lambda: [((result,), self.kiwoom_service.scheduler.stats()[result]) for result in ("granted", "rejected")],
+            type_name="counter"
+        )
+        REGISTRY.callback(
+            "scheduler_waiting", "속도 제한 스케줄러 대기 요청 수", ["priority"],
+            lambda: [((key[len("waiting_"):],), value) for key, value in self.kiwoom_service.scheduler.stats().items()
+                     if key.startswith("waiting_")]
+        )
+        REGISTRY.callback(
+            "kiwoom_circuit_state", "tr_id별 서킷 브레이커 상태 (0: 닫힘, 1: 반열림, 2: 열림)", ["tr_id"],
+            lambda: [((tr_id,), self.kiwoom_service.resilience.breaker(tr_id).state.value)
+                     for tr_id in self.kiwoom_service.resilience.stats()]
+        )
+        REGISTRY.callback(
+            "indicator_pool_stocks_total", "프로세스 풀에서 지표를 계산한 종목 수", [],
+            lambda: [((), self.indicator_pool.stats()["stocks"])],
+            type_name="counter"
+        )
+        REGISTRY.callback(
+            "prescreen_requests_total", "사전 계산 결과 조회/병합 수", ["result"],
+            lambda: [((result,), self.prescreen_service.stats()[result])
+                     for result in ("hits", "misses", "coalesced", "stale_served")],
+            type_name="counter"
+        )
+        REGISTRY.callback(
+            "alert_events_total", "관심 종목 신호 전환 알림 수", [],
+            lambda: [((), self.alert_engine.stats()["events"])],
+            type_name="counter"
+        )
+        REGISTRY.callback(
+            "realtime_ticks_total", "실시간 체결 수신 수", [],
+            lambda: [((), self.realtime_feed.stats()["ticks"])],
+            type_name="counter"
+        )
+
+    async def start(self):
+        """생성 -> HTTP 클라이언트 시작 -> ready, 준비 작업은 백그라운드로"""
+        await asyncio.to_thread(self.build)
+        await self.kiwoom_service.open()
+        self.started = True
+        logger.info(f"요청 처리 시작 (시작 후 {time.monotonic() - self._started_at:.2f}초)")
+        self._tasks.append(asyncio.create_task(self.warm_up()))
+
+    async def _warm_step(self, step: str, func, *args):
+        start = time.perf_counter()
+        try:
+            await asyncio.to_thread(func, *args)
+            self.warmup[step] = "done"
+            logger.info(f"준비 작업 완료: {step} ({time.perf_counter() - start:.2f}초)")
+        except Exception as e:
+            self.warmup[step] = "failed"
+            logger.warning(f"준비 작업 실패: {step} - {str(e)}")
+
+    async def warm_up(self):
+        """요청 처리와 동시에 진행하는 준비 작업"""
+        others = asyncio.gather(
+            self._warm_step("auth_token", self.kiwoom_service.auth.get_access_token),
+            self._warm_step("indicator_pool", self.indicator_pool.start),
+        )
+        # 스냅샷을 먼저 읽어야 갱신 루프가 불필요한 전체 목록 조회를 하지 않음
+        await self._warm_step("stock_master", self.stock_master.load_snapshot)
+        if self.ready:
+            logger.info(f"요청 처리 준비 완료 (시작 후 {time.monotonic() - self._started_at:.2f}초)")
+        if self.alert_engine.load() and self.realtime_feed.available:
+            await self.realtime_feed.subscribe(self.alert_engine.codes())
+        self._tasks.extend([
+            asyncio.create_task(self.stock_master.run_refresh_loop(self.kiwoom_service.client)),
+            asyncio.create_task(self.prescreen_service.run_loop()),
+            asyncio.create_task(self.realtime_feed.run()),
+            asyncio.create_task(self.alert_engine.run_loop()),
+        ])
+        await others
+
+    async def close(self):
+        """백그라운드 작업 취소 후 자원 정리"""
+        self.started = False
+        for task in reversed(self._tasks):
+            task.cancel()
+        self._tasks.clear()
+        if not self.built:
+            return
+        await self.kiwoom_service.aclose()
+        self.analysis_pipeline.shutdown()
+        self.ohlcv_store.close()
+
+    def liveness(self) -> Dict[str, Any]:
+        """프로세스가 살아 있는지 (외부 호출 없음)"""
+        return {"status": "alive", "uptime": round(time.monotonic() - self._started_at, 3)}
+
+    def _has_token(self) -> bool:
+        return self.built and bool(self.kiwoom_service.auth.token_cache.get("access_token"))
+
+    @property
+    def ready(self) -> bool:
+        """HTTP 클라이언트 시작 + 토큰 있음 + 종목 마스터 스냅샷 읽기 끝남
+
+        토큰 준비 작업이 실패해도 이후 요청에서 토큰을 받으면 ready가 됩니다.
+        """
+        return self.started and self._has_token() and self.warmup["stock_master"] != "pending"
+
+    def readiness(self) -> Dict[str, Any]:
+        """요청을 받을 수 있는지 (토큰 발급 등 외부 호출 없이 현재 상태만 보고)"""
+        auth = None
+        if self.built:
+            auth = "ok" if self._has_token() else "pending"
+        return {
+            "status": "ready" if self.ready else "starting",
+            "build_seconds": round(self.build_seconds, 3) if self.build_seconds is not None else None,
+            "auth": auth,
+            "warmup": dict(self.warmup),
+            "stock_master_loaded": self.built and self.stock_master.loaded_at is not None,
+        }
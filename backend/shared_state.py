@@ -0,0 +1,368 @@
+import os
+import time
+import uuid
+import pickle
+import sqlite3
+import logging
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterator, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATE_PATH = Path(__file__).parent / "data" / "shared_state.sqlite3"
+
+# (버킷 이름, 초당 충전량) - 용량은 충전량과 같음 (RequestScheduler의 TokenBucket과 동일)
+BucketSpec = Tuple[str, float]
+
+
+class SharedState(ABC):
+    """워커(프로세스/호스트) 간 공유 상태 저장소
+
+    액세스 토큰, TR 호출 한도 버킷, 응답 캐시(현재가/차트/종목명)를 보관합니다.
+    값은 피클로 저장하므로 신뢰할 수 있는 저장소만 사용해야 합니다.
+
+    - get/set/delete: 만료시간이 있는 키-값
+    - lock: 이름 단위 배타 잠금 (토큰 갱신 등 한 워커만 수행할 작업)
+    - take_tokens: 여러 토큰 버킷에서 원자적으로 1개씩 획득
+
+    SQLite/Redis 구현은 블로킹 I/O이고 lock은 잠금을 얻을 때까지 폴링하므로,
+    이벤트 루프에서는 asyncio.to_thread로 호출합니다.
+    """
+
+    name = "base"
+    distributed = False  # 다른 프로세스와 실제로 공유되는지 여부
+
+    @abstractmethod
+    def get(self, namespace: str, key: str) -> Optional[Tuple[Any, float]]:
+        """(값, 만료시각(epoch)) - 없거나 만료되면 None"""
+
+    @abstractmethod
+    def set(self, namespace: str, key: str, value: Any, ttl: float):
+        """ttl초 후 만료되는 값 저장"""
+
+    @abstractmethod
+    def delete(self, namespace: str, key: str):
+        """값 삭제"""
+
+    @abstractmethod
+    def lock(self, name: str, ttl: float = 30.0, wait: float = 30.0) -> ContextManager[bool]:
+        """배타 잠금 - 잠금을 얻었으면 True, wait초 안에 못 얻으면 False
+
+        ttl이 지나면 잠금을 잡은 워커가 죽었어도 자동으로 풀립니다.
+        """
+
+    @abstractmethod
+    def take_tokens(self, buckets: Sequence[BucketSpec]) -> float:
+        """모든 버킷에 토큰이 있으면 1개씩 차감하고 0, 아니면 기다릴 시간(초)"""
+
+    def close(self):
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "distributed": self.distributed}
+
+
+def _refill(tokens: float, updated: float, rate: float, now: float) -> Tuple[float, float]:
+    if now > updated:
+        tokens = min(rate, tokens + (now - updated) * rate)
+        updated = now
+    return tokens, updated
+
+
+class MemoryState(SharedState):
+    """프로세스 내 기본 구현 (워커 하나일 때)"""
+
+    name = "memory"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data: Dict[Tuple[str, str], Tuple[Any, float]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    def get(self, namespace: str, key: str) -> Optional[Tuple[Any, float]]:
+        with self._lock:
+            entry = self._data.get((namespace, key))
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                del self._data[(namespace, key)]
+                return None
+            return entry
+
+    def set(self, namespace: str, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._data[(namespace, key)] = (value, time.time() + ttl)
+
+    def delete(self, namespace: str, key: str):
+        with self._lock:
+            self._data.pop((namespace, key), None)
+
+    @contextmanager
+    def lock(self, name: str, ttl: float = 30.0, wait: float = 30.0) -> Iterator[bool]:
+        with self._lock:
+            lock = self._locks.setdefault(name, threading.Lock())
+        acquired = lock.acquire(timeout=wait)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                lock.release()
+
+    def take_tokens(self, buckets: Sequence[BucketSpec]) -> float:
+        now = time.monotonic()
+        with self._lock:
+            states = [_refill(*self._buckets.get(name, (rate, now)), rate, now) for name, rate in buckets]
+            wait = max([(1 - tokens) / rate for (tokens, _), (_, rate) in zip(states, buckets) if tokens < 1] or [0.0])
+            if wait == 0:
+                for (name, _), (tokens, updated) in zip(buckets, states):
+                    self._buckets[name] = (tokens - 1, updated)
+            return wait
+
+
+class SQLiteState(SharedState):
+    """같은 호스트의 여러 워커가 공유하는 SQLite 구현 (WAL 모드)"""
+
+    name = "sqlite"
+    distributed = True
+    PURGE_EVERY = 1000  # set 호출 N번마다 만료 항목 정리
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path or os.getenv("SHARED_STATE_PATH", str(DEFAULT_STATE_PATH)))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._writes = 0
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS kv (
+                ns TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, expires_at REAL NOT NULL,
+                PRIMARY KEY (ns, key)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS locks (name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL);
+            CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL);
+            """
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        """스레드별 연결 (자동 커밋, 원자적 작업은 BEGIN IMMEDIATE로 직접 묶음)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def get(self, namespace: str, key: str) -> Optional[Tuple[Any, float]]:
+        row = self._conn().execute(
+            "SELECT value, expires_at FROM kv WHERE ns = ? AND key = ? AND expires_at > ?",
+            (namespace, key, time.time())
+        ).fetchone()
+        return (pickle.loads(row[0]), row[1]) if row else None
+
+    def set(self, namespace: str, key: str, value: Any, ttl: float):
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO kv (ns, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (namespace, key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), now + ttl)
+        )
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            conn.execute("DELETE FROM kv WHERE expires_at <= ?", (now,))
+
+    def delete(self, namespace: str, key: str):
+        self._conn().execute("DELETE FROM kv WHERE ns = ? AND key = ?", (namespace, key))
+
+    def _try_lock(self, name: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute("SELECT owner, expires_at FROM locks WHERE name = ?", (name,)).fetchone()
+            if row is not None and row[1] > now:
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO locks (name, owner, expires_at) VALUES (?, ?, ?)", (name, owner, now + ttl)
+            )
+            return True
+
+    @contextmanager
+    def lock(self, name: str, ttl: float = 30.0, wait: float = 30.0) -> Iterator[bool]:
+        owner = uuid.uuid4().hex
+        deadline = time.monotonic() + wait
+        acquired = self._try_lock(name, owner, ttl)
+        while not acquired and time.monotonic() < deadline:
+            time.sleep(0.02)
+            acquired = self._try_lock(name, owner, ttl)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                self._conn().execute("DELETE FROM locks WHERE name = ? AND owner = ?", (name, owner))
+
+    def take_tokens(self, buckets: Sequence[BucketSpec]) -> float:
+        now = time.time()
+        with self._transaction() as conn:
+            states = []
+            for name, rate in buckets:
+                row = conn.execute("SELECT tokens, updated FROM buckets WHERE name = ?", (name,)).fetchone()
+                states.append(_refill(*(row or (rate, now)), rate, now))
+            wait = max([(1 - tokens) / rate for (tokens, _), (_, rate) in zip(states, buckets) if tokens < 1] or [0.0])
+            if wait == 0:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)",
+                    [(name, tokens - 1, updated) for (name, _), (tokens, updated) in zip(buckets, states)]
+                )
+            return wait
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "path": str(self.path)}
+
+
+class RedisState(SharedState):
+    """여러 호스트가 공유하는 Redis 호환 구현 (redis 패키지 필요)"""
+
+    name = "redis"
+    distributed = True
+
+    # 모든 버킷을 검사한 뒤 모두 충분할 때만 차감 (서버 시각 기준)
+    TAKE_TOKENS = """
+    local t = redis.call('TIME')
+    local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+    local wait = 0
+    local states = {}
+    for i, key in ipairs(KEYS) do
+        local rate = tonumber(ARGV[i])
+        local data = redis.call('HMGET', key, 'tokens', 'updated')
+        local tokens = tonumber(data[1]) or rate
+        local updated = tonumber(data[2]) or now
+        if now > updated then
+            tokens = math.min(rate, tokens + (now - updated) * rate)
+            updated = now
+        end
+        states[i] = {tokens, updated}
+        if tokens < 1 then wait = math.max(wait, (1 - tokens) / rate) end
+    end
+    if wait > 0 then return tostring(wait) end
+    for i, key in ipairs(KEYS) do
+        redis.call('HSET', key, 'tokens', tostring(states[i][1] - 1), 'updated', tostring(states[i][2]))
+        redis.call('EXPIRE', key, 3600)
+    end
+    return '0'
+    """
+
+    RELEASE_LOCK = """
+    if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('DEL', KEYS[1]) end
+    return 0
+    """
+
+    def __init__(self, url: str, prefix: Optional[str] = None):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("Redis 공유 상태를 사용하려면 redis 패키지가 필요합니다. (pip install redis)")
+        self.url = url
+        self.prefix = prefix or os.getenv("SHARED_STATE_PREFIX", "stock-finder")
+        self._client = redis.Redis.from_url(url)
+        self._take_tokens = self._client.register_script(self.TAKE_TOKENS)
+        self._release_lock = self._client.register_script(self.RELEASE_LOCK)
+
+    def _key(self, *parts: str) -> str:
+        return ":".join((self.prefix,) + parts)
+
+    def get(self, namespace: str, key: str) -> Optional[Tuple[Any, float]]:
+        name = self._key("kv", namespace, key)
+        with self._client.pipeline() as pipe:
+            value, ttl_ms = pipe.get(name).pttl(name).execute()
+        if value is None or ttl_ms <= 0:
+            return None
+        return pickle.loads(value), time.time() + ttl_ms / 1000
+
+    def set(self, namespace: str, key: str, value: Any, ttl: float):
+        self._client.set(
+            self._key("kv", namespace, key),
+            pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+            px=max(1, int(ttl * 1000))
+        )
+
+    def delete(self, namespace: str, key: str):
+        self._client.delete(self._key("kv", namespace, key))
+
+    @contextmanager
+    def lock(self, name: str, ttl: float = 30.0, wait: float = 30.0) -> Iterator[bool]:
+        key = self._key("lock", name)
+        owner = uuid.uuid4().hex
+        deadline = time.monotonic() + wait
+        acquired = bool(self._client.set(key, owner, nx=True, px=int(ttl * 1000)))
+        while not acquired and time.monotonic() < deadline:
+            time.sleep(0.02)
+            acquired = bool(self._client.set(key, owner, nx=True, px=int(ttl * 1000)))
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                self._release_lock(keys=[key], args=[owner])
+
+    def take_tokens(self, buckets: Sequence[BucketSpec]) -> float:
+        keys = [self._key("bucket", name) for name, _ in buckets]
+        return float(self._take_tokens(keys=keys, args=[rate for _, rate in buckets]))
+
+    def close(self):
+        self._client.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "prefix": self.prefix}
+
+
+def create_shared_state(url: Optional[str] = None) -> SharedState:
+    """SHARED_STATE_URL로 구현 선택
+
+    - memory:// (기본): 프로세스 내
+    - sqlite:///경로 (sqlite://만 쓰면 SHARED_STATE_PATH): 같은 호스트의 워커 간
+    - redis://호스트:포트/DB: 여러 호스트 간
+    """
+    url = url if url is not None else os.getenv("SHARED_STATE_URL", "memory://")
+    scheme, _, rest = url.partition("://")
+    scheme = scheme.lower() or "memory"
+    if scheme == "memory":
+        return MemoryState()
+    if scheme == "sqlite":
+        # sqlite:///상대경로, sqlite:////절대경로
+        return SQLiteState(rest[1:] if rest.startswith("/") else rest or None)
+    if scheme in ("redis", "rediss", "unix"):
+        return RedisState(url)
+    raise ValueError(f"지원하지 않는 공유 상태 주소: {url}")
+
+
+_default_state: Optional[SharedState] = None
+_default_lock = threading.Lock()
+
+
+def get_default_state() -> SharedState:
+    """프로세스 공용 공유 상태 (인증/스케줄러/캐시가 같은 저장소 사용)"""
+    global _default_state
+    with _default_lock:
+        if _default_state is None:
+            _default_state = create_shared_state()
+            logger.info(f"공유 상태 저장소: {_default_state.name}")
+        return _default_state
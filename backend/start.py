@@ -5,6 +5,7 @@
 
 import os
 import sys
+import argparse
 import uvicorn
 from pathlib import Path
 
@@ -12,32 +13,52 @@ from pathlib import Path
 current_dir = Path(__file__).parent
 sys.path.insert(0, str(current_dir))
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="키움증권 주식 검색기 백엔드 서버")
+    parser.add_argument("--prod", action="store_true", default=os.getenv("APP_ENV") == "production",
+                        help="운영 모드 (자동 재시작 없음, 여러 워커) - APP_ENV=production과 같음")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "1")),
+                        help="운영 모드 워커 프로세스 수")
+    return parser.parse_args()
+
 def main():
     """메인 실행 함수"""
-    # .env 파일 존재 확인
+    args = parse_args()
+    
+    # .env 파일 존재 확인 (운영 모드는 환경변수로 직접 설정 가능)
     env_file = current_dir / ".env"
-    if not env_file.exists():
+    has_keys = os.getenv("KIWOOM_APP_KEY") and os.getenv("KIWOOM_APP_SECRET")
+    if not env_file.exists() and not (args.prod and has_keys):
         print("❌ .env 파일이 없습니다.")
         print("📁 .env.example을 참고하여 .env 파일을 생성하세요.")
         print("🔑 KIWOOM_APP_KEY와 KIWOOM_APP_SECRET을 설정해주세요.")
         return
     
-    print("🚀 키움증권 주식 검색기 백엔드 서버를 시작합니다...")
-    print("📊 API 문서: http://localhost:8000/docs")
-    print("🏥 헬스체크: http://localhost:8000/health")
+    mode = f"운영 모드, workers={args.workers}" if args.prod else "개발 모드, 자동 재시작"
+    print(f"🚀 키움증권 주식 검색기 백엔드 서버를 시작합니다... ({mode})")
+    print(f"📊 API 문서: http://localhost:{args.port}/docs")
+    print(f"🏥 헬스체크: http://localhost:{args.port}/health (준비 상태: /health/ready)")
     print("🔄 서버를 중지하려면 Ctrl+C를 누르세요.")
     
+    if args.prod:
+        options = dict(workers=args.workers, access_log=False)
+        if args.workers > 1 and not os.getenv("SHARED_STATE_URL"):
+            print("⚠️  SHARED_STATE_URL이 없으면 워커마다 토큰/호출 한도/캐시를 따로 사용합니다.")
+    else:
+        options = dict(reload=True, reload_dirs=[str(current_dir)])
+    
     try:
         uvicorn.run(
             "main:app",
-            host="0.0.0.0",
-            port=8000,
-            reload=True,
-            reload_dirs=[str(current_dir)],
-            log_level="info"
+            host=args.host,
+            port=args.port,
+            log_level="info",
+            **options
         )
     except KeyboardInterrupt:
         print("\n👋 서버가 종료되었습니다.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
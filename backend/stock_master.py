@@ -0,0 +1,194 @@
+import os
+import io
+import csv
+import json
+import time
+import asyncio
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_PATH = Path(__file__).parent / "data" / "stock_master.json"
+
+
+class StockMasterEntry(NamedTuple):
+    """종목 마스터 항목"""
+    code: str
+    name: str
+    market: str  # "KOSPI" / "KOSDAQ"
+    sector: str
+    listed: bool  # False: 상장폐지/거래정지
+
+
+class StockMaster:
+    """KOSPI/KOSDAQ 종목 마스터 인메모리 인덱스
+
+    시작 시 디스크 스냅샷을 먼저 읽고, STOCK_MASTER_URL에서 전체 목록을
+    받아 하루 한 번 백그라운드로 갱신합니다. 종목명 조회와 시장/업종 필터는
+    네트워크 호출 없이 딕셔너리 조회로 처리됩니다.
+
+    원본은 JSON 배열 또는 CSV(code,name,market,sector,listed 헤더)를 지원합니다.
+    """
+
+    RETRY_DELAY = 60.0  # 목록이 비어 있을 때 첫 재시도 간격(초)
+
+    def __init__(
+        self,
+        source_url: Optional[str] = None,
+        snapshot_path: Optional[str] = None,
+        refresh_interval: Optional[float] = None,
+    ):
+        self.source_url = source_url if source_url is not None else os.getenv("STOCK_MASTER_URL", "")
+        self.snapshot_path = Path(snapshot_path or os.getenv("STOCK_MASTER_SNAPSHOT", str(DEFAULT_SNAPSHOT_PATH)))
+        self.refresh_interval = refresh_interval or float(os.getenv("STOCK_MASTER_REFRESH", str(24 * 3600)))
+        self._entries: Dict[str, StockMasterEntry] = {}
+        self.loaded_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, stock_code: str) -> bool:
+        return stock_code in self._entries
+
+    def get(self, stock_code: str) -> Optional[StockMasterEntry]:
+        return self._entries.get(stock_code)
+
+    def name(self, stock_code: str) -> Optional[str]:
+        entry = self._entries.get(stock_code)
+        return entry.name if entry else None
+
+    def codes(self, market: Optional[str] = None, listed_only: bool = True) -> List[str]:
+        """전체(또는 시장별) 종목코드"""
+        return [
+            entry.code for entry in self._entries.values()
+            if (market is None or entry.market == market) and (entry.listed or not listed_only)
+        ]
+
+    def filter(
+        self,
+        stock_codes: Iterable[str],
+        markets: Optional[Iterable[str]] = None,
+        sectors: Optional[Iterable[str]] = None,
+        listed_only: bool = True,
+    ) -> List[str]:
+        """시장/업종/상장상태로 종목 필터링 (마스터에 없는 종목은 필터 조건이 있으면 제외)"""
+        markets = set(markets) if markets else None
+        sectors = set(sectors) if sectors else None
+        if not (markets or sectors or listed_only):
+            return list(stock_codes)
+
+        result = []
+        for code in stock_codes:
+            entry = self._entries.get(code)
+            if entry is None:
+                # 마스터 미로딩 상태에서 상장 여부만 볼 때는 통과
+                if not (markets or sectors):
+                    result.append(code)
+                continue
+            if listed_only and not entry.listed:
+                continue
+            if markets and entry.market not in markets:
+                continue
+            if sectors and entry.sector not in sectors:
+                continue
+            result.append(code)
+        return result
+
+    def _replace(self, entries: Iterable[StockMasterEntry], loaded_at: float):
+        # 딕셔너리를 통째로 교체하므로 조회 중인 쪽은 락 없이 일관된 상태를 봄
+        self._entries = {entry.code: entry for entry in entries}
+        self.loaded_at = loaded_at
+
+    @staticmethod
+    def parse(payload: str) -> List[StockMasterEntry]:
+        """JSON 배열 또는 CSV 본문 파싱"""
+        text = payload.lstrip()
+        rows = json.loads(text) if text.startswith("[") else list(csv.DictReader(io.StringIO(text)))
+
+        entries = []
+        for row in rows:
+            code = str(row.get("code", "")).strip()
+            if not code:
+                continue
+            listed = row.get("listed", True)
+            if isinstance(listed, str):
+                listed = listed.strip().lower() not in ("0", "false", "n", "")
+            entries.append(StockMasterEntry(
+                code=code,
+                name=str(row.get("name", "")).strip(),
+                market=str(row.get("market", "")).strip().upper(),
+                sector=str(row.get("sector", "")).strip(),
+                listed=bool(listed),
+            ))
+        return entries
+
+    def load_snapshot(self) -> bool:
+        """디스크 스냅샷 로딩"""
+        if not self.snapshot_path.exists():
+            return False
+        try:
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+            entries = [StockMasterEntry(*row) for row in snapshot["entries"]]
+            self._replace(entries, snapshot["saved_at"])
+            logger.info(f"종목 마스터 스냅샷 로딩: {len(entries)}개 종목")
+            return True
+        except Exception as e:
+            logger.error(f"종목 마스터 스냅샷 로딩 실패: {str(e)}")
+            return False
+
+    def save_snapshot(self):
+        """현재 인덱스를 디스크 스냅샷으로 저장"""
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.snapshot_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"saved_at": self.loaded_at, "entries": [list(e) for e in self._entries.values()]}, f, ensure_ascii=False)
+        tmp_path.replace(self.snapshot_path)
+
+    async def refresh(self, client: httpx.AsyncClient) -> bool:
+        """원본에서 전체 목록을 받아 인덱스 교체 후 스냅샷 저장"""
+        if not self.source_url:
+            return False
+        try:
+            response = await client.get(self.source_url)
+            response.raise_for_status()
+            entries = self.parse(response.text)
+        except Exception as e:
+            logger.error(f"종목 마스터 갱신 실패: {str(e)}")
+            return False
+
+        if not entries:
+            logger.warning("종목 마스터 원본이 비어 있어 기존 인덱스를 유지합니다.")
+            return False
+
+        self._replace(entries, time.time())
+        await asyncio.to_thread(self.save_snapshot)
+        logger.info(f"종목 마스터 갱신: {len(entries)}개 종목")
+        return True
+
+    def is_stale(self) -> bool:
+        return self.loaded_at is None or time.time() - self.loaded_at >= self.refresh_interval
+
+    async def run_refresh_loop(self, client: httpx.AsyncClient):
+        """백그라운드 주기 갱신 (스냅샷이 오래됐으면 즉시 갱신)
+
+        아직 한 번도 읽지 못했으면(스냅샷 없음 + 갱신 실패) RETRY_DELAY부터 두 배씩
+        늘려 refresh_interval까지 다시 시도합니다.
+        """
+        retry_delay = self.RETRY_DELAY
+        while True:
+            if self.is_stale():
+                await self.refresh(client)
+            delay = self.refresh_interval
+            if self.loaded_at is not None:
+                delay = max(60.0, self.loaded_at + self.refresh_interval - time.time())
+                retry_delay = self.RETRY_DELAY
+            elif self.source_url:
+                delay = min(retry_delay, self.refresh_interval)
+                retry_delay *= 2
+                logger.warning(f"종목 마스터가 비어 있어 {delay:.0f}초 후 다시 갱신합니다.")
+            await asyncio.sleep(delay)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 
@@ -30,12 +30,21 @@ class TradingStrategy(BaseModel):
     confidence: float  # 0.0 ~ 1.0
 
 
+class TimeframeAnalysis(BaseModel):
+    """상위 시간 프레임(주봉/월봉) 분석 - 일봉을 리샘플해 계산"""
+    bars: int  # 리샘플된 봉 수 (지표 기간보다 적으면 기본값)
+    indicators: TechnicalIndicators
+    trend_up: bool  # TEMA(20) > DEMA(10) AND MACD Oscillator > 0
+
+
 class AnalyzedStock(BaseModel):
     """분석된 종목 정보"""
     stock_info: StockInfo
     indicators: TechnicalIndicators
     strategy: TradingStrategy
     meets_conditions: bool
+    timeframes: Optional[Dict[str, TimeframeAnalysis]] = None  # 주기(W/M) -> 분석 (ANALYSIS_TIMEFRAMES 설정시)
+    timeframe_confirmed: Optional[bool] = None  # 모든 상위 시간 프레임이 상승 추세인지
 
 
 class StockSearchResponse(BaseModel):
@@ -43,5 +52,57 @@ class StockSearchResponse(BaseModel):
     success: bool
     message: str
     stocks: List[AnalyzedStock]
-    total_count: int
-    search_time: datetime
\ No newline at end of file
+    total_count: int  # 필터 적용 후 전체 종목 수 (페이지와 무관)
+    search_time: datetime
+    failed_codes: List[str] = []  # 분석 실패 종목 (부분 결과 응답 시)
+    result_version: Optional[int] = None  # 저장된 결과 버전 (같은 검색 조건 기준)
+    computed_at: Optional[datetime] = None  # 결과 계산 시각
+    from_cache: bool = False  # 저장된 결과 재사용 여부
+    timings: Optional[Dict[str, Dict[str, float]]] = None  # 단계별 소요 시간 (timings=true 요청시)
+    next_cursor: Optional[str] = None  # 다음 페이지 커서 (마지막 페이지면 None)
+
+
+class ScanResponse(StockSearchResponse):
+    """전체 스캔 응답"""
+    scanned_count: int  # 스캔 대상 종목 수
+    prefiltered_out: int  # 1단계 필터에서 제외된 종목 수
+    analyzed_count: int  # 2단계 분석 완료 종목 수
+    unprocessed_count: int  # 시간 제한으로 분석하지 못한 종목 수
+
+
+class StrategyInfo(BaseModel):
+    """조건식 전략"""
+    name: str
+    expression: str
+
+
+class StrategyScreenResponse(BaseModel):
+    """전략 일괄 평가 응답"""
+    success: bool
+    message: str
+    matches: Dict[str, List[str]]  # 전략명 -> 조건 충족 종목코드
+    evaluated_count: int  # 저장된 일봉으로 평가한 종목 수
+    missing_codes: List[str] = []  # 저장된 일봉이 없어 평가하지 못한 종목
+    search_time: datetime
+
+
+class Watchlist(BaseModel):
+    """알림 관심 종목 목록과 감시 조건"""
+    id: str
+    name: str
+    codes: List[str]
+    conditions: List[str]  # "default"(기본 검색 조건) 또는 조건식 전략명
+    created_at: datetime
+
+
+class AlertEvent(BaseModel):
+    """신호 전환 알림 (HOLD -> BUY 등)"""
+    watchlist_id: str
+    code: str
+    condition: str
+    previous: str  # 이전 신호 ("BUY" / "HOLD")
+    signal: str  # 새 신호
+    price: float  # 평가 시점 종가(장중 현재가)
+    confidence: Optional[float] = None  # 기본 조건 BUY 신호의 신뢰도
+    bar_date: int  # 평가한 마지막 봉 일자 (YYYYMMDD)
+    at: datetime
@@ -0,0 +1,228 @@
+from collections import deque
+from typing import Dict, List, Any, Optional, Sequence, Union
+
+from stock_models import TechnicalIndicators
+from bar_series import BarSeries
+
+
+class _IndicatorState:
+    """지표 누적 상태 (봉 하나를 반영할 때마다 O(1) 갱신)"""
+
+    __slots__ = (
+        "count", "last_close", "ema", "signal", "gains", "losses",
+        "avg_gain", "avg_loss", "obv", "volumes",
+    )
+
+    # (기간, 단계) 순서로 저장하는 EMA 체인: TEMA(20) 3단계, DEMA(10) 2단계, MACD 12/26
+    EMA_KEYS = ((20, 1), (20, 2), (20, 3), (10, 1), (10, 2), (12, 1), (26, 1))
+
+    def __init__(self, rsi_period: int):
+        self.count = 0
+        self.last_close: Optional[float] = None
+        self.ema = {key: [0.0, 0.0] for key in self.EMA_KEYS}  # key -> [가중합, 가중치합]
+        self.signal = [0.0, 0.0]  # MACD 시그널 EMA(9)
+        self.gains = deque(maxlen=rsi_period)
+        self.losses = deque(maxlen=rsi_period)
+        self.avg_gain: Optional[float] = None  # Wilder 방식 평균
+        self.avg_loss: Optional[float] = None
+        self.obv = 0.0
+        self.volumes = deque(maxlen=5)
+
+    def copy(self) -> "_IndicatorState":
+        other = _IndicatorState.__new__(_IndicatorState)
+        other.count = self.count
+        other.last_close = self.last_close
+        other.ema = {key: list(pair) for key, pair in self.ema.items()}
+        other.signal = list(self.signal)
+        other.gains = deque(self.gains, maxlen=self.gains.maxlen)
+        other.losses = deque(self.losses, maxlen=self.losses.maxlen)
+        other.avg_gain = self.avg_gain
+        other.avg_loss = self.avg_loss
+        other.obv = self.obv
+        other.volumes = deque(self.volumes, maxlen=5)
+        return other
+
+
+def _ema_step(pair: List[float], value: float, span: int) -> float:
+    """pandas ewm(adjust=True)과 같은 가중 평균을 한 단계 갱신"""
+    decay = 1.0 - 2.0 / (span + 1.0)
+    pair[0] = decay * pair[0] + value
+    pair[1] = decay * pair[1] + 1.0
+    return pair[0] / pair[1]
+
+
+class IncrementalIndicators:
+    """종목별 스트리밍 기술지표
+
+    새 봉(`update_bar`)이나 장중 체결(`update_tick`)이 들어올 때 전체 가격
+    이력을 다시 계산하지 않고 누적 상태만 갱신합니다. 현재 봉과 직전 봉의
+    값을 모두 보관하므로 골든크로스 판단에 재계산이 필요 없습니다.
+
+    RSI는 기본적으로 ConditionService.calculate_rsi와 같은 단순 이동평균
+    방식이며, wilder_rsi=True면 Wilder 평활을 사용합니다.
+    """
+
+    def __init__(self, rsi_period: int = 14, wilder_rsi: bool = False):
+        self.rsi_period = rsi_period
+        self.wilder_rsi = wilder_rsi
+        self._base = _IndicatorState(rsi_period)  # 직전 봉까지 반영된 상태
+        self._state = self._base  # 현재(형성 중인) 봉까지 반영된 상태
+        self._values: Dict[str, float] = self._evaluate(self._state)
+        self._prev_values: Dict[str, float] = self._values
+
+    @classmethod
+    def from_chart_data(cls, chart_data: Union[BarSeries, Sequence[Dict[str, Any]]], **kwargs) -> "IncrementalIndicators":
+        """과거 봉으로 초기화"""
+        indicators = cls(**kwargs)
+        bars = BarSeries.of(chart_data)
+        for close, volume in zip(bars.close.tolist(), bars.volume.tolist()):
+            indicators.update_bar(close, volume)
+        return indicators
+
+    @property
+    def bar_count(self) -> int:
+        return self._state.count
+
+    def update_bar(self, close: float, volume: float):
+        """새 봉 추가 (직전 봉은 확정)"""
+        self._base = self._state
+        self._prev_values = self._values
+        self._state = self._advance(self._base, close, volume)
+        self._values = self._evaluate(self._state)
+
+    def update_tick(self, close: float, volume: float):
+        """형성 중인 현재 봉 갱신 (volume은 당일 누적 거래량)"""
+        if self._state.count == 0:
+            self.update_bar(close, volume)
+            return
+        self._state = self._advance(self._base, close, volume)
+        self._values = self._evaluate(self._state)
+
+    def _advance(self, base: _IndicatorState, close: float, volume: float) -> _IndicatorState:
+        state = base.copy()
+        state.count += 1
+
+        for key in _IndicatorState.EMA_KEYS:
+            period, depth = key
+            value = close if depth == 1 else state.ema[(period, depth - 1)][0] / state.ema[(period, depth - 1)][1]
+            _ema_step(state.ema[key], value, period)
+
+        macd_line = self._ema_value(state, 12, 1) - self._ema_value(state, 26, 1)
+        _ema_step(state.signal, macd_line, 9)
+
+        if state.last_close is not None:
+            delta = close - state.last_close
+            gain, loss = max(delta, 0.0), max(-delta, 0.0)
+            state.gains.append(gain)
+            state.losses.append(loss)
+            if self.wilder_rsi:
+                if state.avg_gain is None:
+                    if len(state.gains) == self.rsi_period:
+                        state.avg_gain = sum(state.gains) / self.rsi_period
+                        state.avg_loss = sum(state.losses) / self.rsi_period
+                else:
+                    n = self.rsi_period
+                    state.avg_gain = (state.avg_gain * (n - 1) + gain) / n
+                    state.avg_loss = (state.avg_loss * (n - 1) + loss) / n
+
+            if delta > 0:
+                state.obv += volume
+            elif delta < 0:
+                state.obv -= volume
+
+        state.last_close = close
+        state.volumes.append(volume)
+        return state
+
+    @staticmethod
+    def _ema_value(state: _IndicatorState, period: int, depth: int) -> float:
+        num, den = state.ema[(period, depth)]
+        return num / den if den else 0.0
+
+    def _rsi(self, state: _IndicatorState) -> float:
+        if state.count < self.rsi_period + 1:
+            return 50.0
+        if self.wilder_rsi:
+            avg_gain, avg_loss = state.avg_gain, state.avg_loss
+        else:
+            avg_gain = sum(state.gains) / self.rsi_period
+            avg_loss = sum(state.losses) / self.rsi_period
+        if avg_loss == 0:
+            return 100.0 if avg_gain > 0 else float("nan")
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+    def _evaluate(self, state: _IndicatorState) -> Dict[str, float]:
+        """상태로부터 지표 값 계산 (데이터 부족시 ConditionService와 같은 기본값)"""
+        ema = lambda period, depth: self._ema_value(state, period, depth)
+        count = state.count
+
+        tema = 3 * ema(20, 1) - 3 * ema(20, 2) + ema(20, 3) if count >= 20 else 0.0
+        dema = 2 * ema(10, 1) - ema(10, 2) if count >= 10 else 0.0
+        if count >= 26:
+            macd_line = ema(12, 1) - ema(26, 1)
+            macd_oscillator = macd_line - state.signal[0] / state.signal[1]
+        else:
+            macd_oscillator = 0.0
+
+        avg_volume = sum(state.volumes) / len(state.volumes) if state.volumes else 0.0
+        current_volume = state.volumes[-1] if state.volumes else 0
+        volume_ratio = current_volume / avg_volume if avg_volume > 0 else 1.0
+
+        return {
+            "tema_20": tema,
+            "dema_10": dema,
+            "macd_oscillator": macd_oscillator,
+            "rsi_14": self._rsi(state),
+            "obv": state.obv if count >= 2 else 0.0,
+            "avg_volume_5": avg_volume,
+            "volume_ratio": volume_ratio,
+        }
+
+    @property
+    def current(self) -> Dict[str, float]:
+        return self._values
+
+    @property
+    def previous(self) -> Dict[str, float]:
+        return self._prev_values
+
+    @property
+    def golden_cross(self) -> bool:
+        """TEMA(20) > DEMA(10) AND TEMA(20)[1] < DEMA(10)[1]"""
+        if self._state.count < 21:
+            return False
+        return (self._values["tema_20"] > self._values["dema_10"]
+                and self._prev_values["tema_20"] < self._prev_values["dema_10"])
+
+    def to_technical_indicators(self) -> TechnicalIndicators:
+        return TechnicalIndicators(**self._values)
+
+
+class IndicatorStateBook:
+    """종목코드별 스트리밍 지표 상태 모음"""
+
+    def __init__(self, **indicator_kwargs):
+        self._indicator_kwargs = indicator_kwargs
+        self._states: Dict[str, IncrementalIndicators] = {}
+
+    def __contains__(self, stock_code: str) -> bool:
+        return stock_code in self._states
+
+    def get(self, stock_code: str) -> Optional[IncrementalIndicators]:
+        return self._states.get(stock_code)
+
+    def seed(self, stock_code: str, chart_data: Union[BarSeries, Sequence[Dict[str, Any]]]) -> IncrementalIndicators:
+        """과거 봉으로 종목 상태 초기화"""
+        state = IncrementalIndicators.from_chart_data(chart_data, **self._indicator_kwargs)
+        self._states[stock_code] = state
+        return state
+
+    def on_bar(self, stock_code: str, close: float, volume: float) -> IncrementalIndicators:
+        state = self._states.setdefault(stock_code, IncrementalIndicators(**self._indicator_kwargs))
+        state.update_bar(close, volume)
+        return state
+
+    def on_tick(self, stock_code: str, close: float, volume: float) -> IncrementalIndicators:
+        state = self._states.setdefault(stock_code, IncrementalIndicators(**self._indicator_kwargs))
+        state.update_tick(close, volume)
+        return state
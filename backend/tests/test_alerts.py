@@ -0,0 +1,238 @@
+import json
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from types import SimpleNamespace
+
+import httpx
+import pytest
+import uvicorn
+import websockets
+
+import main
+from alerts import DEFAULT_CONDITION, AlertEngine, InvalidWatchlist
+from analysis_pipeline import AnalysisPipeline
+from bar_series import BarSeries
+from condition_dsl import StrategyBook
+from condition_service import ConditionService
+from market_hours import now_kst
+from mock_quote_feed import MockQuoteFeed
+from realtime_quotes import RealtimeQuoteFeed, TickBook
+
+BREAKOUT = "가격_돌파"  # 저장된 일봉 종가는 100, 모의 체결가는 5,000원 이상
+
+
+def daily_bars(count: int) -> BarSeries:
+    today = now_kst().date()
+    return BarSeries.of([
+        {"date": (today - timedelta(days=count - i)).strftime("%Y%m%d"),
+         "open": 100, "high": 100, "low": 100, "close": 100, "volume": 1000}
+        for i in range(count)
+    ])
+
+
+class TickChartService:
+    """저장된 일봉 + 실시간 당일 봉 (AsyncKiwoomService.get_stock_chart_data와 같은 합성)"""
+
+    def __init__(self, tick_book: TickBook):
+        self.tick_book = tick_book
+        self.calls = 0
+
+    async def get_stock_chart_data(self, stock_code: str, period: str = "D", count: int = 30) -> BarSeries:
+        self.calls += 1
+        return self.tick_book.apply_intraday(stock_code, daily_bars(count), count)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    strategies = tmp_path / "strategies.json"
+    strategies.write_text(json.dumps({BREAKOUT: "CLOSE > 1000"}, ensure_ascii=False), encoding="utf-8")
+    pipeline = AnalysisPipeline(TickChartService(TickBook()), ConditionService(), timeframes=[])
+    engine = AlertEngine(
+        pipeline, StrategyBook(str(strategies)), path=str(tmp_path / "watchlists.json"), min_interval=0.01
+    )
+    yield engine
+    pipeline.shutdown()
+
+
+@asynccontextmanager
+async def quote_feed(engine: AlertEngine):
+    """모의 체결 서버와 그 서버에 연결할 수신기 (체결은 알림 엔진으로 전달)"""
+    server = await websockets.serve(MockQuoteFeed(interval=0.02, seed=7).handler, "127.0.0.1", 0)
+    port = next(iter(server.sockets)).getsockname()[1]
+    feed = RealtimeQuoteFeed(engine.pipeline.kiwoom_service.tick_book, url=f"ws://127.0.0.1:{port}", watchlist=[])
+    feed.listeners.append(engine.on_tick)
+    try:
+        yield feed
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+@asynccontextmanager
+async def api_server(monkeypatch, engine: AlertEngine, feed: RealtimeQuoteFeed):
+    """알림 API만 쓰는 서버 (서비스 생성/준비 작업 없이)"""
+    monkeypatch.setattr(main, "services", SimpleNamespace(alert_engine=engine, realtime_feed=feed))
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=0, lifespan="off", log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        yield f"127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        await serving
+
+
+async def stop(*tasks: asyncio.Task):
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def test_quote_feed_tick_pushes_hold_to_buy_over_websocket(engine, monkeypatch):
+    async def scenario():
+        async with quote_feed(engine) as feed, api_server(monkeypatch, engine, feed) as host:
+            async with httpx.AsyncClient(base_url=f"http://{host}") as client:
+                response = await client.post(
+                    "/api/alerts/watchlists", params={"name": "관심", "codes": "005930", "conditions": BREAKOUT}
+                )
+                assert response.status_code == 200
+                watchlist_id = response.json()["id"]
+                assert feed.watchlist == ["005930"]
+
+                # 체결 전: 저장된 일봉만으로 현재 신호 기록 (첫 평가는 알리지 않음)
+                assert await engine.evaluate_pass() == []
+                assert engine.signals(watchlist_id) == {"005930": {BREAKOUT: "HOLD"}}
+
+                async with websockets.connect(f"ws://{host}/ws/alerts?watchlist_id={watchlist_id}") as ws:
+                    snapshot = json.loads(await ws.recv())
+                    assert snapshot == {"event": "snapshot", "data": {watchlist_id: {"005930": {BREAKOUT: "HOLD"}}}}
+
+                    tasks = [asyncio.create_task(feed.run()), asyncio.create_task(engine.run_loop())]
+                    try:
+                        alert = json.loads(await asyncio.wait_for(ws.recv(), timeout=10))
+                    finally:
+                        await stop(*tasks)
+
+                assert alert["event"] == "alert"
+                event = alert["data"]
+                assert (event["watchlist_id"], event["code"], event["condition"]) == (watchlist_id, "005930", BREAKOUT)
+                assert (event["previous"], event["signal"]) == ("HOLD", "BUY")
+                assert event["price"] > 1000
+                assert event["bar_date"] == int(now_kst().strftime("%Y%m%d"))
+
+                response = await client.delete(f"/api/alerts/watchlists/{watchlist_id}")
+                assert response.status_code == 200
+                assert (await client.delete(f"/api/alerts/watchlists/{watchlist_id}")).status_code == 404
+
+            with pytest.raises(websockets.exceptions.InvalidStatus):
+                async with websockets.connect(f"ws://{host}/ws/alerts?watchlist_id={watchlist_id}") as ws:
+                    await ws.recv()
+
+    asyncio.run(scenario())
+
+
+def test_unchanged_bars_are_skipped(engine):
+    async def scenario():
+        engine.register("관심", ["005930", "000660"], [BREAKOUT])
+        async with quote_feed(engine) as feed:
+            await feed.subscribe(engine.codes())
+            receiving = asyncio.create_task(feed.run())
+            try:
+                while not all(code in feed.tick_book for code in engine.codes()):
+                    await asyncio.sleep(0.01)
+            finally:
+                await stop(receiving)
+
+        assert engine.stats()["pending"] == 2  # 체결이 들어온 감시 종목
+        await engine.evaluate_pass()
+        assert engine.stats()["evaluated"] == 2
+
+        # 체결이 끊긴 뒤 전체 확인: 봉이 그대로이므로 조회만 하고 계산은 생략
+        chart_service = engine.pipeline.kiwoom_service
+        calls = chart_service.calls
+        engine.mark_dirty(engine.codes())
+        assert await engine.evaluate_pass() == []
+        assert chart_service.calls == calls + 2
+        stats = engine.stats()
+        assert (stats["evaluated"], stats["skipped"]) == (2, 2)
+
+    asyncio.run(scenario())
+
+
+def test_new_condition_on_watched_code_is_evaluated_without_bar_change(engine):
+    async def scenario():
+        first = engine.register("돌파", ["005930"], [BREAKOUT])
+        await engine.evaluate_pass()
+        second = engine.register("기본", ["005930"], [DEFAULT_CONDITION])
+        assert engine.stats()["pending"] == 1
+        await engine.evaluate_pass()
+        assert engine.signals(first.id) == {"005930": {BREAKOUT: "HOLD"}}
+        assert set(engine.signals(second.id)["005930"]) == {DEFAULT_CONDITION}
+
+    asyncio.run(scenario())
+
+
+def test_register_validation_persistence_and_remove(engine):
+    with pytest.raises(InvalidWatchlist):
+        engine.register("빈 목록", [" "])
+    with pytest.raises(InvalidWatchlist):
+        engine.register("관심", ["005930"], ["없는_조건"])
+    with pytest.raises(InvalidWatchlist):
+        engine.register("관심", [f"{i:06d}" for i in range(engine.max_codes + 1)])
+
+    first = engine.register("관심", ["005930", "000660", "005930"])
+    second = engine.register("반도체", ["000660"], [BREAKOUT, BREAKOUT])
+    assert first.codes == ["005930", "000660"]
+    assert first.conditions == [DEFAULT_CONDITION]
+    assert second.conditions == [BREAKOUT]
+    assert sorted(engine.codes()) == ["000660", "005930"]
+
+    restored = AlertEngine(engine.pipeline, engine.strategy_book, path=str(engine.path))
+    assert restored.load() == 2
+    assert sorted(restored.watchlists) == sorted([first.id, second.id])
+
+    asyncio.run(engine.evaluate_pass())
+    assert engine.remove(first.id)
+    assert not engine.remove(first.id)
+    assert engine.codes() == ["000660"]
+    assert engine.signals(first.id) is None
+    assert engine.signals(second.id) == {"000660": {BREAKOUT: "HOLD"}}
+    assert set(engine._signals) == {("000660", BREAKOUT)}  # 더 감시하지 않는 (종목, 조건) 정리
+
+    restored = AlertEngine(engine.pipeline, engine.strategy_book, path=str(engine.path))
+    assert restored.load() == 1
+
+
+def test_delete_watchlist_unsubscribes_codes_no_longer_watched(engine, monkeypatch):
+    async def scenario():
+        async with quote_feed(engine) as feed, api_server(monkeypatch, engine, feed) as host:
+            received = []
+            feed.listeners.append(lambda tick, new_bar: received.append(tick.code))
+            async with httpx.AsyncClient(base_url=f"http://{host}") as client:
+                await client.post("/api/realtime/subscribe", params={"codes": "035720"})
+                first = (await client.post(
+                    "/api/alerts/watchlists", params={"name": "관심", "codes": "005930,000660,035720"}
+                )).json()
+                await client.post("/api/alerts/watchlists", params={"name": "반도체", "codes": "000660"})
+                assert sorted(feed.watchlist) == ["000660", "005930", "035720"]
+
+                receiving = asyncio.create_task(feed.run())
+                try:
+                    while "005930" not in received:
+                        await asyncio.sleep(0.01)
+                    assert (await client.delete(f"/api/alerts/watchlists/{first['id']}")).status_code == 200
+                    # 다른 목록이 감시하는 종목, 직접 구독한 종목은 유지
+                    assert sorted(feed.watchlist) == ["000660", "035720"]
+
+                    await asyncio.sleep(0.1)  # 해지 요청 전에 보낸 체결이 도착할 시간
+                    received.clear()
+                    while len(received) < 20:
+                        await asyncio.sleep(0.01)
+                    assert "005930" not in received
+                finally:
+                    await stop(receiving)
+
+    asyncio.run(scenario())
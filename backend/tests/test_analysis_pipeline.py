@@ -0,0 +1,143 @@
+import asyncio
+
+import pytest
+
+from analysis_pipeline import TIMEFRAME_HISTORY_DAYS, AnalysisPipeline
+from bar_series import BarSeries
+from benchmarks.synthetic import generate_bars
+from condition_service import ConditionService
+
+
+class FakeKiwoomService:
+    """조회마다 delay초 걸리는 가짜 키움 클라이언트 (동시 조회 수 기록)"""
+
+    def __init__(self, delay: float = 0.01, days: int = 60, fail=(), slow=(), empty=()):
+        self.delay = delay
+        self.days = days
+        self.fail, self.slow, self.empty = set(fail), set(slow), set(empty)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.chart_counts = []
+
+    async def _call(self, stock_code: str):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(10 if stock_code in self.slow else self.delay)
+            if stock_code in self.fail:
+                raise RuntimeError(f"조회 실패: {stock_code}")
+        finally:
+            self.in_flight -= 1
+
+    async def search_by_condition(self, condition_name: str):
+        return [f"{i:06d}" for i in range(1, 31)]
+
+    async def get_stock_price(self, stock_code: str):
+        await self._call(stock_code)
+        return {"price": 1000.0, "change_percent": 1.0, "volume": 100}
+
+    async def get_stock_name(self, stock_code: str):
+        return f"종목{stock_code}"
+
+    async def get_stock_chart_data(self, stock_code: str, period: str = "D", count: int = 30):
+        self.chart_counts.append(count)
+        if stock_code in self.empty:
+            return BarSeries.empty()
+        return generate_bars(stock_code, days=min(count, self.days), seed=6)
+
+
+def make_pipeline(service: FakeKiwoomService, **kwargs) -> AnalysisPipeline:
+    options = dict(max_concurrency=3, stock_timeout=1.0, timeframes=[])
+    options.update(kwargs)
+    return AnalysisPipeline(service, ConditionService(), **options)
+
+
+def test_fan_out_is_bounded_and_matches_serial_analysis():
+    service = FakeKiwoomService()
+    pipeline = make_pipeline(service)
+    codes = [f"{i:06d}" for i in range(10)]
+    try:
+        result = asyncio.run(pipeline.run(codes))
+    finally:
+        pipeline.shutdown()
+
+    assert 1 < service.max_in_flight <= 3
+    assert sorted(stock.stock_info.code for stock in result.stocks) == codes
+    assert (result.failed, result.skipped) == ({}, [])
+    assert set(service.chart_counts) == {AnalysisPipeline.DAILY_BARS}
+
+    condition_service = ConditionService()
+    for stock in result.stocks:
+        daily = generate_bars(stock.stock_info.code, days=AnalysisPipeline.DAILY_BARS, seed=6)
+        assert stock.indicators == condition_service.calculate_indicators(daily)
+        assert stock.stock_info.name == f"종목{stock.stock_info.code}"
+        assert stock.timeframes is None and stock.timeframe_confirmed is None
+
+
+def test_partial_results_with_failed_slow_and_empty_stocks():
+    service = FakeKiwoomService(fail={"000002"}, slow={"000003"}, empty={"000004"})
+    pipeline = make_pipeline(service, stock_timeout=0.2)
+    try:
+        result = asyncio.run(pipeline.run(["000001", "000002", "000003", "000004"]))
+    finally:
+        pipeline.shutdown()
+
+    assert [stock.stock_info.code for stock in result.stocks] == ["000001"]
+    assert result.failed["000002"] == "조회 실패: 000002"
+    assert result.failed["000003"].startswith("시간 초과")
+    assert result.skipped == ["000004"]
+
+
+def test_stream_cancels_remaining_work_when_consumer_stops():
+    service = FakeKiwoomService(delay=0.05)
+    pipeline = make_pipeline(service, max_concurrency=2)
+
+    async def first_only():
+        stream = pipeline.stream([f"{i:06d}" for i in range(6)])
+        kind, _, _ = await stream.__anext__()
+        await stream.aclose()
+        await asyncio.sleep(0.1)
+        return kind
+
+    try:
+        assert asyncio.run(first_only()) == "analyzed"
+    finally:
+        pipeline.shutdown()
+    assert service.in_flight == 0
+    assert len(service.chart_counts) < 6
+
+
+def test_timeframes_resample_the_same_daily_fetch():
+    service = FakeKiwoomService(days=600)
+    pipeline = make_pipeline(service, timeframes=["M", "W"])
+    try:
+        result = asyncio.run(pipeline.run(["000001"]))
+    finally:
+        pipeline.shutdown()
+
+    assert pipeline.timeframes == ("W", "M")
+    assert service.chart_counts == [TIMEFRAME_HISTORY_DAYS["M"]]  # 종목당 일봉 조회 한 번
+
+    stock = result.stocks[0]
+    chart = generate_bars("000001", days=TIMEFRAME_HISTORY_DAYS["M"], seed=6)
+    condition_service = ConditionService()
+    for timeframe, frame in stock.timeframes.items():
+        resampled = chart.resample(timeframe)
+        assert frame.bars == len(resampled)
+        # 시간 프레임은 배치 엔진으로 계산하므로 부동소수점 오차 허용
+        expected = condition_service.calculate_indicators(resampled).model_dump()
+        assert frame.indicators.model_dump() == pytest.approx(expected, rel=1e-9, abs=1e-9)
+        assert frame.trend_up == condition_service.is_trend_up(frame.indicators)
+    assert stock.timeframe_confirmed == all(frame.trend_up for frame in stock.timeframes.values())
+    # 일봉 지표는 조회 구간과 무관하게 최근 30봉 기준
+    assert stock.indicators == condition_service.calculate_indicators(chart.tail(AnalysisPipeline.DAILY_BARS))
+
+
+def test_timeframes_from_env_and_validation(monkeypatch):
+    monkeypatch.setenv("ANALYSIS_TIMEFRAMES", "w")
+    pipeline = make_pipeline(FakeKiwoomService(), timeframes=None)
+    assert (pipeline.timeframes, pipeline.chart_count) == (("W",), TIMEFRAME_HISTORY_DAYS["W"])
+    pipeline.shutdown()
+
+    with pytest.raises(ValueError):
+        make_pipeline(FakeKiwoomService(), timeframes=["D"])
@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+from async_kiwoom_service import AsyncKiwoomService
+from benchmarks.mock_broker import MockBrokerConfig, MockBrokerServer
+from rate_limiter import RequestScheduler
+from shared_state import MemoryState
+
+
+@pytest.fixture(scope="module")
+def broker():
+    with MockBrokerServer(MockBrokerConfig(latency=0.01, jitter=0, condition_size=12)) as server:
+        yield server
+
+
+@pytest.fixture
+def service(broker, monkeypatch):
+    monkeypatch.setenv("KIWOOM_BASE_URL", broker.url)
+    monkeypatch.setenv("KIWOOM_APP_KEY", "key")
+    monkeypatch.setenv("KIWOOM_APP_SECRET", "secret")
+    return AsyncKiwoomService(
+        scheduler=RequestScheduler(global_rate=1000.0, tr_limits={}, state=MemoryState()),
+        max_connections=4,
+        max_keepalive_connections=4,
+        http2=False,
+    )
+
+
+def test_client_requires_open_and_is_shared(service):
+    with pytest.raises(RuntimeError):
+        service.client
+
+    async def scenario():
+        await service.open()
+        client = service.client
+        await service.open()  # 이미 열려 있으면 그대로
+        assert service.client is client
+        await service.aclose()
+        await service.aclose()
+
+    asyncio.run(scenario())
+    with pytest.raises(RuntimeError):
+        service.client
+
+
+def test_concurrent_requests_reuse_pooled_connections(service, broker):
+    async def scenario():
+        await service.open()
+        try:
+            codes = await service.search_by_condition("골든크로스")
+            results = await asyncio.gather(*(
+                asyncio.gather(
+                    service.get_stock_price(code),
+                    service.get_stock_name(code),
+                    service.get_stock_chart_data(code, count=30),
+                )
+                for code in codes
+            ))
+            connections = len(service.client._transport._pool.connections)
+        finally:
+            await service.aclose()
+        return codes, results, connections
+
+    requests_before = broker.stats["requests"]
+    codes, results, connections = asyncio.run(scenario())
+    assert len(codes) == 12
+    for code, (price, name, chart) in zip(codes, results):
+        assert price["price"] > 0 and name and len(chart) == 30
+    # 36건 넘게 보냈지만 연결은 풀 크기 이내에서 재사용
+    assert broker.stats["requests"] - requests_before >= 37
+    assert 1 <= connections <= 4
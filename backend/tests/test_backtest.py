@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from backtest import BacktestRules, confidence_scores, evaluate_signals, forward_returns, run_backtest
+from batch_indicators import pack_columns
+from benchmarks.synthetic import generate_bars, stock_codes
+from condition_service import ConditionService
+
+# 합성 일봉에서도 신호가 나오도록 완화한 조건
+LOOSE = BacktestRules(rsi_min=40.0, macd_osc_min=-1000.0, volume_ratio_min=0.8)
+
+
+def reference_signals(bars, rules: BacktestRules):
+    """봉마다 최근 window개 봉으로 ConditionService를 호출해 조건 충족 여부와 신뢰도 계산"""
+    service = ConditionService()
+    service.RSI_MIN, service.MACD_OSC_MIN, service.VOLUME_RATIO_MIN = (
+        rules.rsi_min, rules.macd_osc_min, rules.volume_ratio_min
+    )
+    meets, confidence = [], []
+    for end in range(1, len(bars) + 1):
+        window = bars[max(0, end - rules.window):end]
+        indicators = service.calculate_indicators(window)
+        meets.append(service.meets_all_conditions(indicators, window))
+        confidence.append(service.generate_trading_strategy(indicators, True).confidence)
+    return np.array(meets), np.array(confidence)
+
+
+def test_signals_match_search_conditions_on_each_window():
+    charts = [generate_bars(code, days=120, seed=4) for code in stock_codes(4)]
+    closes, volumes = pack_columns(charts, "close"), pack_columns(charts, "volume")
+    evaluated = evaluate_signals(closes, volumes, LOOSE)
+
+    for i, bars in enumerate(charts):
+        meets, confidence = reference_signals(bars, LOOSE)
+        np.testing.assert_array_equal(evaluated["meets"][i], meets)
+        np.testing.assert_allclose(evaluated["confidence"][i], confidence, rtol=1e-9)
+    assert evaluated["meets"].any()
+
+
+def test_confidence_uses_rules_under_test():
+    rsi, macd, volume = np.array([70.0]), np.array([50.0]), np.array([2.5])
+    assert confidence_scores(rsi, macd, volume)[0] == pytest.approx((1.0 + 1.0 + 1.0) / 3)
+    strict = BacktestRules(rsi_min=65.0, macd_osc_min=0.0, volume_ratio_min=2.0)
+    assert confidence_scores(rsi, macd, volume, strict)[0] == pytest.approx((5 / 15 + 0.5 + 0.5) / 3)
+
+
+def test_forward_returns_pad_with_nan():
+    closes = np.array([[100.0, 110.0, 99.0]])
+    returns = forward_returns(closes, 1)
+    np.testing.assert_allclose(returns[0, :2], [0.1, -0.1])
+    assert np.isnan(returns[0, 2])
+    assert np.isnan(forward_returns(closes, 5)).all()
+
+
+def test_run_backtest_report_is_consistent():
+    bars_by_code = {code: generate_bars(code, days=150, seed=9) for code in stock_codes(6)}
+    bars_by_code["000000"] = []  # 일봉이 없는 종목은 제외
+    report = run_backtest(bars_by_code, rules=LOOSE, horizons=[1, 5], workers=1, chunk_size=4)
+
+    assert (report.stocks, report.bars) == (6, 900)
+    assert report.summary["signals"] == len(report.signals) > 0
+    assert [s["date"] for s in report.signals] == sorted(s["date"] for s in report.signals)
+    for h in (1, 5):
+        with_return = [s[f"return_{h}"] for s in report.signals if s[f"return_{h}"] is not None]
+        assert report.summary[f"horizon_{h}"]["count"] == len(with_return)
+        assert sum(bucket[f"horizon_{h}"]["count"] for bucket in report.calibration) == len(with_return)
+
+    # 프로세스 풀로 나눠 계산해도 같은 결과
+    parallel = run_backtest(bars_by_code, rules=LOOSE, horizons=[1, 5], workers=2, chunk_size=4)
+    assert parallel.signals == report.signals
@@ -0,0 +1,81 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from bar_series import BarSeries
+
+
+def bar(date: str, close: float, volume: int = 100) -> dict:
+    return {"date": date, "open": close - 1, "high": close + 2, "low": close - 2, "close": close, "volume": volume}
+
+
+RECORDS = [
+    bar("20240102", 10), bar("20240103", 11), bar("20240105", 12),  # 1월 첫 주 (화~금)
+    bar("20240108", 13), bar("20240131", 14),  # 다음 주, 1월 마지막 날
+    bar("20240201", 15),
+]
+
+
+def test_records_round_trip_and_views_are_read_only():
+    series = BarSeries.from_records(RECORDS)
+    assert series.to_records() == [{**r, "open": float(r["open"]), "high": float(r["high"]),
+                                    "low": float(r["low"]), "close": float(r["close"])} for r in RECORDS]
+    assert series[-1]["date"] == "20240201"
+    assert BarSeries.of(series) is series
+    assert len(BarSeries.of(None)) == 0
+
+    tail = series.tail(2)
+    assert tail.last_date == 20240201 and np.shares_memory(tail.close, series.close)
+    assert series.tail(None) is series and series.tail(100) is series
+    assert len(series.previous) == 5
+    with pytest.raises(ValueError):
+        series.close[0] = 0
+
+    restored = pickle.loads(pickle.dumps(series))
+    assert restored.to_records() == series.to_records()
+    assert not restored.close.flags.writeable
+
+
+def test_from_rows_and_rows_match():
+    series = BarSeries.from_records(RECORDS)
+    assert BarSeries.from_rows([tuple(float(v) for v in row) for row in series.rows()]).to_records() == series.to_records()
+    assert next(series.rows()) == ("20240102", 9.0, 12.0, 8.0, 10.0, 100)
+
+
+def test_before_concat_and_with_bar():
+    series = BarSeries.from_records(RECORDS)
+    assert series.before(20240108).last_date == 20240105
+    assert len(series.before(20230101)) == 0
+
+    # 겹치는 일자는 뒤 시리즈 우선
+    newer = BarSeries.from_records([bar("20240201", 99), bar("20240202", 16)])
+    merged = BarSeries.concat([series, BarSeries.empty(), newer])
+    assert merged.dates.tolist()[-3:] == [20240131, 20240201, 20240202]
+    assert merged.close.tolist()[-2:] == [99.0, 16.0]
+
+    replaced = series.with_bar(20240201, 15, 20, 14, 18, 300)
+    assert (len(replaced), replaced.close[-1], replaced.volume[-1]) == (6, 18.0, 300.0)
+    appended = series.with_bar(20240202, 18, 19, 17, 18, 50)
+    assert len(appended) == 7 and series.last_date == 20240201  # 원본은 그대로
+
+
+def test_resample_weekly_and_monthly():
+    series = BarSeries.from_records(RECORDS)
+    assert series.resample("D") is series
+
+    weekly = series.resample("W")
+    assert weekly.dates.tolist() == [20240105, 20240108, 20240201]
+    first_week = weekly[0]
+    assert (first_week["open"], first_week["high"], first_week["low"], first_week["close"], first_week["volume"]) == (
+        9.0, 14.0, 8.0, 12.0, 300
+    )
+    # 20240131(수)과 20240201(목)은 같은 주
+    assert weekly.close.tolist() == [12.0, 13.0, 15.0]
+
+    monthly = series.resample("M")
+    assert monthly.dates.tolist() == [20240131, 20240201]
+    assert monthly.volume.tolist() == [500.0, 100.0]
+
+    with pytest.raises(ValueError):
+        series.resample("Y")
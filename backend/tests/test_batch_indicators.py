@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from batch_indicators import BatchIndicatorEngine, ewm_mean, pack_columns, rolling_mean
+from benchmarks.synthetic import generate_bars
+from condition_service import ConditionService
+
+FIELDS = ["tema_20", "dema_10", "macd_oscillator", "rsi_14", "obv", "avg_volume_5", "volume_ratio"]
+
+
+def test_pack_columns_right_aligns_with_nan_padding():
+    short = generate_bars("000660", days=3)
+    long = generate_bars("005930", days=5)
+    packed = pack_columns([long, short, []], "close")
+    assert packed.shape == (3, 5)
+    np.testing.assert_array_equal(packed[0], long.close)
+    assert np.isnan(packed[1, :2]).all()
+    np.testing.assert_array_equal(packed[1, 2:], short.close)
+    assert np.isnan(packed[2]).all()
+
+
+def test_ewm_and_rolling_match_pandas_with_leading_nan():
+    values = np.array([[np.nan, np.nan, 1.0, 2.0, 4.0, 3.0, 5.0], [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0]])
+    for row in range(2):
+        series = pd.Series(values[row])
+        np.testing.assert_allclose(ewm_mean(values, 3)[row], series.ewm(span=3).mean(), equal_nan=True)
+        np.testing.assert_allclose(rolling_mean(values, 3)[row], series.rolling(3).mean(), equal_nan=True)
+    assert np.isnan(rolling_mean(values, 10)).all()
+
+
+@pytest.mark.parametrize("days", [0, 1, 4, 12, 20, 21, 40, 120])
+def test_batch_matches_per_stock_condition_service(days):
+    service = ConditionService()
+    charts = [generate_bars(f"{i:06d}", days=days, seed=3) for i in range(5)]
+    # 길이가 다른 종목을 섞어 NaN 채움 구간도 확인
+    charts.append(generate_bars("999999", days=max(days // 2, 0), seed=3))
+    result = BatchIndicatorEngine().compute_from_chart_data(charts)
+
+    for index, chart in enumerate(charts):
+        expected = service.calculate_indicators(chart)
+        actual = BatchIndicatorEngine.to_technical_indicators(result, index)
+        for field in FIELDS:
+            assert getattr(actual, field) == pytest.approx(getattr(expected, field), rel=1e-9, abs=1e-9), field
+        assert bool(result["golden_cross"][index]) == service.check_golden_cross_condition(chart)
+
+
+def test_empty_batch_returns_defaults():
+    result = BatchIndicatorEngine().compute(np.zeros((2, 0)), np.zeros((2, 0)))
+    indicators = BatchIndicatorEngine.to_technical_indicators(result, 1)
+    assert (indicators.rsi_14, indicators.volume_ratio, indicators.tema_20) == (50.0, 1.0, 0.0)
+    assert not result["golden_cross"].any()
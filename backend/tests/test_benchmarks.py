@@ -0,0 +1,76 @@
+import asyncio
+from argparse import Namespace
+
+import httpx
+import pytest
+
+from benchmarks import synthetic
+from benchmarks.mock_broker import MockBrokerConfig, create_app, parse_rate_limits
+from benchmarks.run_benchmarks import compare, run_memory, run_micro
+
+PRICE_PATH = "/uapi/domestic-stock/v1/quotations/inquire-price"
+
+
+def test_synthetic_data_is_reproducible():
+    first = synthetic.generate_bars("005930", days=50, seed=3)
+    assert synthetic.generate_bars("005930", days=50, seed=3).to_records() == first.to_records()
+    assert synthetic.generate_bars("005930", days=50, seed=4).to_records() != first.to_records()
+    assert len(first) == 50 and (first.dates[1:] > first.dates[:-1]).all()
+    assert synthetic.condition_response("골든크로스", 20, 500) == synthetic.condition_response("골든크로스", 20, 500)
+
+
+def broker_get(config: MockBrokerConfig, count: int, tr_id: str = "FHKST01010100"):
+    async def scenario():
+        transport = httpx.ASGITransport(app=create_app(config))
+        async with httpx.AsyncClient(transport=transport, base_url="http://broker") as client:
+            return [
+                await client.get(PRICE_PATH, params={"fid_input_iscd": "005930"}, headers={"tr_id": tr_id})
+                for _ in range(count)
+            ]
+
+    return asyncio.run(scenario())
+
+
+def test_mock_broker_rate_limits_and_errors():
+    config = MockBrokerConfig(latency=0, jitter=0, rate_limits=parse_rate_limits("FHKST01010100=2"))
+    responses = broker_get(config, 4)
+    assert [r.status_code for r in responses] == [200, 200, 500, 500]
+    assert responses[2].json()["msg_cd"] == "EGW00201"  # 초당 거래건수 초과
+    assert [r.status_code for r in broker_get(config, 4, tr_id="CTPF1002R")] == [200] * 4  # 한도 없는 tr_id
+
+    failing = MockBrokerConfig(latency=0, jitter=0, error_rate=1.0)
+    assert {r.status_code for r in broker_get(failing, 3)} == {500}
+
+
+def test_compare_flags_regressions_beyond_tolerance():
+    baseline = {
+        "e2e.search_fresh.throughput_per_s": 100.0,
+        "e2e.search_fresh.p95_ms": 50.0,
+        "e2e.search_fresh.error_rate": 0.0,
+        "micro.batch_engine_per_stock_us": 10.0,
+    }
+    results = {
+        "e2e.search_fresh.throughput_per_s": 70.0,  # 30% 감소
+        "e2e.search_fresh.p95_ms": 55.0,  # 10% 증가 (허용)
+        "e2e.search_fresh.error_rate": 0.3,
+        "micro.batch_engine_per_stock_us": 8.0,
+        "memory.analyzed_stock_bytes": 2000.0,  # 기준값 없음
+    }
+    assert compare(results, baseline, tolerance=0.2) == [
+        "e2e.search_fresh.throughput_per_s", "e2e.search_fresh.error_rate",
+    ]
+
+
+def test_micro_and_memory_sections_run():
+    args = Namespace(stocks=20, seed=0)
+    micro = run_micro(args)
+    memory = run_memory(args)
+    assert all(value > 0 for value in micro.values())
+    assert memory["memory.chart_30d_bytes"] < memory["memory.chart_30d_records_bytes"]
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("", {}), ("FHKST01010100=10, CTPF1002R=2.5", {"FHKST01010100": 10.0, "CTPF1002R": 2.5}),
+])
+def test_parse_rate_limits(raw, expected):
+    assert parse_rate_limits(raw) == expected
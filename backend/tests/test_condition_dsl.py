@@ -0,0 +1,148 @@
+import json
+
+import numpy as np
+import pytest
+
+from condition_dsl import (
+    DEFAULT_STRATEGIES, ConditionPlan, ConditionSyntaxError, StrategyBook, parse, tokenize,
+)
+from condition_service import ConditionService
+
+
+def synthetic_charts(count: int, seed: int = 3):
+    """길이가 제각각인 무작위 보행 일봉 (거래량 급증 포함)"""
+    rng = np.random.default_rng(seed)
+    charts = []
+    for _ in range(count):
+        n = int(rng.integers(5, 61))
+        closes = 10000 * np.exp(np.cumsum(rng.normal(0, 0.03, n)))
+        volumes = rng.integers(1000, 5000, n) * (1 + 3 * (rng.random(n) < 0.3))
+        charts.append([
+            {"date": f"{20260101 + i}", "open": c, "high": c, "low": c, "close": float(c), "volume": int(v)}
+            for i, (c, v) in enumerate(zip(closes, volumes))
+        ])
+    return charts
+
+
+def cmp(op, left, right):
+    return ("cmp", op, left, right)
+
+
+CLOSE = ("ind", "CLOSE", ())
+VOLUME = ("ind", "VOLUME", ())
+
+
+def test_tokenize_is_case_insensitive_for_names_and_keywords():
+    assert tokenize("rsi(14) >= 55.5 And close crosses_above ema") == [
+        ("name", "RSI"), ("op", "("), ("num", 14.0), ("op", ")"), ("op", ">="), ("num", 55.5),
+        ("kw", "AND"), ("name", "CLOSE"), ("kw", "CROSSES_ABOVE"), ("name", "EMA"),
+    ]
+
+
+@pytest.mark.parametrize("expression", [
+    "",
+    "   ",
+    "RSI(14) >",
+    "FOO(3) > 1",
+    "CLOSE > 1 )",
+    "(CLOSE > 1",
+    "CLOSE $ 1",
+    "RSI(14, 3) > 1",
+    "RSI(0) > 50",
+    "EMA(x) > 1",
+    "CLOSE > > 1",
+])
+def test_parse_errors(expression):
+    with pytest.raises(ConditionSyntaxError):
+        ConditionPlan({"x": expression})
+
+
+@pytest.mark.parametrize("expression", [
+    "RSI(14)",                  # 비교식이 아님
+    "CLOSE + 1",
+    "NOT CLOSE",
+    "CLOSE AND VOLUME > 1",
+    "(CLOSE > 1) + 2 > 3",
+    "(CLOSE > 1) crosses_above 2",
+])
+def test_type_errors(expression):
+    with pytest.raises(ConditionSyntaxError):
+        ConditionPlan({"x": expression})
+
+
+def test_precedence():
+    # or < and < not < 비교 < +,- < *,/ < 단항 -
+    assert parse("CLOSE > 1 or CLOSE > 2 and VOLUME > 3") == (
+        "or", cmp(">", CLOSE, ("const", 1.0)), ("and", cmp(">", CLOSE, ("const", 2.0)), cmp(">", VOLUME, ("const", 3.0)))
+    )
+    assert parse("not CLOSE > 1 and VOLUME > 1") == (
+        "and", ("not", cmp(">", CLOSE, ("const", 1.0))), cmp(">", VOLUME, ("const", 1.0))
+    )
+    assert parse("1 + 2 * CLOSE - 3 > 0") == cmp(
+        ">", ("arith", "-", ("arith", "+", ("const", 1.0), ("arith", "*", ("const", 2.0), CLOSE)), ("const", 3.0)),
+        ("const", 0.0)
+    )
+    assert parse("-CLOSE * 2 < 0") == cmp(
+        "<", ("arith", "*", ("arith", "-", ("const", 0.0), CLOSE), ("const", 2.0)), ("const", 0.0)
+    )
+    assert parse("(CLOSE > 1 or CLOSE > 2) and VOLUME > 3")[0] == "and"
+
+
+def test_precedence_in_evaluation():
+    plan = ConditionPlan({
+        "implicit": "CLOSE > 10 or CLOSE > 0 and VOLUME > 100",
+        "grouped": "(CLOSE > 10 or CLOSE > 0) and VOLUME > 100",
+        "arith": "CLOSE + 2 * VOLUME == 13",
+    })
+    columns = {"close": np.array([[11.0], [5.0]]), "volume": np.array([[1.0], [4.0]])}
+    result = plan.evaluate(columns)
+    assert result["implicit"].tolist() == [True, False]
+    assert result["grouped"].tolist() == [False, False]
+    assert result["arith"].tolist() == [True, True]
+
+
+def test_shared_subexpressions_are_interned_once():
+    plan = ConditionPlan({
+        "a": "RSI(14) > 55 and VOLUME_RATIO(5) > 1.5",
+        "b": "rsi > 55 or CLOSE > EMA(20)",  # RSI 기본 인자 = RSI(14)
+        "c": "RSI(14) > 55 and VOLUME_RATIO(5) > 1.5",
+    })
+    assert plan.roots["a"] == plan.roots["c"]
+    rsi_nodes = [node for node in plan.nodes if node[0] == "ind" and node[1] == "RSI"]
+    assert rsi_nodes == [("ind", "RSI", (14,))]
+    rsi_cmp = plan._index[("cmp", ">", plan._index[("ind", "RSI", (14,))], plan._index[("const", 55.0)])]
+    assert plan.nodes[plan.roots["a"]][1] == rsi_cmp
+    assert plan.nodes[plan.roots["b"]][1] == rsi_cmp
+    assert plan.indicator_count == 4  # RSI, VOLUME_RATIO, CLOSE, EMA
+    assert len(set(plan.nodes)) == len(plan.nodes)
+
+
+def test_golden_cross_strategy_matches_condition_service():
+    charts = synthetic_charts(1500)
+    service = ConditionService()
+    flags = StrategyBook().plan.evaluate_chart_data(charts)["골든크로스_상승"]
+
+    expected = np.array([meets for _, meets in service.analyze_batch(charts)])
+    assert expected.sum() > 0  # 조건을 만족하는 종목이 실제로 있어야 의미 있는 비교
+    assert (flags == expected).all()
+
+    for chart, flag in zip(charts[:300], flags[:300]):
+        assert service.meets_all_conditions(service.calculate_indicators(chart), chart) == flag
+
+
+def test_default_strategies_compile_with_shared_nodes():
+    book = StrategyBook()
+    assert set(DEFAULT_STRATEGIES) <= set(book.plan.expressions)
+    separate = sum(len(ConditionPlan({name: expression}).nodes) for name, expression in DEFAULT_STRATEGIES.items())
+    assert len(book.plan.nodes) < separate
+
+
+def test_strategy_book_skips_invalid_user_strategy(tmp_path):
+    path = tmp_path / "strategies.json"
+    path.write_text(json.dumps({"돌파": "CLOSE > SMA(20)", "오류": "RSI(14) >"}, ensure_ascii=False), encoding="utf-8")
+    book = StrategyBook(str(path))
+    assert "돌파" in book.plan.expressions
+    assert "오류" not in book.plan.expressions
+    with pytest.raises(ConditionSyntaxError):
+        book.plan_for(["없는_전략"])
+    assert list(book.plan_for(["돌파"], "CLOSE > 0").roots) == ["돌파", "custom"]
@@ -0,0 +1,45 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from batch_indicators import BatchIndicatorEngine, pack_columns
+from benchmarks.synthetic import generate_bars, stock_codes
+from indicator_pool import RESULT_FIELDS, IndicatorProcessPool
+
+
+def packed(count: int):
+    charts = [generate_bars(code, days=30 + i % 7, seed=1) for i, code in enumerate(stock_codes(count))]
+    return pack_columns(charts, "close"), pack_columns(charts, "volume")
+
+
+def test_process_pool_matches_in_process_batch():
+    closes, volumes = packed(23)
+    pool = IndicatorProcessPool(workers=2, batch_size=5, min_stocks=1)
+    try:
+        result = asyncio.run(pool.compute(closes, volumes))
+    finally:
+        pool.shutdown()
+
+    expected = BatchIndicatorEngine().compute(closes, volumes)
+    for name in RESULT_FIELDS:
+        assert result[name].dtype == expected[name].dtype, name
+        np.testing.assert_array_equal(result[name], expected[name], err_msg=name)
+    stats = pool.stats()
+    assert (stats["batches"], stats["stocks"], stats["tasks"], stats["running"]) == (1, 23, 5, False)
+
+
+def test_disabled_pool_computes_in_process(monkeypatch):
+    monkeypatch.setenv("INDICATOR_POOL_WORKERS", "0")
+    pool = IndicatorProcessPool(min_stocks=10)
+    assert not pool.enabled and not pool.accepts(1000)
+
+    closes, volumes = packed(3)
+    result = asyncio.run(pool.compute(closes, volumes))
+    assert result["lengths"].tolist() == [30, 31, 32]
+    assert pool.stats()["batches"] == 0
+
+
+@pytest.mark.parametrize("n_stocks, accepted", [(9, False), (10, True)])
+def test_accepts_only_large_batches(n_stocks, accepted):
+    assert IndicatorProcessPool(workers=2, min_stocks=10).accepts(n_stocks) == accepted
@@ -0,0 +1,106 @@
+import asyncio
+
+import httpx
+import pytest
+
+import main
+from analysis_pipeline import AnalysisPipeline
+from benchmarks.synthetic import generate_bars, stock_codes
+from condition_service import ConditionService
+from market_scanner import MarketScanner, TopK
+from ohlcv_store import OHLCVStore
+
+
+class FakeKiwoomService:
+    """합성 일봉을 돌려주는 가짜 키움 클라이언트"""
+
+    def __init__(self, fail=(), slow=()):
+        self.fail, self.slow = set(fail), set(slow)
+        self.fetched = []
+
+    async def get_stock_price(self, stock_code: str):
+        await asyncio.sleep(10 if stock_code in self.slow else 0)
+        if stock_code in self.fail:
+            raise RuntimeError(f"조회 실패: {stock_code}")
+        return {"price": 1000.0, "change_percent": 0.0, "volume": 100}
+
+    async def get_stock_name(self, stock_code: str):
+        return stock_code
+
+    async def get_stock_chart_data(self, stock_code: str, period: str = "D", count: int = 30):
+        self.fetched.append(stock_code)
+        return generate_bars(stock_code, days=count, seed=8)
+
+
+@pytest.fixture
+def pipeline():
+    pipeline = AnalysisPipeline(FakeKiwoomService(), ConditionService(), max_concurrency=4, timeframes=[])
+    yield pipeline
+    pipeline.shutdown()
+
+
+def test_top_k_requires_positive_k():
+    with pytest.raises(ValueError):
+        TopK(0)
+    with pytest.raises(ValueError):
+        TopK(-1)
+
+
+def test_scan_keeps_top_k_by_confidence_across_batches(pipeline):
+    codes = stock_codes(25)
+    scanner = MarketScanner(pipeline, batch_size=4)
+    result = asyncio.run(scanner.scan(codes + codes[:3], top_k=5, prefilter=False))
+
+    everything = asyncio.run(pipeline.run(codes)).stocks
+    expected = sorted(stock.strategy.confidence for stock in everything)[-5:][::-1]
+    assert [stock.strategy.confidence for stock in result.stocks] == expected
+    assert (result.scanned, result.analyzed, result.prefiltered_out, result.unprocessed) == (28, 25, 0, 0)
+
+
+def test_prefilter_drops_only_stored_codes_failing_relaxed_conditions(pipeline, tmp_path):
+    store = OHLCVStore(path=str(tmp_path / "ohlcv.sqlite3"))
+    stored = stock_codes(40)
+    for code in stored:
+        store.upsert_bars(code, generate_bars(code, days=30, seed=8))
+    unknown = stock_codes(5, start=900)
+    scanner = MarketScanner(pipeline, ohlcv_store=store, batch_size=10)
+    try:
+        passed = asyncio.run(scanner.prefilter(stored + unknown))
+        result = asyncio.run(scanner.scan(stored + unknown, top_k=3))
+    finally:
+        store.close()
+
+    dropped = set(stored) - set(passed)
+    assert dropped and set(unknown) <= set(passed)  # 저장 이력이 없는 종목은 판단하지 않고 통과
+    service = ConditionService()
+    for code in dropped:
+        bars = generate_bars(code, days=30, seed=8)
+        assert not service.meets_all_conditions(service.calculate_indicators(bars), bars)
+    assert result.prefiltered_out == len(dropped)
+    assert not dropped & set(pipeline.kiwoom_service.fetched)  # 제외된 종목은 조회하지 않음
+
+
+def test_scan_records_failures_and_stops_at_deadline():
+    codes = stock_codes(10)
+    service = FakeKiwoomService(fail={"000101"}, slow=codes[2:4])
+    pipeline = AnalysisPipeline(service, ConditionService(), max_concurrency=2, timeframes=[])
+    scanner = MarketScanner(pipeline, batch_size=2)
+    try:
+        result = asyncio.run(scanner.scan(codes, top_k=10, prefilter=False, deadline=0.5))
+    finally:
+        pipeline.shutdown()
+
+    assert result.failed == {"000101": "조회 실패: 000101"}
+    assert result.analyzed == 1
+    assert result.unprocessed == 8  # 두 번째 배치부터 시간 초과
+    assert len(result.stocks) == 1
+
+
+def test_scan_rejects_non_positive_top_k():
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/api/scan", params={"condition_name": "골든크로스", "top_k": 0})
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 422
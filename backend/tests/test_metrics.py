@@ -0,0 +1,68 @@
+import asyncio
+
+import httpx
+
+import main
+from metrics import (
+    MetricsRegistry, add_request_timings, record_stage, stage_timer, summarize_timings, track_request,
+)
+
+
+def test_counter_and_histogram_render_prometheus_text():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "호출 수", ["tr_id", "status"])
+    latency = registry.histogram("latency_seconds", "응답 시간", ["tr_id"], buckets=(0.1, 1.0))
+    registry.callback("cache_size", "캐시 크기", ["cache"], lambda: [(("names",), 3)])
+
+    requests.inc(tr_id="ka10001", status="ok")
+    requests.inc(2, tr_id="ka10001", status="ok")
+    requests.inc(tr_id='a"b', status="error")
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value, tr_id="ka10001")
+
+    lines = registry.render().splitlines()
+    assert "# TYPE requests_total counter" in lines
+    assert 'requests_total{tr_id="ka10001",status="ok"} 3' in lines
+    assert 'requests_total{tr_id="a\\"b",status="error"} 1' in lines
+    assert "# TYPE latency_seconds histogram" in lines
+    assert [line for line in lines if line.startswith("latency_seconds")] == [
+        'latency_seconds_bucket{tr_id="ka10001",le="0.1"} 1',
+        'latency_seconds_bucket{tr_id="ka10001",le="1"} 2',
+        'latency_seconds_bucket{tr_id="ka10001",le="+Inf"} 3',
+        'latency_seconds_sum{tr_id="ka10001"} 5.55',
+        'latency_seconds_count{tr_id="ka10001"} 3',
+    ]
+    assert 'cache_size{cache="names"} 3' in lines
+
+
+def test_request_timings_collect_only_inside_tracked_request():
+    record_stage("analyze", 1.0)  # 추적 중인 요청이 없으면 히스토그램에만 기록
+
+    async def worker():
+        with track_request() as timings:
+            record_stage("fetch", 0.2)
+        return timings
+
+    with track_request() as timings:
+        with stage_timer("search"):
+            pass
+        record_stage("fetch", 0.1)
+        add_request_timings(asyncio.run(worker()))
+
+    summary = summarize_timings(timings)
+    assert set(summary) == {"search", "fetch"}
+    assert summary["fetch"] == {"total": 0.3, "count": 2, "max": 0.2}
+
+
+def test_metrics_endpoint_exposes_registry():
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/metrics")
+
+    record_stage("search", 0.01)
+    response = asyncio.run(scenario())
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE search_stage_seconds histogram" in response.text
+    assert 'search_stage_seconds_count{stage="search"}' in response.text
@@ -0,0 +1,58 @@
+from datetime import datetime
+
+import ohlcv_store
+from market_hours import KST
+from ohlcv_store import OHLCVStore
+
+
+def bars(dates):
+    return [{"date": d, "open": 100, "high": 110, "low": 90, "close": 105, "volume": 1000} for d in dates]
+
+
+def test_first_fetch_covers_requested_bar_count(tmp_path):
+    store = OHLCVStore(path=str(tmp_path / "ohlcv.sqlite3"))
+    try:
+        default_start = store.history_start_date()
+        weekly_start = store.history_start_date(135)
+        assert weekly_start < default_start  # 주봉 26개 이상 (135거래일 ≈ 200달력일)
+        assert store.fetch_start_date("005930", 135) == weekly_start
+    finally:
+        store.close()
+
+
+def test_stored_code_backfilled_once_for_longer_history(tmp_path):
+    store = OHLCVStore(path=str(tmp_path / "ohlcv.sqlite3"))
+    try:
+        start = store.fetch_start_date("005930", 30)
+        store.upsert_bars("005930", bars([start, "99990101"]), start_date=start)
+        assert store.fetch_start_date("005930", 30) is None
+
+        # 더 긴 이력을 요청하면 그 기간부터 다시 조회
+        longer = store.fetch_start_date("005930", 570)
+        assert longer is not None and longer < start
+        store.upsert_bars("005930", bars([]), start_date=longer)  # 상장 기간이 짧아 더 받을 봉이 없음
+        assert store.requested_from("005930") == longer
+        assert store.fetch_start_date("005930", 570) is None
+    finally:
+        store.close()
+
+
+def test_partial_bar_synced_before_close_refetched_after_close(tmp_path, monkeypatch):
+    evening = datetime(2026, 10, 15, 18, 0, tzinfo=KST)  # 목요일 장 마감 후
+    monkeypatch.setattr(ohlcv_store, "now_kst", lambda: evening)
+    store = OHLCVStore(path=str(tmp_path / "ohlcv.sqlite3"))
+    try:
+        start = store.history_start_date(30)
+        store.upsert_bars("005930", bars([start, "20261015"]), start_date=start)
+
+        def synced(hour, minute):
+            stamp = datetime(2026, 10, 15, hour, minute, tzinfo=KST).timestamp()
+            with store._lock:
+                store._conn.execute("UPDATE sync_state SET synced_at = ? WHERE code = ?", (stamp, "005930"))
+
+        synced(10, 0)  # 장중에 받은 미완성 봉
+        assert store.fetch_start_date("005930", 30) == "20261015"
+        synced(15, 40)  # 마감 후 다시 받은 봉
+        assert store.fetch_start_date("005930", 30) is None
+    finally:
+        store.close()
@@ -0,0 +1,124 @@
+import asyncio
+
+from analysis_pipeline import PipelineResult
+from prescreen import PrescreenService
+from rate_limiter import Priority, RequestScheduler
+from stock_models import AnalyzedStock, StockInfo, TechnicalIndicators, TradingStrategy
+
+
+def analyzed(code: str, confidence: float) -> AnalyzedStock:
+    return AnalyzedStock(
+        stock_info=StockInfo(code=code, name=code, price=1000.0, change_percent=0.0, volume=100),
+        indicators=TechnicalIndicators(
+            tema_20=0, dema_10=0, macd_oscillator=0, rsi_14=50, obv=0, avg_volume_5=0, volume_ratio=1
+        ),
+        strategy=TradingStrategy(signal="HOLD", description="", confidence=confidence),
+        meets_conditions=False,
+    )
+
+
+class FakePipeline:
+    """조건검색/분석에 delay초 걸리는 가짜 파이프라인 (실행 횟수 기록)"""
+
+    def __init__(self, delay: float = 0.02):
+        self.delay = delay
+        self.runs = []
+
+    async def search_codes(self, condition_name: str):
+        return ["000001", "000002", "000003", "000004"]
+
+    async def run(self, stock_codes):
+        self.runs.append(list(stock_codes))
+        await asyncio.sleep(self.delay)
+        return PipelineResult(
+            stocks=[analyzed(code, int(code) / 10) for code in stock_codes if code != "000003"],
+            failed={"000003": "조회 실패"} if "000003" in stock_codes else {},
+        )
+
+
+def make_service(pipeline: FakePipeline, **kwargs) -> PrescreenService:
+    options = dict(conditions=["골든크로스"], interval=0.01, max_staleness=60, max_stocks=3)
+    options.update(kwargs)
+    return PrescreenService(pipeline, **options)
+
+
+def test_compute_stores_versioned_results_sorted_by_confidence():
+    pipeline = FakePipeline()
+    service = make_service(pipeline)
+    key = service.make_key("골든크로스", ["KOSDAQ", "KOSPI"])
+    assert key == service.make_key("골든크로스", ["KOSPI", "KOSDAQ"])
+
+    async def scenario():
+        first = await service.compute(key)
+        second = await service.compute(key)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert pipeline.runs[0] == ["000001", "000002", "000003"]  # 상위 max_stocks개만 분석
+    assert [s.stock_info.code for s in first.stocks] == ["000002", "000001"]
+    assert first.failed_codes == ["000003"]
+    assert (first.version, second.version) == (1, 2)
+    assert service.get(key) is second
+    assert first.view is first.view and len(first.view) == 2
+
+
+def test_get_or_compute_reuses_fresh_results():
+    pipeline = FakePipeline()
+    service = make_service(pipeline, max_staleness=0.05)
+    key = service.make_key("골든크로스")
+
+    async def scenario():
+        first, cached = await service.get_or_compute(key)
+        assert not cached
+        assert await service.get_or_compute(key) == (first, True)
+
+        await asyncio.sleep(0.06)
+        assert (await service.get_or_compute(key, max_staleness=10))[1]  # 요청별 허용 시간
+        pinned, cached = await service.get_or_compute(key, pinned_version=first.version)
+        assert (pinned, cached) == (first, True)  # 커서가 가리키는 버전은 오래되어도 유지
+
+        refreshed, cached = await service.get_or_compute(key)
+        assert (refreshed.version, cached) == (2, False)
+        forced, _ = await service.get_or_compute(key, force_refresh=True)
+        assert forced.version == 3
+
+    asyncio.run(scenario())
+    stats = service.stats()
+    assert (stats["hits"], stats["misses"], stats["executed"]) == (3, 3, 3)
+    assert service.serve_stale(key).version == 3 and service.stats()["stale_served"] == 1
+
+
+def test_concurrent_requests_coalesce_and_background_joins_interactive():
+    pipeline = FakePipeline(delay=0.05)
+    service = make_service(pipeline)
+    key = service.make_key("골든크로스")
+
+    async def background():
+        with RequestScheduler.priority(Priority.BACKGROUND):
+            await asyncio.sleep(0.01)
+            return await service.compute_shared(key)
+
+    async def scenario():
+        return await asyncio.gather(*(service.compute_shared(key) for _ in range(3)), background())
+
+    results = asyncio.run(scenario())
+    assert all(result is results[0] for result in results)
+    assert len(pipeline.runs) == 1
+    assert service.stats()["coalesced"] == 3
+
+
+def test_background_loop_refreshes_configured_conditions_and_evicts_oldest():
+    pipeline = FakePipeline(delay=0)
+    service = make_service(pipeline, conditions=["A", "B"], max_entries=2)
+
+    async def scenario():
+        loop = asyncio.create_task(service.run_loop())
+        while service.stats()["background_runs"] < 1:
+            await asyncio.sleep(0.005)
+        loop.cancel()
+        await asyncio.gather(loop, return_exceptions=True)
+        await service.compute(service.make_key("C"))
+
+    asyncio.run(scenario())
+    assert service.get(service.make_key("A")) is None  # 가장 오래된 결과부터 정리
+    assert [r["condition_name"] for r in service.stats()["results"]] == ["B", "C"]
@@ -0,0 +1,95 @@
+import time
+import asyncio
+
+import pytest
+
+from rate_limiter import Priority, RequestScheduler, SchedulerQueueFull, TokenBucket, current_priority
+from shared_state import MemoryState
+
+
+def make_scheduler(**kwargs) -> RequestScheduler:
+    options = dict(global_rate=1000.0, tr_limits={}, max_queue=10, poll_interval=0.001, state=MemoryState())
+    options.update(kwargs)
+    return RequestScheduler(**options)
+
+
+def test_token_bucket_refills_up_to_capacity():
+    bucket = TokenBucket(rate=10.0, capacity=2)
+    now = bucket.updated
+    for _ in range(2):
+        assert bucket.wait_time(now) == 0
+        bucket.consume()
+    assert bucket.wait_time(now) == pytest.approx(0.1)
+    assert bucket.wait_time(now + 0.05) == pytest.approx(0.05)
+    assert bucket.wait_time(now + 10) == 0
+    assert bucket.tokens == 2  # 오래 쉬어도 capacity까지만 충전
+
+
+def test_tr_bucket_limits_calls_per_tr_id():
+    scheduler = make_scheduler(tr_limits={"FHKST01010100": 20.0})
+    start = time.monotonic()
+    for _ in range(25):
+        scheduler.acquire_sync("FHKST01010100")
+    # 버킷의 20개를 쓴 뒤 나머지 5개는 초당 20개씩 충전을 기다림
+    assert time.monotonic() - start >= 0.2
+    # 한도가 없는 tr_id는 전역 버킷만 통과하면 됨
+    start = time.monotonic()
+    scheduler.acquire_sync("ka10001")
+    assert time.monotonic() - start < 0.1
+    assert scheduler.stats()["granted"] == 26
+
+
+def test_background_yields_to_waiting_interactive():
+    async def scenario():
+        scheduler = make_scheduler(global_rate=50.0)
+        for _ in range(50):
+            scheduler.acquire_sync("ka10001")  # 버킷을 비워 이후 요청은 대기
+
+        order = []
+
+        async def request(priority: Priority, name: str):
+            await scheduler.acquire("ka10001", priority)
+            order.append(name)
+
+        background = [asyncio.create_task(request(Priority.BACKGROUND, f"bg{i}")) for i in range(3)]
+        await asyncio.sleep(0)
+        interactive = [asyncio.create_task(request(Priority.INTERACTIVE, f"ui{i}")) for i in range(3)]
+        await asyncio.gather(*background, *interactive)
+        assert sorted(order[:3]) == ["ui0", "ui1", "ui2"]  # 같은 우선순위끼리는 순서 보장 없음
+
+    asyncio.run(scenario())
+
+
+def test_queue_full_rejects_immediately():
+    async def scenario():
+        scheduler = make_scheduler(global_rate=1.0, max_queue=2)
+        scheduler.acquire_sync("ka10001")
+        waiting = [asyncio.create_task(scheduler.acquire("ka10001", Priority.BACKGROUND)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(SchedulerQueueFull):
+            await scheduler.acquire("ka10001", Priority.BACKGROUND)
+        stats = scheduler.stats()
+        assert (stats["rejected"], stats["waiting_background"]) == (1, 2)
+        # 다른 우선순위 대기열은 따로 셈
+        assert stats["waiting_interactive"] == 0
+        for task in waiting:
+            task.cancel()
+        await asyncio.gather(*waiting, return_exceptions=True)
+        assert scheduler.stats()["waiting_background"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_priority_context_sets_default_priority():
+    assert current_priority.get() == Priority.INTERACTIVE
+    with RequestScheduler.priority(Priority.BACKGROUND):
+        assert current_priority.get() == Priority.BACKGROUND
+    assert current_priority.get() == Priority.INTERACTIVE
+
+
+def test_tr_limits_from_env(monkeypatch):
+    monkeypatch.setenv("KIWOOM_TR_LIMITS", "FHKST01010100=3, CTPF1002R=1.5,잘못된값")
+    scheduler = RequestScheduler(global_rate=10.0, state=MemoryState())
+    assert scheduler.tr_buckets["FHKST01010100"].rate == 3.0
+    assert scheduler.tr_buckets["CTPF1002R"].rate == 1.5
+    assert scheduler.tr_buckets["PSEARCH_RESULT"].rate == 1.0  # 지정하지 않은 tr_id는 기본값
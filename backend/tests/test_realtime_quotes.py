@@ -0,0 +1,46 @@
+import time
+import asyncio
+
+from bar_series import BarSeries
+from benchmarks.synthetic import generate_bars
+from market_hours import now_kst
+from ohlcv_store import OHLCVStore
+from realtime_quotes import RealtimeQuoteFeed, Tick, TickBook
+from streaming_indicators import IncrementalIndicators, IndicatorStateBook
+
+
+def tick(code: str, price: float) -> Tick:
+    return Tick(code=code, price=price, change_percent=0.0, cum_volume=1000.0, open=price, high=price, low=price)
+
+
+def test_stale_tick_bar_does_not_replace_stored_bar():
+    today = int(now_kst().strftime("%Y%m%d"))
+    stored = BarSeries.of([{"date": str(today), "open": 100, "high": 120, "low": 90, "close": 110, "volume": 5000}])
+    book = TickBook(bar_max_age=60)
+
+    book.update(tick("005930", 95), now=time.time() - 120)  # 연결 끊김 전 마지막 체결
+    assert book.apply_intraday("005930", stored) is stored
+
+    book.update(tick("005930", 130))
+    merged = book.apply_intraday("005930", stored)
+    assert len(merged) == 1 and float(merged.close[-1]) == 130
+
+
+def test_subscribe_seeds_indicators_from_daily_window_off_tick_path(tmp_path):
+    today = now_kst().date()
+    bars = generate_bars("005930", days=120, end=today)
+    store = OHLCVStore(path=str(tmp_path / "ohlcv.sqlite3"))
+    store.upsert_bars("005930", bars)
+    indicator_book = IndicatorStateBook()
+    feed = RealtimeQuoteFeed(TickBook(), watchlist=[], indicator_book=indicator_book, ohlcv_store=store, seed_bars=30)
+    try:
+        feed.on_tick(tick("000660", 50000))  # 구독 전(초기화 전) 종목은 지표 상태를 만들지 않음
+        assert "000660" not in indicator_book
+
+        asyncio.run(feed.subscribe(["005930"]))
+        state = indicator_book.get("005930")
+        window = bars.before(int(today.strftime("%Y%m%d"))).tail(30)
+        assert state.bar_count == 30
+        assert state.current == IncrementalIndicators.from_chart_data(window).current
+    finally:
+        store.close()
@@ -0,0 +1,162 @@
+import time
+import asyncio
+
+import httpx
+import pytest
+
+from resilience import BrokerResilience, CircuitOpenError, CircuitState, KiwoomAPIError
+
+
+def make_resilience(**kwargs) -> BrokerResilience:
+    options = dict(max_attempts=1, base_delay=0, failure_threshold=1, reset_timeout=0.05, hedge_tr_ids=set())
+    options.update(kwargs)
+    return BrokerResilience(**options)
+
+
+async def connect_error():
+    raise httpx.ConnectError("connection refused")
+
+
+async def open_breaker(resilience: BrokerResilience, tr_id: str):
+    with pytest.raises(KiwoomAPIError):
+        await resilience.call(tr_id, connect_error)
+    assert resilience.breaker(tr_id).state == CircuitState.OPEN
+    await asyncio.sleep(resilience.reset_timeout)
+
+
+def test_cancelled_trial_releases_half_open_slot():
+    async def scenario():
+        resilience = make_resilience()
+        await open_breaker(resilience, "ka10001")
+
+        # 반열림 시험 호출이 시간 초과로 취소됨
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(resilience.call("ka10001", lambda: asyncio.sleep(10)), timeout=0.01)
+        assert resilience.breaker("ka10001").state == CircuitState.HALF_OPEN
+
+        async def ok():
+            return {"rt_cd": "0"}
+
+        # 다음 호출이 새 시험 호출로 허용되어 닫힘
+        assert await resilience.call("ka10001", ok) == {"rt_cd": "0"}
+        assert resilience.breaker("ka10001").state == CircuitState.CLOSED
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_call_rejected_while_trial_in_flight():
+    async def scenario():
+        resilience = make_resilience(reset_timeout=1)
+        await open_breaker(resilience, "ka10081")
+        trial = asyncio.ensure_future(resilience.call("ka10081", lambda: asyncio.sleep(0.05, "trial")))
+        await asyncio.sleep(0)
+        with pytest.raises(CircuitOpenError):
+            await resilience.call("ka10081", connect_error)
+        assert await trial == "trial"
+        assert resilience.breaker("ka10081").state == CircuitState.CLOSED
+
+    asyncio.run(scenario())
+
+
+def test_unrecorded_trial_expires_after_reset_timeout():
+    resilience = make_resilience()
+    breaker = resilience.breaker("ka10001")
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    time.sleep(resilience.reset_timeout)
+    assert breaker.allow()       # 시험 호출 시작 후 결과가 기록되지 않음
+    assert not breaker.allow()
+    time.sleep(resilience.reset_timeout)
+    assert breaker.allow()
+
+
+def flaky(failures: int, error: Exception):
+    """처음 failures번은 error로 실패하고 이후 성공하는 호출"""
+    calls = []
+
+    async def attempt():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise error
+        return {"rt_cd": "0"}
+
+    return attempt, calls
+
+
+def test_retryable_errors_are_retried_until_success():
+    async def scenario():
+        resilience = make_resilience(max_attempts=3, failure_threshold=5)
+        attempt, calls = flaky(2, httpx.ConnectError("connection refused"))
+        assert await resilience.call("ka10001", attempt) == {"rt_cd": "0"}
+        assert len(calls) == 3
+        assert resilience.breaker("ka10001").state == CircuitState.CLOSED
+
+        attempt, calls = flaky(5, httpx.ConnectError("connection refused"))
+        with pytest.raises(KiwoomAPIError) as raised:
+            await resilience.call("ka10001", attempt)
+        assert len(calls) == 3 and raised.value.retryable
+
+    asyncio.run(scenario())
+
+
+def test_client_errors_and_rate_limits_do_not_open_breaker():
+    request = httpx.Request("GET", "http://broker")
+    not_found = httpx.HTTPStatusError("404", request=request, response=httpx.Response(404, request=request))
+
+    async def scenario():
+        resilience = make_resilience(max_attempts=3)
+        attempt, calls = flaky(1, not_found)
+        with pytest.raises(KiwoomAPIError) as raised:
+            await resilience.call("ka10001", attempt)
+        assert (len(calls), raised.value.status, raised.value.retryable) == (1, 404, False)
+
+        rate_limited = KiwoomAPIError("호출 한도 초과", "ka10001", retryable=True, rate_limited=True)
+        attempt, calls = flaky(1, rate_limited)
+        assert await resilience.call("ka10001", attempt) == {"rt_cd": "0"}  # 재시도는 하지만
+        assert resilience.breaker("ka10001").state == CircuitState.CLOSED  # 장애로 세지 않음
+
+    asyncio.run(scenario())
+
+
+def test_open_breaker_fails_fast_with_circuit_open_error():
+    async def scenario():
+        resilience = make_resilience(reset_timeout=10)
+        with pytest.raises(KiwoomAPIError):
+            await resilience.call("ka10081", connect_error)
+        attempt, calls = flaky(0, RuntimeError())
+        with pytest.raises(CircuitOpenError):
+            await resilience.call("ka10081", attempt)
+        assert calls == []
+        assert resilience.stats()["ka10081"]["state"] == "open"
+
+    asyncio.run(scenario())
+
+
+def test_slow_request_is_hedged_and_first_response_wins():
+    async def scenario():
+        resilience = make_resilience(hedge_tr_ids={"FHKST01010100"}, hedge_percentile=50, hedge_min_samples=3)
+        assert resilience.hedge_delay("FHKST01010100") is None  # 표본 부족
+        for _ in range(3):
+            resilience.observe_latency("FHKST01010100", 0.01)
+        assert resilience.hedge_delay("FHKST01010100") == pytest.approx(0.01)
+
+        calls = []
+
+        async def attempt():
+            calls.append(1)
+            await asyncio.sleep(1.0 if len(calls) == 1 else 0.01)  # 첫 요청만 느림
+            return len(calls)
+
+        started = time.monotonic()
+        assert await resilience.call("FHKST01010100", attempt) == 2
+        assert time.monotonic() - started < 0.5
+        assert resilience.hedge_delay("ka10001") is None  # 헤지 대상이 아닌 tr_id
+
+    asyncio.run(scenario())
+
+
+def test_backoff_is_capped_full_jitter():
+    resilience = make_resilience(base_delay=0.1, max_delay=0.3)
+    delays = [resilience.backoff(attempt) for attempt in range(6) for _ in range(20)]
+    assert all(0 <= delay <= 0.3 for delay in delays)
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from result_view import InvalidQuery, ResultQuery, ResultView, StaleCursor, render
+from stock_models import AnalyzedStock, StockInfo, TechnicalIndicators, TradingStrategy
+
+
+def analyzed(code: str, confidence: float, rsi: float, meets: bool) -> AnalyzedStock:
+    return AnalyzedStock(
+        stock_info=StockInfo(code=code, name=f"종목{code}", price=1000.0, change_percent=1.5, volume=100),
+        indicators=TechnicalIndicators(
+            tema_20=1.0, dema_10=1.0, macd_oscillator=0.0, rsi_14=rsi, obv=0.0, avg_volume_5=1.0, volume_ratio=1.0
+        ),
+        strategy=TradingStrategy(signal="BUY" if meets else "HOLD", description="", confidence=confidence),
+        meets_conditions=meets,
+    )
+
+
+@pytest.fixture
+def view() -> ResultView:
+    return ResultView([
+        analyzed("000001", 0.3, 40, False),
+        analyzed("000002", 0.9, 70, True),
+        analyzed("000003", 0.6, 60, True),
+        analyzed("000004", 0.3, 50, False),
+        analyzed("000005", 0.8, 65, True),
+    ])
+
+
+def codes(page) -> list:
+    return [json.loads(row)["stock_info"]["code"] for row in page.rows]
+
+
+def test_sort_and_filter(view):
+    assert codes(view.page(ResultQuery.parse())) == ["000002", "000005", "000003", "000001", "000004"]
+    assert codes(view.page(ResultQuery.parse(sort="rsi_14"))) == ["000001", "000004", "000003", "000005", "000002"]
+
+    page = view.page(ResultQuery.parse(meets_conditions=True, min_confidence=0.7, signal="buy"))
+    assert codes(page) == ["000002", "000005"] and page.total_count == 2
+    assert view.order(ResultQuery.parse()) is view.order(ResultQuery.parse(limit=2))  # 같은 조건은 순서 재사용
+
+
+def test_field_selection(view):
+    query = ResultQuery.parse(fields=["stock_info.code", "strategy", "strategy.signal"], limit=1)
+    assert json.loads(view.page(query).rows[0]) == {
+        "stock_info": {"code": "000002"},
+        "strategy": {"signal": "BUY", "description": "", "confidence": 0.9},
+    }
+
+
+def test_cursor_pages_and_staleness(view):
+    first = view.page(ResultQuery.parse(limit=2), version=3)
+    assert codes(first) == ["000002", "000005"] and first.total_count == 5
+
+    second = view.page(ResultQuery.parse(limit=2, cursor=first.next_cursor), version=3)
+    third = view.page(ResultQuery.parse(limit=2, cursor=second.next_cursor), version=3)
+    assert codes(second) + codes(third) == ["000003", "000001", "000004"]
+    assert third.next_cursor is None
+
+    with pytest.raises(StaleCursor):
+        view.page(ResultQuery.parse(limit=2, cursor=first.next_cursor), version=4)
+    with pytest.raises(InvalidQuery):
+        ResultQuery.parse(sort="rsi_14", cursor=first.next_cursor)  # 다른 정렬 조건의 커서
+
+
+@pytest.mark.parametrize("params", [
+    {"sort": "없는항목"}, {"fields": ["stock_info.없음"]}, {"fields": ["없는그룹"]},
+    {"limit": 0}, {"limit": 1001}, {"cursor": "잘못된"}, {"cursor": "e30"},
+])
+def test_invalid_query(params):
+    with pytest.raises(InvalidQuery):
+        ResultQuery.parse(**params)
+
+
+def test_render_splices_rows_into_envelope(view):
+    page = view.page(ResultQuery.parse(limit=2), version=1)
+    body = json.loads(render({"success": True, "message": "ok"}, page))
+    assert [s["stock_info"]["code"] for s in body["stocks"]] == ["000002", "000005"]
+    assert (body["success"], body["total_count"], body["next_cursor"]) == (True, 5, page.next_cursor)
+    assert body["stocks"][0] == view.items[1]
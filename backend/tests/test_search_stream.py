@@ -0,0 +1,78 @@
+import json
+import asyncio
+from types import SimpleNamespace
+from typing import Tuple
+
+import httpx
+
+import main
+from stock_models import AnalyzedStock, StockInfo, TechnicalIndicators, TradingStrategy
+
+
+def analyzed(code: str, confidence: float) -> AnalyzedStock:
+    return AnalyzedStock(
+        stock_info=StockInfo(code=code, name=code, price=1000.0, change_percent=0.0, volume=100),
+        indicators=TechnicalIndicators(
+            tema_20=0, dema_10=0, macd_oscillator=0, rsi_14=50, obv=0, avg_volume_5=0, volume_ratio=1
+        ),
+        strategy=TradingStrategy(signal="HOLD", description="", confidence=confidence),
+        meets_conditions=False,
+    )
+
+
+class FakePipeline:
+    """완료 순서대로 분석/건너뜀/실패를 돌려주는 가짜 파이프라인"""
+
+    async def search_codes(self, condition_name: str):
+        return [f"{i:06d}" for i in range(1, 26)]
+
+    async def stream(self, stock_codes):
+        self.streamed = list(stock_codes)
+        yield "analyzed", "000001", analyzed("000001", 0.4)
+        yield "skipped", "000002", None
+        yield "failed", "000003", "시간 초과"
+        yield "analyzed", "000004", analyzed("000004", 0.8)
+
+
+def post_stream(monkeypatch, **params) -> Tuple[httpx.Response, FakePipeline]:
+    pipeline = FakePipeline()
+    stock_master = SimpleNamespace(filter=lambda codes, markets=None, sectors=None: codes)
+    monkeypatch.setattr(main, "services", SimpleNamespace(analysis_pipeline=pipeline, stock_master=stock_master))
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/api/search/stream", params={"condition_name": "골든크로스", **params})
+
+    return asyncio.run(scenario()), pipeline
+
+
+def test_ndjson_events_in_completion_order(monkeypatch):
+    response, pipeline = post_stream(monkeypatch)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert len(pipeline.streamed) == 20  # 검색 결과는 최대 20개 종목
+
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [e["event"] for e in events] == [
+        "start", "stock", "progress", "progress", "progress", "stock", "progress", "summary"
+    ]
+    assert events[0]["data"] == {"condition_name": "골든크로스", "total": 20}
+    assert events[1]["data"]["stock_info"]["code"] == "000001"
+    assert events[-2]["data"] == {"total": 20, "fetched": 3, "analyzed": 2, "failed": 1}
+
+    summary = events[-1]["data"]
+    assert summary["ranking"] == [{"code": "000004", "confidence": 0.8}, {"code": "000001", "confidence": 0.4}]
+    assert (summary["total_count"], summary["failed_codes"]) == (2, ["000003"])
+
+
+def test_sse_format_and_unknown_format(monkeypatch):
+    response, _ = post_stream(monkeypatch, format="sse")
+    assert response.headers["content-type"].startswith("text/event-stream")
+    messages = [block.split("\n") for block in response.text.strip().split("\n\n")]
+    assert [lines[0] for lines in messages][:2] == ["event: start", "event: stock"]
+    assert json.loads(messages[-1][1][len("data: "):])["total_count"] == 2
+
+    response, pipeline = post_stream(monkeypatch, format="xml")
+    assert response.status_code == 400
+    assert not hasattr(pipeline, "streamed")
@@ -0,0 +1,68 @@
+import sys
+import asyncio
+import subprocess
+from pathlib import Path
+
+import httpx
+import pytest
+
+import main
+from service_container import ServiceContainer
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def container_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("KIWOOM_APP_KEY", "key")
+    monkeypatch.setenv("KIWOOM_APP_SECRET", "secret")
+    monkeypatch.setenv("OHLCV_STORE_PATH", str(tmp_path / "ohlcv.sqlite3"))
+    monkeypatch.setenv("STOCK_MASTER_SNAPSHOT", str(tmp_path / "stock_master.json"))
+    monkeypatch.setenv("ALERT_WATCHLIST_FILE", str(tmp_path / "watchlists.json"))
+    monkeypatch.setenv("INDICATOR_POOL_WORKERS", "0")
+    return tmp_path
+
+
+def test_ready_waits_for_token_and_stock_master(container_env):
+    async def scenario():
+        services = ServiceContainer()
+        await asyncio.to_thread(services.build)
+        await services.kiwoom_service.open()
+        services.started = True
+        try:
+            assert not services.ready
+            assert services.readiness()["status"] == "starting"
+
+            await services._warm_step("stock_master", services.stock_master.load_snapshot)
+            assert not services.ready  # 토큰 발급 전
+
+            await services._warm_step("auth_token", services.kiwoom_service.auth.get_access_token)
+            assert services.ready
+            assert services.readiness()["auth"] == "ok"
+        finally:
+            await services.close()
+        assert not services.ready
+
+    asyncio.run(scenario())
+
+
+def test_importing_main_defers_heavy_modules():
+    code = (
+        "import sys, main; "
+        "print(','.join(m for m in ('pandas', 'numpy', 'httpx', 'requests', 'dotenv') if m in sys.modules))"
+    )
+    loaded = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+    assert loaded.stdout.strip() == ""
+
+
+def test_health_answers_before_services_are_built(monkeypatch):
+    monkeypatch.setattr(main, "services", ServiceContainer())
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/health/live"), await client.get("/health/ready")
+
+    live, ready = asyncio.run(scenario())
+    assert (live.status_code, live.json()["status"]) == (200, "alive")
+    assert ready.status_code == 503
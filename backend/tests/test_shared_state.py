@@ -0,0 +1,83 @@
+import time
+import asyncio
+import threading
+
+import pytest
+
+from kiwoom_auth import KiwoomAuth
+from shared_state import MemoryState, SharedState, SQLiteState
+from ttl_cache import TTLCache
+
+
+def test_shared_state_is_abstract():
+    with pytest.raises(TypeError):
+        SharedState()
+
+
+def test_token_lock_wait_does_not_block_event_loop(tmp_path, monkeypatch):
+    monkeypatch.setenv("KIWOOM_APP_KEY", "key")
+    monkeypatch.setenv("KIWOOM_APP_SECRET", "secret")
+    state = SQLiteState(str(tmp_path / "state.sqlite3"))
+    auth = KiwoomAuth(state=state)
+    held = threading.Event()
+    release = threading.Event()
+
+    def other_worker():
+        # 다른 워커가 토큰 갱신 잠금을 잡고 있는 상황
+        with state.lock(f"auth:{auth._token_key}", ttl=5, wait=0):
+            held.set()
+            release.wait(5)
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticking = asyncio.create_task(ticker())
+        token = asyncio.create_task(auth.get_access_token_async())
+        await asyncio.sleep(0.2)
+        assert not token.done()
+        assert ticks >= 10  # 잠금 대기 중에도 이벤트 루프가 계속 동작
+        release.set()
+        assert (await token).startswith("MOCK_KIWOOM_TOKEN_")
+        ticking.cancel()
+
+    worker = threading.Thread(target=other_worker)
+    worker.start()
+    held.wait(5)
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        worker.join()
+        state.close()
+
+
+def test_get_or_load_reads_value_loaded_by_other_worker(tmp_path):
+    path = str(tmp_path / "state.sqlite3")
+    first = TTLCache(ttl=60, shared=SQLiteState(path), namespace="charts")
+    second = TTLCache(ttl=60, shared=SQLiteState(path), namespace="charts")
+    calls = []
+
+    async def loader():
+        calls.append(time.time())
+        return {"close": 100}
+
+    async def scenario():
+        assert await first.get_or_load("005930", loader) == {"close": 100}
+        assert await second.get_or_load("005930", loader) == {"close": 100}
+
+    asyncio.run(scenario())
+    assert len(calls) == 1
+    assert second.stats()["shared_hits"] == 1
+
+
+def test_memory_state_lock_times_out():
+    state = MemoryState()
+    with state.lock("refresh") as first:
+        with state.lock("refresh", wait=0.01) as second:
+            assert first and not second
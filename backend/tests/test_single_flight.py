@@ -0,0 +1,96 @@
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from single_flight import AsyncSingleFlight, SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    async def scenario():
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def load(key):
+            calls.append(key)
+            await asyncio.sleep(0.02)
+            return f"결과:{key}"
+
+        results = await asyncio.gather(
+            *(flight.do("005930", lambda: load("005930")) for _ in range(5)),
+            flight.do("000660", lambda: load("000660")),
+        )
+        assert results == ["결과:005930"] * 5 + ["결과:000660"]
+        assert calls == ["005930", "000660"]
+        assert (flight.executed, flight.shared, flight.in_flight()) == (2, 4, 0)
+
+        # 끝난 뒤 호출은 새로 실행
+        assert await flight.do("005930", lambda: load("005930")) == "결과:005930"
+        assert flight.executed == 3
+
+    asyncio.run(scenario())
+
+
+def test_error_is_shared_and_not_cached():
+    async def scenario():
+        flight = AsyncSingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("조회 실패")
+
+        results = await asyncio.gather(flight.do("k", fail), flight.do("k", fail), return_exceptions=True)
+        assert [type(r) for r in results] == [ValueError, ValueError]
+        assert not flight.running("k")
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    async def scenario():
+        flight = AsyncSingleFlight()
+
+        async def load():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        leader = asyncio.create_task(flight.do("k", load))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("k", load))
+        await asyncio.sleep(0)
+        leader.cancel()
+        assert await follower == "done"
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        assert flight.executed == 1
+
+    asyncio.run(scenario())
+
+
+def test_sync_flight_coalesces_threads():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def load():
+        calls.append(1)
+        started.set()
+        release.wait(timeout=5)
+        return 42
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        leader = pool.submit(flight.do, "k", load)
+        started.wait(timeout=5)
+        followers = [pool.submit(flight.do, "k", load) for _ in range(3)]
+        while flight.shared < 3:
+            time.sleep(0.001)
+        release.set()
+        assert [f.result() for f in [leader, *followers]] == [42] * 4
+    assert calls == [1]
+
+    with pytest.raises(KeyError):
+        flight.do("k", lambda: {}["없음"])
+    assert flight.executed == 2
@@ -0,0 +1,47 @@
+import json
+import asyncio
+
+import httpx
+
+from stock_master import StockMaster
+
+ENTRIES = [{"code": "005930", "name": "삼성전자", "market": "KOSPI", "sector": "전기전자", "listed": True}]
+
+
+def test_refresh_loop_retries_with_backoff_until_first_load(tmp_path, monkeypatch):
+    attempts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        attempts.append(request)
+        if len(attempts) < 3:
+            return httpx.Response(503)
+        return httpx.Response(200, text=json.dumps(ENTRIES, ensure_ascii=False))
+
+    master = StockMaster(
+        source_url="http://master.test/stocks.json",
+        snapshot_path=str(tmp_path / "stock_master.json"),
+        refresh_interval=3600,
+    )
+    master.RETRY_DELAY = 0.01
+    delays = []
+
+    real_sleep = asyncio.sleep
+
+    async def recorded_sleep(delay):
+        delays.append(delay)
+        await real_sleep(0)
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            loop = asyncio.create_task(master.run_refresh_loop(client))
+            while len(delays) < 3:
+                await real_sleep(0.001)
+            loop.cancel()
+
+    monkeypatch.setattr(asyncio, "sleep", recorded_sleep)
+
+    asyncio.run(scenario())
+    assert len(attempts) == 3
+    assert master.name("005930") == "삼성전자"
+    assert delays[:2] == [0.01, 0.02]  # 첫 로딩 전에는 짧게, 두 배씩
+    assert delays[2] > 60  # 로딩 후에는 주기 갱신
@@ -0,0 +1,66 @@
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate_bars
+from condition_service import ConditionService
+from streaming_indicators import IncrementalIndicators, IndicatorStateBook
+
+
+def assert_same_indicators(actual: dict, expected: dict):
+    assert set(actual) == set(expected)
+    for field, value in expected.items():
+        assert actual[field] == pytest.approx(value, rel=1e-9, abs=1e-9), field
+
+
+def test_each_bar_matches_full_recalculation():
+    service = ConditionService()
+    bars = generate_bars("005930", days=60, seed=11)
+    indicators = IncrementalIndicators()
+    for end in range(1, len(bars) + 1):
+        indicators.update_bar(float(bars.close[end - 1]), float(bars.volume[end - 1]))
+        window = bars[:end]
+        assert_same_indicators(indicators.current, service.calculate_indicators(window).__dict__)
+        assert indicators.golden_cross == service.check_golden_cross_condition(window)
+    assert indicators.bar_count == 60
+
+
+def test_ticks_revise_current_bar_without_accumulating():
+    bars = generate_bars("000660", days=40, seed=5)
+    streamed = IncrementalIndicators.from_chart_data(bars.previous)
+    before = dict(streamed.current)
+
+    # 당일 첫 체결은 새 봉, 이후 체결은 같은 봉을 고쳐 씀
+    close, volume = float(bars.close[-1]), float(bars.volume[-1])
+    streamed.update_bar(close * 0.9, volume * 0.2)
+    for step in (1.1, 1.0):
+        streamed.update_tick(close * step, volume * step)
+    assert streamed.bar_count == 40
+    assert streamed.previous == before  # 장중 체결은 직전 봉 값을 바꾸지 않음
+    assert_same_indicators(streamed.current, IncrementalIndicators.from_chart_data(bars).current)
+
+
+def test_wilder_rsi_matches_pandas_smoothing():
+    bars = generate_bars("035720", days=50, seed=2)
+    indicators = IncrementalIndicators.from_chart_data(bars, wilder_rsi=True)
+
+    delta = pd.Series(bars.close).diff().dropna()
+    gain, loss = delta.clip(lower=0).tolist(), (-delta).clip(lower=0).tolist()
+    avg_gain, avg_loss = sum(gain[:14]) / 14, sum(loss[:14]) / 14
+    for g, l in zip(gain[14:], loss[14:]):
+        avg_gain = (avg_gain * 13 + g) / 14
+        avg_loss = (avg_loss * 13 + l) / 14
+    assert indicators.current["rsi_14"] == pytest.approx(100 - 100 / (1 + avg_gain / avg_loss))
+
+
+def test_state_book_seeds_and_updates_per_code():
+    book = IndicatorStateBook()
+    bars = generate_bars("005930", days=30)
+    seeded = book.seed("005930", bars)
+    assert "005930" in book and book.get("005930") is seeded
+    assert seeded.bar_count == 30
+
+    book.on_bar("005930", 70000, 1000)
+    book.on_tick("005930", 71000, 1500)
+    book.on_tick("000660", 150000, 500)  # 상태가 없으면 첫 체결로 봉 시작
+    assert (book.get("005930").bar_count, book.get("000660").bar_count) == (31, 1)
+    assert book.get("035720") is None
@@ -0,0 +1,79 @@
+import time
+import asyncio
+
+from shared_state import MemoryState
+from ttl_cache import KiwoomCache, TTLCache
+
+
+def test_expiry_and_lru_eviction():
+    cache = TTLCache(maxsize=2, ttl=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # a가 최근 사용으로 이동
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+    time.sleep(0.06)
+    assert cache.get("a", "만료") == "만료"
+    cache.set("d", 4, ttl=10)  # 항목별 TTL
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (3, 2, 1)
+    assert stats["size"] == 2  # c는 아직 조회 전이라 남아 있음
+
+
+def test_get_or_load_coalesces_misses_and_respects_should_cache():
+    async def scenario():
+        cache = TTLCache(ttl=60)
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"price": 100}
+
+        results = await asyncio.gather(*(cache.get_or_load("005930", loader) for _ in range(5)))
+        assert results == [{"price": 100}] * 5
+        assert len(calls) == 1
+        assert await cache.get_or_load("005930", loader) == {"price": 100}
+        assert len(calls) == 1
+        assert cache.stats()["coalesced"] == 4
+
+        async def empty():
+            calls.append(1)
+            return None
+
+        # 빈 응답은 캐시하지 않아 다음 호출에 다시 조회
+        for _ in range(2):
+            assert await cache.get_or_load("000660", empty, should_cache=lambda r: r is not None) is None
+        assert len(calls) == 3
+
+    asyncio.run(scenario())
+
+
+def test_shared_state_is_second_level():
+    shared = MemoryState()
+    worker_a = TTLCache(ttl=60, shared=shared, namespace="quotes")
+    worker_b = TTLCache(ttl=60, shared=shared, namespace="quotes")
+
+    calls = []
+    assert worker_a.get_or_load_sync("005930", lambda: calls.append(1) or 100) == 100
+    assert worker_b.get_or_load_sync("005930", lambda: calls.append(1) or 200) == 100
+    assert calls == [1]
+    assert worker_b.stats()["shared_hits"] == 1
+
+    worker_a.invalidate("005930")
+    worker_b.clear()
+    assert worker_b.get("005930") is None
+    # 다른 namespace는 같은 키라도 따로
+    assert TTLCache(shared=shared, namespace="names").get("005930") is None
+
+
+def test_kiwoom_cache_ttls_from_env(monkeypatch):
+    monkeypatch.setenv("CACHE_QUOTE_TTL", "7")
+    monkeypatch.setenv("CACHE_NAME_TTL", "3600")
+    cache = KiwoomCache(maxsize=10, state=MemoryState())
+    assert (cache.quotes.ttl, cache.names.ttl, cache.quotes.maxsize) == (7.0, 3600.0, 10)
+    assert cache.quotes.shared is None  # 프로세스 내 상태는 2차 캐시로 쓰지 않음
+    assert 1.0 <= KiwoomCache.chart_ttl() <= 7 * 24 * 3600
+    assert set(cache.stats()) == {"names", "quotes", "charts"}
@@ -0,0 +1,198 @@
+import os
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from single_flight import SingleFlight, AsyncSingleFlight
+from market_hours import now_kst, next_session_change
+from shared_state import SharedState, get_default_state
+
+_MISSING = object()
+
+
+class TTLCache:
+    """만료시간(TTL)과 LRU 크기 제한을 갖는 캐시
+
+    미스가 동시에 여러 번 발생해도 로더는 키당 한 번만 실행됩니다.
+    shared(공유 상태)를 지정하면 프로세스 내 캐시를 1차로, 공유 저장소를 2차로
+    사용해 다른 워커가 이미 조회한 값은 다시 조회하지 않습니다.
+    get_or_load(비동기)는 공유 저장소 조회/저장을 스레드에서 수행합니다.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0,
+                 shared: Optional[SharedState] = None, namespace: str = ""):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.shared = shared
+        self.namespace = namespace
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (만료시각, 값)
+        self._lock = threading.Lock()
+        self._flight = AsyncSingleFlight()
+        self._sync_flight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.shared_hits = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value = self._get_local(key)
+        if value is _MISSING and self.shared is not None:
+            value = self._get_shared(key)
+        return self._counted(value, default)
+
+    async def get_async(self, key: Hashable, default: Any = None) -> Any:
+        """get과 같지만 공유 저장소 조회는 스레드에서"""
+        value = self._get_local(key)
+        if value is _MISSING and self.shared is not None:
+            value = await asyncio.to_thread(self._get_shared, key)
+        return self._counted(value, default)
+
+    def _get_local(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.time():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+        return _MISSING
+
+    def _get_shared(self, key: Hashable) -> Any:
+        found = self.shared.get(self.namespace, repr(key))
+        if found is None:
+            return _MISSING
+        value, expires_at = found
+        self._store(key, value, expires_at)
+        with self._lock:
+            self.hits += 1
+            self.shared_hits += 1
+        return value
+
+    def _counted(self, value: Any, default: Any) -> Any:
+        if value is not _MISSING:
+            return value
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        self._store(key, value, time.time() + ttl)
+        if self.shared is not None:
+            self.shared.set(self.namespace, repr(key), value, ttl)
+
+    async def set_async(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """set과 같지만 공유 저장소 저장은 스레드에서"""
+        ttl = self.ttl if ttl is None else ttl
+        self._store(key, value, time.time() + ttl)
+        if self.shared is not None:
+            await asyncio.to_thread(self.shared.set, self.namespace, repr(key), value, ttl)
+
+    def _store(self, key: Hashable, value: Any, expires_at: float):
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+        if self.shared is not None:
+            self.shared.delete(self.namespace, repr(key))
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+        should_cache: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """캐시 조회, 미스면 로더 실행 후 저장 (비동기, 동시 미스 병합)"""
+        value = await self.get_async(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        async def load():
+            result = await loader()
+            if should_cache is None or should_cache(result):
+                await self.set_async(key, result, ttl)
+            return result
+
+        return await self._flight.do(key, load)
+
+    def get_or_load_sync(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        ttl: Optional[float] = None,
+        should_cache: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """캐시 조회, 미스면 로더 실행 후 저장 (동기, 동시 미스 병합)"""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        def load():
+            result = loader()
+            if should_cache is None or should_cache(result):
+                self.set(key, result, ttl)
+            return result
+
+        return self._sync_flight.do(key, load)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            size = len(self._data)
+        return {
+            "size": size,
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "shared_hits": self.shared_hits,  # 다른 워커가 공유 저장소에 넣은 값 사용
+            "coalesced": self._flight.shared + self._sync_flight.shared,
+        }
+
+
+class KiwoomCache:
+    """키움 API 응답 캐시 묶음 (데이터 종류별 TTL)
+
+    - 종목명: 며칠 단위 (CACHE_NAME_TTL)
+    - 현재가: 수 초 단위 (CACHE_QUOTE_TTL)
+    - 차트: 다음 장 시작/마감 시각까지 (일봉이 바뀌는 시점)
+
+    공유 상태(SHARED_STATE_URL)가 여러 워커에 공유되는 저장소면 2차 캐시로 사용합니다.
+    """
+
+    def __init__(self, maxsize: Optional[int] = None, state: Optional[SharedState] = None):
+        maxsize = maxsize or int(os.getenv("CACHE_MAX_ENTRIES", "5000"))
+        state = state or get_default_state()
+        shared = state if state.distributed else None
+        self.names = TTLCache(
+            maxsize, ttl=float(os.getenv("CACHE_NAME_TTL", str(3 * 24 * 3600))), shared=shared, namespace="names"
+        )
+        self.quotes = TTLCache(maxsize, ttl=float(os.getenv("CACHE_QUOTE_TTL", "3")), shared=shared, namespace="quotes")
+        self.charts = TTLCache(maxsize, shared=shared, namespace="charts")
+
+    @staticmethod
+    def chart_ttl() -> float:
+        """차트 캐시 유효시간 - 다음 장 시작 또는 마감까지"""
+        now = now_kst()
+        return max(1.0, (next_session_change(now) - now).total_seconds())
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            "names": self.names.stats(),
+            "quotes": self.quotes.stats(),
+            "charts": self.charts.stats(),
+        }
@@ -10,6 +10,7 @@ const StockScreener = () => {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
   const [searchInfo, setSearchInfo] = useState(null);
+  const [progress, setProgress] = useState(null);
 
   // 컴포넌트 마운트 시 서버 상태 확인
   useEffect(() => {
@@ -30,18 +31,27 @@ const StockScreener = () => {
     setError(null);
     setStocks([]);
     setSearchInfo(null);
+    setProgress(null);
 
     try {
       console.log(`조건검색 시작: ${conditionName}`);
       const startTime = Date.now();
       
-      const response = await stockService.searchStocks(conditionName);
+      // 분석이 끝난 종목부터 바로 표시
+      const response = await stockService.searchStocksStream(conditionName, {
+        onStock: (stock) => setStocks((prev) => [...prev, stock]),
+        onProgress: setProgress,
+      });
       
       const endTime = Date.now();
       const duration = ((endTime - startTime) / 1000).toFixed(1);
       
-      if (response.success) {
-        setStocks(response.stocks || []);
+      if (response?.success) {
+        // 최종 순위(신뢰도 순)로 정렬
+        const order = new Map(response.ranking.map((item, index) => [item.code, index]));
+        setStocks((prev) => [...prev].sort(
+          (a, b) => order.get(a.stock_info.code) - order.get(b.stock_info.code)
+        ));
         setSearchInfo({
           conditionName,
           totalCount: response.total_count || 0,
@@ -49,9 +59,9 @@ const StockScreener = () => {
           duration
         });
         
-        console.log(`✅ 검색 완료: ${response.stocks?.length || 0}개 종목, ${duration}초`);
+        console.log(`✅ 검색 완료: ${response.total_count || 0}개 종목, ${duration}초`);
       } else {
-        throw new Error(response.message || '검색에 실패했습니다.');
+        throw new Error(response?.message || '검색에 실패했습니다.');
       }
     } catch (error) {
       console.error('검색 실패:', error);
@@ -60,6 +70,7 @@ const StockScreener = () => {
       setSearchInfo(null);
     } finally {
       setLoading(false);
+      setProgress(null);
     }
   };
 
@@ -99,8 +110,10 @@ const StockScreener = () => {
       {loading && (
         <div className="bg-white rounded-lg shadow-sm border">
           <LoadingSpinner 
-            message="키움 API에서 데이터를 가져오고 있습니다..." 
-            size="large" 
+            message={progress
+              ? `종목 분석 중... (${progress.fetched + progress.failed}/${progress.total}, 실패 ${progress.failed})`
+              : "키움 API에서 데이터를 가져오고 있습니다..."}
+            size={stocks.length > 0 ? "small" : "large"}
           />
         </div>
       )}
@@ -110,8 +123,8 @@ const StockScreener = () => {
         <ErrorMessage error={error} onRetry={handleRetry} />
       )}
       
-      {/* 검색 결과 테이블 */}
-      {!loading && !error && (stocks.length > 0 || searchInfo) && (
+      {/* 검색 결과 테이블 (스트리밍 중에도 도착한 종목 표시) */}
+      {!error && (stocks.length > 0 || (!loading && searchInfo)) && (
         <StockTable stocks={stocks} />
       )}
       
@@ -91,6 +91,54 @@ class StockService {
     }
   }
 
+  /**
+   * 조건검색 스트리밍 - 분석이 끝난 종목부터 순서대로 전달
+   * @param {string} conditionName - 조건검색식 이름
+   * @param {Object} handlers - onStock(stock), onProgress(counts), onSummary(summary)
+   */
+  async searchStocksStream(conditionName, { onStock, onProgress, onSummary } = {}) {
+    if (!conditionName?.trim()) {
+      throw new Error('조건검색식 이름을 입력해주세요.');
+    }
+
+    const params = new URLSearchParams({ condition_name: conditionName.trim() });
+    const response = await fetch(`${API_BASE_URL}/api/search/stream?${params}`, { method: 'POST' });
+
+    if (!response.ok) {
+      const data = await response.json().catch(() => ({}));
+      throw new Error(data.detail || `서버 오류 (${response.status})`);
+    }
+
+    // NDJSON: 한 줄에 이벤트 하나
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let summary = null;
+
+    const handleLine = (line) => {
+      if (!line.trim()) return;
+      const { event, data } = JSON.parse(line);
+      if (event === 'stock') onStock?.(data);
+      else if (event === 'progress') onProgress?.(data);
+      else if (event === 'summary') {
+        summary = data;
+        onSummary?.(data);
+      }
+    };
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      const lines = buffer.split('\n');
+      buffer = lines.pop();
+      lines.forEach(handleLine);
+    }
+    handleLine(buffer);
+
+    return summary;
+  }
+
   /**
    * 사용 가능한 조건검색식 목록 조회
    */